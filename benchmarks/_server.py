@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright 2015-2019 Jun-ya HASEBA
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+ベンチマーク用に流山市オープンデータWeb APIを模したローカルサーバ。
+レイヤIDを ``bench<件数>`` の形式で指定すると、その件数ぶんの合成データを返却する。
+"""
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import json
+from socketserver import ThreadingMixIn
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+
+# 合成データの分類名
+CATEGORIES = ('市役所・出張所', '消防署', '病院', '小学校', '公園', '図書館', '避難所')
+
+
+def make_feature(layer_id, feature_id):
+    """
+    実データと同じ構造の合成データを1件生成する。
+
+    :param layer_id: レイヤID
+    :type layer_id: str
+    :param feature_id: 項目ID
+    :type feature_id: int
+    :return: 合成データ
+    :rtype: dict
+    """
+    # 座標を流山市周辺に散らばらせる
+    latitude = 35.83 + (feature_id * 7919 % 1000) / 10000
+    longitude = 139.88 + (feature_id * 104729 % 1000) / 10000
+    return {
+        'files': {},
+        'distance': 0,
+        'status': 0,
+        'created': '2013/07/%02d %02d:%02d:%02d' % (feature_id % 28 + 1, feature_id % 24, feature_id % 60, feature_id % 60),
+        'attrs': {
+            'attr0': CATEGORIES[feature_id % len(CATEGORIES)],
+            'attr1': '施設%d' % (feature_id % 10),
+            'attr2': '合成施設%d' % feature_id,
+            'attr3': '流山市西初石%d-%d' % (feature_id % 9 + 1, feature_id % 300),
+            'attr4': '%d' % (feature_id % 100),
+            'attr5': '2013/07/%02d' % (feature_id % 28 + 1),
+            'attr6': '%.7f' % latitude,
+            'attr7': '%.7f' % longitude,
+            'attr8': '04-7150-%04d' % (feature_id % 10000),
+        },
+        'feature_id': feature_id,
+        'moduserid': 0,
+        'layer_id': layer_id,
+        'user_id': 307,
+        'mid': 0,
+        'geometry': 'POINT(%.7f %.7f)' % (longitude, latitude),
+    }
+
+
+def make_layer(layer_id, count):
+    """
+    合成データのリストを生成する。
+
+    :param layer_id: レイヤID
+    :type layer_id: str
+    :param count: 件数
+    :type count: int
+    :return: 合成データのリスト
+    :rtype: list
+    """
+    # 指定された件数ぶんの合成データを生成する
+    return [make_feature(layer_id, i + 1) for i in range(count)]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    ローカルサーバのリクエストハンドラ。
+    """
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        """
+        GETリクエストを処理する。
+        """
+        # クエリを解釈する
+        self.server.request_count += 1
+        query = parse_qs(urlsplit(self.path).query)
+        layer_id = query.get('layers', [''])[0]
+        pagenum = int(query.get('pagenum', ['1'])[0])
+        if not layer_id.startswith('bench'):
+            self.send_error(404)
+            return
+
+        # 先頭から指定された件数ぶんのデータを返却する
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        num = int(layer_id[5:])
+        results = [make_feature(layer_id, i + 1) for i in range(min(pagenum, num))]
+        body = json.dumps({'num': num, 'results': results, '_timestamp': 0}, ensure_ascii=False).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        """
+        ログを出力しない。
+        """
+
+
+class StandInServer(ThreadingMixIn, HTTPServer):
+    """
+    流山市オープンデータWeb APIを模したローカルサーバ。
+    """
+    daemon_threads = True
+
+    def __init__(self, latency=0.0):
+        """
+        StandInServerを構築する。
+
+        :param latency: レスポンスを返却する前に挿入する遅延（秒）
+        :type latency: float
+        """
+        # プロパティを設定する
+        super().__init__(('127.0.0.1', 0), _Handler)
+        self.latency = latency
+        self.request_count = 0
+
+    @property
+    def url(self):
+        """
+        pyny.api.NAGAREYAMA_WEB_API_URLと同じ形式のURLテンプレートを取得する。
+
+        :return: URLテンプレート
+        :rtype: str
+        """
+        # ローカルサーバのURLテンプレートを返却する
+        return 'http://127.0.0.1:%d/map/api/feature/8?layers=%%s&pagenum=%%d' % self.server_port
+
+    def __enter__(self):
+        """
+        ローカルサーバを起動し、pyny.apiの接続先をローカルサーバに切り替える。
+
+        :return: 当オブジェクト
+        :rtype: StandInServer
+        """
+        # サーバを起動して接続先を差し替える
+        from pyny import api
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        self._original_url = api.NAGAREYAMA_WEB_API_URL
+        api.NAGAREYAMA_WEB_API_URL = self.url
+        return self
+
+    def __exit__(self, *args):
+        """
+        ローカルサーバを停止し、pyny.apiの接続先を元に戻す。
+        """
+        # 接続先を戻してサーバを停止する
+        from pyny import api
+        api.NAGAREYAMA_WEB_API_URL = self._original_url
+        self.shutdown()
+        self.server_close()
+
+
+class StandInProcess:
+    """
+    StandInServerを別プロセスで起動するコンテキストマネージャ。
+    メモリ使用量を計測する場合など、サーバ側の処理を計測対象から外したい場合に使用する。
+    """
+
+    def __init__(self, latency=0.0):
+        """
+        StandInProcessを構築する。
+
+        :param latency: レスポンスを返却する前に挿入する遅延（秒）
+        :type latency: float
+        """
+        # プロパティを設定する
+        self.latency = latency
+
+    def __enter__(self):
+        """
+        サーバのプロセスを起動し、pyny.apiの接続先を切り替える。
+
+        :return: 当オブジェクト
+        :rtype: StandInProcess
+        """
+        # プロセスを起動して待ち受けポートを受け取る
+        from pyny import api
+        self._process = subprocess.Popen(
+            [sys.executable, '-m', 'benchmarks._server', str(self.latency)],
+            stdout=subprocess.PIPE, universal_newlines=True)
+        port = int(self._process.stdout.readline())
+        self.url = 'http://127.0.0.1:%d/map/api/feature/8?layers=%%s&pagenum=%%d' % port
+        self._original_url = api.NAGAREYAMA_WEB_API_URL
+        api.NAGAREYAMA_WEB_API_URL = self.url
+        return self
+
+    def __exit__(self, *args):
+        """
+        サーバのプロセスを停止し、pyny.apiの接続先を元に戻す。
+        """
+        # 接続先を戻してプロセスを停止する
+        from pyny import api
+        api.NAGAREYAMA_WEB_API_URL = self._original_url
+        api.connection_pool.clear()
+        self._process.kill()
+        self._process.wait()
+
+
+if __name__ == '__main__':
+    # サーバを起動して待ち受けポートを出力する
+    server = StandInServer(float(sys.argv[1]) if len(sys.argv) > 1 else 0.0)
+    print(server.server_port, flush=True)
+    server.serve_forever()
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright 2015-2019 Jun-ya HASEBA
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+get_all_data()がWeb APIからデータを取得する所要時間を、件数を確認してから取得する従来の方法と比較して計測する。
+キャッシュへの格納にかかる時間を含めないよう、取得処理（pyny.api._fetch_all_data()）のみを計測する。
+
+    python -m benchmarks.bench_all_data
+"""
+
+import time
+
+from benchmarks._server import StandInServer
+from pyny import api
+
+
+def _elapsed(func, repeat):
+    """
+    指定された関数の1回あたりの所要時間を計測する。
+
+    :param func: 計測対象の関数
+    :type func: function
+    :param repeat: 繰り返し回数
+    :type repeat: int
+    :return: 1回あたりの所要時間（秒）
+    :rtype: float
+    """
+    # 経過時間を計測する
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def _count_then_fetch(layer_id):
+    """
+    件数を取得したうえで、その件数ぶんのデータを取得する（従来の方法）。
+
+    :param layer_id: レイヤID
+    :type layer_id: str
+    """
+    # 件数を取得してからすべてのデータを取得する
+    api.get_data(layer_id, api.get_data_count(layer_id))
+
+
+def _cold(layer_id):
+    """
+    件数のキャッシュがない状態ですべてのデータを取得する。
+
+    :param layer_id: レイヤID
+    :type layer_id: str
+    """
+    # 件数のキャッシュを破棄してから取得する
+    api.invalidate(layer_id)
+    api._fetch_all_data(layer_id)
+
+
+def _warm(layer_id):
+    """
+    件数のキャッシュがある状態ですべてのデータを取得する。
+
+    :param layer_id: レイヤID
+    :type layer_id: str
+    """
+    # キャッシュされた件数を使用して取得する
+    api._fetch_all_data(layer_id)
+
+
+def main(counts=(100, 3000), latency=0.05, repeat=5):
+    """
+    ベンチマークを実行する。
+
+    :param counts: レイヤの件数
+    :type counts: tuple
+    :param latency: リクエストごとの遅延（秒）
+    :type latency: float
+    :param repeat: 繰り返し回数
+    :type repeat: int
+    """
+    # 件数ごとに各方法の所要時間とリクエスト数を計測する
+    print('latency: %.3fs, speculative page size: %d' % (latency, api.SPECULATIVE_PAGE_SIZE))
+    with StandInServer(latency) as server:
+        for count in counts:
+            layer_id = 'bench%d' % count
+            baseline = None
+            for name, func in (('count+fetch', _count_then_fetch), ('cold', _cold), ('warm count', _warm)):
+                api.invalidate(layer_id)
+                func(layer_id)
+                server.request_count = 0
+                elapsed = _elapsed(lambda: func(layer_id), repeat)
+                baseline = baseline or elapsed
+                print('%6d records  %-12s %7.3fs (x%.2f, %.1f requests)' % (
+                    count, name, elapsed, baseline / elapsed, server.request_count / repeat))
+
+
+if __name__ == '__main__':
+    main()
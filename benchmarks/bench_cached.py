@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright 2015-2019 Jun-ya HASEBA
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+種類の少ない値を持つフィールドについて、マッピングの所要時間とマッピング後に保持されるメモリ量を、
+通常のフィールドとCachedFieldで比較する。
+Web APIから取得した場合と同様に、値の文字列がデータごとに別のオブジェクトとなるようJSONを変換したデータを使用する。
+
+    python -m benchmarks.bench_cached
+"""
+
+import gc
+import json
+import time
+import tracemalloc
+
+from benchmarks._server import make_layer
+from pyny.fields import CachedField, DateField, IntegerField, StringField
+from pyny.models import Model
+
+
+class PlainModel(Model):
+    """
+    通常のフィールドのみを持つモデル。
+    """
+    id = IntegerField('feature_id')
+    layer_id = StringField()
+    category = StringField('attrs.attr0')
+    kind = StringField('attrs.attr1')
+    opened = DateField('attrs.attr5')
+
+
+class CachedModel(Model):
+    """
+    種類の少ない値を持つフィールドにCachedFieldを使用したモデル。
+    """
+    id = IntegerField('feature_id')
+    layer_id = CachedField(StringField())
+    category = CachedField(StringField('attrs.attr0'))
+    kind = CachedField(StringField('attrs.attr1'))
+    opened = CachedField(DateField('attrs.attr5'))
+
+
+def _elapsed(model, records, repeat):
+    """
+    指定されたモデルで全データをマッピングする最も短い所要時間を計測する。
+
+    :param model: モデルクラス
+    :type model: type
+    :param records: データのリスト
+    :type records: list
+    :param repeat: 繰り返し回数
+    :type repeat: int
+    :return: 所要時間（秒）
+    :rtype: float
+    """
+    # 繰り返し実行して最も短い所要時間を返却する
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        [model(data) for data in records]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _retained(model, text):
+    """
+    JSONを変換してマッピングし、変換したデータを破棄したあとに保持されているメモリ量を計測する。
+
+    :param model: モデルクラス
+    :type model: type
+    :param text: JSONの文字列
+    :type text: str
+    :return: メモリ量（バイト）
+    :rtype: int
+    """
+    # モデルのみが残った状態で確保されているメモリ量を求める
+    gc.collect()
+    tracemalloc.start()
+    records = json.loads(text)
+    models = [model(data) for data in records]
+    del records
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del models
+    return retained
+
+
+def main(count=50000, repeat=5):
+    """
+    ベンチマークを実行する。
+
+    :param count: マッピングする件数
+    :type count: int
+    :param repeat: 繰り返し回数
+    :type repeat: int
+    """
+    # 2つのモデルの所要時間と保持されるメモリ量を出力する
+    text = json.dumps(make_layer('bench', count), ensure_ascii=False)
+    records = json.loads(text)
+    print('records: %d' % count)
+    baseline = None
+    for model in (PlainModel, CachedModel):
+        result = (_elapsed(model, records, repeat), _retained(model, text))
+        baseline = baseline or result
+        print('%-12s %6.3fs (x%.2f)  retained %6.1fMB (x%.2f)' % (
+            model.__name__, result[0], baseline[0] / result[0], result[1] / 1e6, result[1] / baseline[1]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright 2015-2019 Jun-ya HASEBA
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+フィールドの値の変換の所要時間を、1件ずつのconvert()とconvert_many()で比較する。
+あわせて、数値のフィールドの列への格納までを含めた所要時間（NumPyがインストールされている場合は配列のまま格納する）と、
+フィールドごとにまとめて変換するコレクションの構築の所要時間を計測する。
+
+    python -m benchmarks.bench_convert
+"""
+
+import time
+
+from benchmarks._server import make_layer
+from benchmarks.bench_models import DetailModel, FacilityModel
+from pyny.collection import ModelCollection, _pack
+from pyny.fields import DateField, DateTimeField, DecimalField, FloatField, IntegerField, PointField
+
+
+def _elapsed(func, repeat):
+    """
+    指定された関数の最も短い所要時間を計測する。
+
+    :param func: 計測対象の関数
+    :type func: function
+    :param repeat: 繰り返し回数
+    :type repeat: int
+    :return: 最も短い所要時間（秒）
+    :rtype: float
+    """
+    # 繰り返し計測して最も短い所要時間を返却する
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(count=100000, repeat=3):
+    """
+    ベンチマークを実行する。
+
+    :param count: レイヤの件数
+    :type count: int
+    :param repeat: 繰り返し回数
+    :type repeat: int
+    """
+    # 合成データからフィールドごとの値を取り出す
+    records = make_layer('bench', count)
+    cases = (
+        ('IntegerField', IntegerField(), [data['attrs']['attr4'] for data in records]),
+        ('FloatField', FloatField(), [data['attrs']['attr6'] for data in records]),
+        ('DecimalField', DecimalField(), [data['attrs']['attr6'] for data in records]),
+        ('DateField', DateField(), [data['attrs']['attr5'] for data in records]),
+        ('DateTimeField', DateTimeField(), [data['created'] for data in records]),
+        ('PointField', PointField(), [data['geometry'] for data in records]),
+    )
+    print('values: %d' % count)
+
+    # フィールドごとに1件ずつの変換とまとめた変換を比較する
+    for name, field, values in cases:
+        convert = field.convert
+        baseline = _elapsed(lambda: [convert(v) if v is not None else None for v in values], repeat)
+        elapsed = _elapsed(lambda: field.convert_many(values), repeat)
+        print('%-14s convert %7.3fs  convert_many %7.3fs (x%.1f)' % (name, baseline, elapsed, baseline / elapsed))
+
+    # 数値のフィールドについて、リストを経由して列に格納する場合と比較する
+    for name, field, values in cases[:2]:
+        baseline = _elapsed(lambda: _pack(field, field.convert_many(values)), repeat)
+        elapsed = _elapsed(lambda: _pack(field, field._convert_column(values)), repeat)
+        print('%-14s column  %7.3fs  _convert_column %7.3fs (x%.1f)' % (name, baseline, elapsed, baseline / elapsed))
+
+    # コレクションの構築の所要時間を計測する
+    for model in (FacilityModel, DetailModel):
+        elapsed = _elapsed(lambda: ModelCollection.from_records(model, records), repeat)
+        print('%-14s from_records %7.3fs (%d records/s)' % (model.__name__, elapsed, count / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright 2015-2019 Jun-ya HASEBA
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+日付、日時の変換の所要時間を、strptime()、既定のフォーマットの高速な変換、変換結果の記憶で比較する。
+
+    python -m benchmarks.bench_dates
+"""
+
+import datetime
+import time
+
+from benchmarks._server import make_layer
+from pyny.fields import DateField, DateTimeField
+
+
+def _elapsed(func, values, repeat):
+    """
+    指定された関数ですべての値を変換する所要時間を計測する。
+
+    :param func: 変換する関数
+    :type func: function
+    :param values: 変換対象の値のリスト
+    :type values: list
+    :param repeat: 繰り返し回数
+    :type repeat: int
+    :return: 最も短い所要時間（秒）
+    :rtype: float
+    """
+    # 繰り返し計測して最も短い所要時間を返却する
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for value in values:
+            func(value)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(count=100000, repeat=3):
+    """
+    ベンチマークを実行する。
+
+    :param count: レイヤの件数
+    :type count: int
+    :param repeat: 繰り返し回数
+    :type repeat: int
+    """
+    # 合成データから日付、日時の文字列を取り出す
+    records = make_layer('bench', count)
+    created = [data['created'] for data in records]
+    opened = [data['attrs']['attr5'] for data in records]
+    print('values: %d (distinct created: %d, distinct opened: %d)' % (count, len(set(created)), len(set(opened))))
+
+    # 変換の方法ごとに所要時間を比較する
+    cases = (
+        ('DateTimeField', created, lambda text: datetime.datetime.strptime(text, '%Y/%m/%d %H:%M:%S'),
+         DateTimeField(), DateTimeField(memo_size=4096)),
+        ('DateField', opened, lambda text: datetime.datetime.strptime(text, '%Y/%m/%d').date(),
+         DateField(), DateField(memo_size=4096)),
+    )
+    for name, values, strptime, field, memo_field in cases:
+        baseline = _elapsed(strptime, values, repeat)
+        fast = _elapsed(field.convert, values, repeat)
+        memo = _elapsed(memo_field.convert, values, repeat)
+        print('%-14s strptime %7.3fs  fast path %7.3fs (x%.1f)  memo %7.3fs (x%.1f)'
+              % (name, baseline, fast, baseline / fast, memo, baseline / memo))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright 2015-2019 Jun-ya HASEBA
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+レイヤ全体のマッピングの所要時間とピークメモリ使用量を、JSON全体を変換してからマッピングする場合と、
+モデルのスキーマを解析時に適用する場合で比較する。
+ローカルサーバは別プロセスで起動し、サーバ側の処理を計測対象から外す。
+
+    python -m benchmarks.bench_decode
+"""
+
+import gc
+import time
+import tracemalloc
+
+from benchmarks._server import StandInProcess
+from benchmarks.bench_models import DetailModel
+from pyny import api
+from pyny.fields import IntegerField, StringField
+from pyny.models import Model
+
+
+class NameModel(Model):
+    """
+    少数のフィールドのみを持つモデル。
+    """
+    id = IntegerField('feature_id')
+    name = StringField('attrs.attr2')
+
+
+def _measure(func, repeat):
+    """
+    指定された関数の最も短い所要時間と、ピークメモリ使用量を計測する。
+
+    :param func: 計測対象の関数
+    :type func: function
+    :param repeat: 所要時間の計測の繰り返し回数
+    :type repeat: int
+    :return: 所要時間（秒）とピークメモリ使用量（バイト）のタプル
+    :rtype: tuple
+    """
+    # 所要時間を計測する
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    # ピークメモリ使用量を計測する
+    gc.collect()
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def main(count=50000, repeat=3):
+    """
+    ベンチマークを実行する。
+
+    :param count: レイヤの件数
+    :type count: int
+    :param repeat: 繰り返し回数
+    :type repeat: int
+    """
+    # モデルごとに2つの方法でレイヤ全体をマッピングする
+    layer_id = 'bench%d' % count
+    print('records: %d' % count)
+    with StandInProcess():
+        for model in (DetailModel, NameModel):
+            baseline = _measure(lambda: [model(data) for data in api._fetch_all_data(layer_id)], repeat)
+            schema = _measure(lambda: [model(data) for data in api._fetch_all_data(layer_id, model._schema)], repeat)
+            print('%-12s json.loads %6.3fs %7.1fMB  schema %6.3fs %7.1fMB (time x%.2f, peak x%.2f)' % (
+                model.__name__, baseline[0], baseline[1] / 1e6, schema[0], schema[1] / 1e6,
+                baseline[0] / schema[0], schema[1] / baseline[1]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright 2015-2019 Jun-ya HASEBA
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+WKT形式のジオメトリの解析速度（件/秒）を、正規表現による素朴な実装と比較する。
+
+    python -m benchmarks.bench_geometry
+"""
+
+import math
+import re
+import time
+
+from pyny.geometry import parse_many, parse_point, parse_wkt
+
+
+# 素朴な実装で使用する正規表現
+_NAIVE_TYPE = re.compile(r'^\s*(\w+)\s*\((.*)\)\s*$', re.S)
+_NAIVE_COORDINATE = re.compile(r'(-?\d+(?:\.\d+)?)\s+(-?\d+(?:\.\d+)?)')
+
+
+def naive_parse(text):
+    """
+    正規表現でWKT形式の文字列から種類と座標のリストを取り出す（比較用の素朴な実装）。
+
+    :param text: WKT形式の文字列
+    :type text: str
+    :return: 種類と座標のタプルのリストのタプル
+    :rtype: tuple
+    """
+    # 種類を取り出し、座標の組をすべて抽出する
+    match = _NAIVE_TYPE.match(text)
+    return match.group(1).upper(), [(float(x), float(y)) for x, y in _NAIVE_COORDINATE.findall(match.group(2))]
+
+
+def _make_polygon(i, vertices):
+    """
+    指定された頂点数の多角形のWKT形式の文字列を生成する。
+
+    :param i: 多角形の番号
+    :type i: int
+    :param vertices: 頂点数
+    :type vertices: int
+    :return: WKT形式の文字列
+    :rtype: str
+    """
+    # 円周上に頂点を並べる
+    cx, cy = 139.88 + (i % 100) / 1000, 35.83 + (i // 100 % 100) / 1000
+    points = ['%.7f %.7f' % (cx + 0.001 * math.cos(2 * math.pi * k / vertices),
+                             cy + 0.001 * math.sin(2 * math.pi * k / vertices)) for k in range(vertices)]
+    return 'POLYGON((%s, %s))' % (', '.join(points), points[0])
+
+
+def _rate(func, texts):
+    """
+    指定された関数で全件を解析する速度を計測する。
+
+    :param func: 解析する関数（文字列のリストを引数とする）
+    :type func: function
+    :param texts: WKT形式の文字列のリスト
+    :type texts: list
+    :return: 1秒あたりの件数
+    :rtype: float
+    """
+    # 経過時間から速度を求める
+    start = time.perf_counter()
+    func(texts)
+    return len(texts) / (time.perf_counter() - start)
+
+
+def main(count=100000, vertices=50):
+    """
+    ベンチマークを実行する。
+
+    :param count: 解析する件数
+    :type count: int
+    :param vertices: 多角形の頂点数
+    :type vertices: int
+    """
+    # POINTと多角形のそれぞれで各方法の速度を比較する
+    points = ['POINT(%.7f %.7f)' % (139.88 + i * 1e-7, 35.83 + i * 1e-7) for i in range(count)]
+    polygons = [_make_polygon(i, vertices) for i in range(count // 10)]
+    cases = (
+        ('POINT', points, (
+            ('regex', lambda texts: [naive_parse(t) for t in texts]),
+            ('parse_wkt', lambda texts: [parse_wkt(t) for t in texts]),
+            ('parse_point', lambda texts: [parse_point(t) for t in texts]),
+            ('parse_many', lambda texts: parse_many(texts, point=True)),
+        )),
+        ('POLYGON(%d)' % vertices, polygons, (
+            ('regex', lambda texts: [naive_parse(t) for t in texts]),
+            ('parse_wkt', lambda texts: [parse_wkt(t) for t in texts]),
+            ('parse_many', parse_many),
+        )),
+    )
+    for name, texts, funcs in cases:
+        baseline = None
+        for label, func in funcs:
+            rate = _rate(func, texts)
+            baseline = baseline or rate
+            print('%-12s %-12s %10.0f geometries/s (x%.2f)' % (name, label, rate, rate / baseline))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright 2015-2019 Jun-ya HASEBA
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+2つのレイヤの空間結合の所要時間を、入れ子のループと空間インデックスによる結合で比較する。
+
+    python -m benchmarks.bench_join
+"""
+
+import random
+import time
+
+from benchmarks._server import make_layer
+from pyny.collection import ModelCollection
+from pyny.fields import IntegerField, PointField
+from pyny.models import Model
+from pyny.spatial import distance_join, haversine, nearest_join
+
+
+class FacilityModel(Model):
+    """
+    ベンチマークに使用するモデル。
+    """
+    id = IntegerField('feature_id')
+    location = PointField('geometry')
+
+
+def _make_collection(count, seed):
+    """
+    流山市周辺に一様に散らばる座標を持つコレクションを生成する。
+
+    :param count: 件数
+    :type count: int
+    :param seed: 乱数のシード
+    :type seed: int
+    :return: コレクション
+    :rtype: pyny.collection.ModelCollection
+    """
+    # 合成データの座標を乱数で置き換える
+    rand = random.Random(seed)
+    records = make_layer('bench', count)
+    for data in records:
+        data['geometry'] = 'POINT(%.7f %.7f)' % (139.88 + rand.random() / 10, 35.83 + rand.random() / 10)
+    return ModelCollection.from_records(FacilityModel, records)
+
+
+def _nested_nearest(left, right):
+    """
+    入れ子のループで左側の各要素に最も近い右側の要素を求める。
+
+    :param left: 左側のコレクション
+    :type left: pyny.collection.ModelCollection
+    :param right: 右側のコレクション
+    :type right: pyny.collection.ModelCollection
+    :return: 左側の要素、右側の要素、距離のタプルのリスト
+    :rtype: list
+    """
+    # すべての組の距離を求める
+    pairs = []
+    for a in left:
+        distance, b = min((haversine(a.location.y, a.location.x, b.location.y, b.location.x), b) for b in right)
+        pairs.append((a, b, distance))
+    return pairs
+
+
+def _nested_within(left, right, meters):
+    """
+    入れ子のループで距離以内の組を求める。
+
+    :param left: 左側のコレクション
+    :type left: pyny.collection.ModelCollection
+    :param right: 右側のコレクション
+    :type right: pyny.collection.ModelCollection
+    :param meters: 距離（メートル）
+    :type meters: float
+    :return: 左側の要素、右側の要素、距離のタプルのリスト
+    :rtype: list
+    """
+    # すべての組の距離を求める
+    pairs = []
+    for a in left:
+        for b in right:
+            distance = haversine(a.location.y, a.location.x, b.location.y, b.location.x)
+            if distance <= meters:
+                pairs.append((a, b, distance))
+    return pairs
+
+
+def _elapsed(func):
+    """
+    指定された関数の所要時間を計測する。
+
+    :param func: 計測対象の関数
+    :type func: function
+    :return: 所要時間（秒）と関数の戻り値の件数のタプル
+    :rtype: tuple
+    """
+    # 経過時間を計測する
+    start = time.perf_counter()
+    count = len(func())
+    return time.perf_counter() - start, count
+
+
+def main(left_count=500, right_count=10000):
+    """
+    ベンチマークを実行する。
+
+    :param left_count: 左側のレイヤの件数
+    :type left_count: int
+    :param right_count: 右側のレイヤの件数
+    :type right_count: int
+    """
+    # 左側と右側のコレクションを用意する
+    left, right = _make_collection(left_count, 1), _make_collection(right_count, 2)
+    print('left: %d, right: %d' % (left_count, right_count))
+
+    # 結合の種類ごとに所要時間を比較する
+    cases = (
+        ('nearest', lambda: _nested_nearest(left, right),
+         lambda: list(nearest_join(left, right, 'location'))),
+        ('within 200m', lambda: _nested_within(left, right, 200),
+         lambda: list(distance_join(left, right, 200, 'location'))),
+        ('within 200m (4 thr)', None,
+         lambda: list(distance_join(left, right, 200, 'location', workers=4))),
+    )
+    for name, nested, joined in cases:
+        elapsed, count = _elapsed(joined)
+        if nested is None:
+            print('%-20s join %8.3fs (%d pairs)' % (name, elapsed, count))
+            continue
+        baseline, expected = _elapsed(nested)
+        print('%-20s loop %8.3fs  join %8.3fs (x%.1f, %d/%d pairs)'
+              % (name, baseline, elapsed, baseline / elapsed, count, expected))
+
+
+if __name__ == '__main__':
+    main()
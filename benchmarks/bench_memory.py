@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright 2015-2019 Jun-ya HASEBA
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+マッピングしたモデルのインスタンス1件あたりのメモリ使用量を、通常のモデル、コンパクトなモデル、
+列にまとめたコレクション（pyny.collection.ModelCollection）で比較する。
+Python 3.11以降は__dict__を参照するまで辞書を生成しないため、
+pyny.api.layer_cacheに格納した（サイズの推定で__dict__を参照した）あとのメモリ使用量もあわせて計測する。
+
+    python -m benchmarks.bench_memory
+"""
+
+import gc
+import tracemalloc
+
+from benchmarks._server import make_layer
+from pyny.cache import estimate_size
+from pyny.collection import ModelCollection
+from pyny.fields import FloatField, IntegerField, StringField
+from pyny.models import Model
+
+
+class FacilityModel(Model):
+    """
+    ベンチマークに使用する通常のモデル。
+    """
+    id = IntegerField('feature_id')
+    status = IntegerField()
+    created = StringField()
+    category = StringField('attrs.attr0')
+    name = StringField('attrs.attr2')
+    address = StringField('attrs.attr3')
+    latitude = FloatField('attrs.attr6')
+    longitude = FloatField('attrs.attr7')
+
+
+class CompactFacilityModel(Model, compact=True):
+    """
+    ベンチマークに使用するコンパクトなモデル。
+    通常のモデルを継承すると__dict__を持つため、同じフィールドを改めて定義する。
+    """
+    id = IntegerField('feature_id')
+    status = IntegerField()
+    created = StringField()
+    category = StringField('attrs.attr0')
+    name = StringField('attrs.attr2')
+    address = StringField('attrs.attr3')
+    latitude = FloatField('attrs.attr6')
+    longitude = FloatField('attrs.attr7')
+
+
+def _measure(build, records):
+    """
+    指定された関数で全データをマッピングした際に確保されたメモリ量を計測する。
+
+    :param build: データのリストからマッピング結果を構築する関数
+    :type build: function
+    :param records: データのリスト
+    :type records: list
+    :return: マッピングの直後とサイズを推定したあとに確保されているメモリ量（バイト）のタプル
+    :rtype: tuple
+    """
+    # マッピングの前後で確保されているメモリ量の差を求める
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    models = build(records)
+    mapped = tracemalloc.get_traced_memory()[0]
+    estimate_size(models)
+    cached = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del models
+    return mapped - before, cached - before
+
+
+def main(count=50000):
+    """
+    ベンチマークを実行する。
+
+    :param count: マッピングする件数
+    :type count: int
+    """
+    # 各モデルのインスタンス1件あたりのメモリ使用量を出力する
+    records = make_layer('bench', count)
+    print('records: %d, fields: %d' % (count, len(FacilityModel._fields)))
+    print('%-22s %22s %22s' % ('', 'mapped', 'cached'))
+    baseline = None
+    for name, build in (
+            (FacilityModel.__name__, lambda records: [FacilityModel(data) for data in records]),
+            (CompactFacilityModel.__name__, lambda records: [CompactFacilityModel(data) for data in records]),
+            (ModelCollection.__name__, lambda records: ModelCollection.from_records(FacilityModel, records))):
+        sizes = [size / count for size in _measure(build, records)]
+        baseline = baseline or sizes
+        print('%-22s %s' % (name, ' '.join(
+            '%7.1f bytes/inst (x%.2f)' % (size, size / base) for size, base in zip(sizes, baseline))))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright 2015-2019 Jun-ya HASEBA
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+モデルへのマッピングの速度（件/秒）を、汎用のModel.__init__()と生成されたコンストラクタで比較する。
+あわせて、日時や固定小数点数を含むモデルで、2つのフィールドのみ参照する場合の通常のモデルと遅延変換するモデルを比較する。
+
+    python -m benchmarks.bench_models
+"""
+
+import time
+
+from benchmarks._server import make_layer
+from pyny.fields import DateField, DateTimeField, DecimalField, FloatField, IntegerField, StringField
+from pyny.models import Model
+
+
+class FacilityModel(Model):
+    """
+    ベンチマークに使用するモデル。
+    """
+    id = IntegerField('feature_id')
+    layer_id = StringField()
+    status = IntegerField()
+    user_id = IntegerField()
+    created = StringField()
+    geometry = StringField()
+    category = StringField('attrs.attr0')
+    kind = StringField('attrs.attr1')
+    name = StringField('attrs.attr2')
+    address = StringField('attrs.attr3')
+    floor = StringField('attrs.attr4')
+    opened = StringField('attrs.attr5')
+    latitude = FloatField('attrs.attr6')
+    longitude = FloatField('attrs.attr7')
+    tel = StringField('attrs.attr8')
+
+
+class DetailModel(Model):
+    """
+    変換の負荷が大きいフィールドを含むモデル。
+    """
+    id = IntegerField('feature_id')
+    created = DateTimeField()
+    category = StringField('attrs.attr0')
+    name = StringField('attrs.attr2')
+    opened = DateField('attrs.attr5')
+    latitude = DecimalField('attrs.attr6')
+    longitude = DecimalField('attrs.attr7')
+
+
+class LazyDetailModel(DetailModel, lazy=True):
+    """
+    変換の負荷が大きいフィールドを含む、遅延変換するモデル。
+    """
+
+
+def _generic(records):
+    """
+    汎用のModel.__init__()でマッピングする。
+
+    :param records: データのリスト
+    :type records: list
+    """
+    # 生成されたコンストラクタを経由せずにマッピングする
+    new, init = FacilityModel.__new__, Model.__init__
+    for data in records:
+        init(new(FacilityModel), data)
+
+
+def _generated(records):
+    """
+    生成されたコンストラクタでマッピングする。
+
+    :param records: データのリスト
+    :type records: list
+    """
+    # 通常どおりモデルを構築する
+    for data in records:
+        FacilityModel(data)
+
+
+def _eager(records):
+    """
+    通常のモデルでマッピングし、2つのフィールドのみ参照する。
+
+    :param records: データのリスト
+    :type records: list
+    """
+    # 一部のフィールドのみ参照する
+    for data in records:
+        model = DetailModel(data)
+        model.name
+        model.category
+
+
+def _lazy(records):
+    """
+    遅延変換するモデルでマッピングし、2つのフィールドのみ参照する。
+
+    :param records: データのリスト
+    :type records: list
+    """
+    # 一部のフィールドのみ参照する
+    for data in records:
+        model = LazyDetailModel(data)
+        model.name
+        model.category
+
+
+def main(counts=(10000, 100000, 1000000), pool_size=10000):
+    """
+    ベンチマークを実行する。
+
+    :param counts: マッピングする件数
+    :type counts: tuple
+    :param pool_size: 合成データの件数（これを繰り返してマッピングする件数に達するまでマッピングする）
+    :type pool_size: int
+    """
+    # 件数ごとに各方法の速度を計測する
+    records = make_layer('bench', pool_size)
+    for model, funcs in ((FacilityModel, (('generic', _generic), ('generated', _generated))),
+                         (DetailModel, (('eager', _eager), ('lazy', _lazy)))):
+        print('%s (fields: %d)' % (model.__name__, len(model._fields)))
+        for count in counts:
+            rates = []
+            for name, func in funcs:
+                start = time.perf_counter()
+                for _ in range(count // pool_size):
+                    func(records)
+                rates.append(count / (time.perf_counter() - start))
+                print('%8d records  %-10s %10.0f records/s (x%.2f)' % (count, name, rates[-1], rates[-1] / rates[0]))
+
+
+if __name__ == '__main__':
+    main()
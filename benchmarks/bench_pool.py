@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright 2015-2019 Jun-ya HASEBA
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+コネクションプールの有無による秒間リクエスト数を比較する。
+
+    python -m benchmarks.bench_pool
+"""
+
+import json
+import time
+from urllib.request import urlopen
+
+from benchmarks._server import StandInServer
+from pyny import api
+
+
+def _get_json_without_pool(url):
+    """
+    コネクションプールを使用せずにJSONを取得する。
+
+    :param url: URL
+    :type url: str
+    :return: Pythonオブジェクトに変換したJSONの内容
+    :rtype: dict
+    """
+    # リクエストごとにコネクションを確立する
+    with urlopen(url) as response:
+        return json.loads(response.read().decode('utf-8'))
+
+
+def _measure(get_json, url, requests):
+    """
+    指定された関数で指定された回数リクエストを送信し、秒間リクエスト数を計測する。
+
+    :param get_json: JSONを取得する関数
+    :type get_json: function
+    :param url: URL
+    :type url: str
+    :param requests: リクエスト数
+    :type requests: int
+    :return: 秒間リクエスト数
+    :rtype: float
+    """
+    # リクエストを繰り返して経過時間を計測する
+    start = time.perf_counter()
+    for _ in range(requests):
+        get_json(url)
+    return requests / (time.perf_counter() - start)
+
+
+def main(requests=2000):
+    """
+    ベンチマークを実行する。
+
+    :param requests: リクエスト数
+    :type requests: int
+    """
+    # プールなし、プールありの順に計測する
+    with StandInServer() as server:
+        url = server.url % ('bench1', 1)
+        without_pool = _measure(_get_json_without_pool, url, requests)
+        with_pool = _measure(api._get_json, url, requests)
+
+    # 結果を出力する
+    print('requests     : %d' % requests)
+    print('without pool : %8.1f req/s' % without_pool)
+    print('with pool    : %8.1f req/s (x%.2f)' % (with_pool, with_pool / without_pool))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright 2015-2019 Jun-ya HASEBA
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+レイヤ全体をモデルにマッピングする際のピークメモリ使用量を、モデルが定義するフィールドの数を変えて計測する。
+いずれもModel.get_all_data()で取得し、モデルのフィールドが参照する項目のみを解析時に残す場合と、
+スキーマを無効にしてすべての項目を残したまま（レイヤインデックスとしてキャッシュして）マッピングする場合を比較する。
+ローカルサーバは別プロセスで起動し、サーバ側の処理を計測対象から外す。
+
+    python -m benchmarks.bench_projection
+"""
+
+import gc
+import tracemalloc
+
+from benchmarks._server import StandInProcess, make_feature
+from benchmarks.bench_models import FacilityModel
+from pyny import api
+from pyny.models import Model
+
+
+def _make_model(count):
+    """
+    FacilityModelのフィールドのうち、先頭から指定された数のフィールドのみを持つモデルを生成する。
+
+    :param count: フィールドの数
+    :type count: int
+    :return: モデルクラス
+    :rtype: type
+    """
+    # フィールドを複製してモデルクラスを生成する
+    fields = list(FacilityModel._fields.items())[:count]
+    namespace = {name: type(field)(field.name) for name, field in fields}
+    return type('Model%d' % count, (Model,), namespace)
+
+
+def _count_leaves(data):
+    """
+    指定された辞書に含まれる、辞書以外の値の数を求める。
+
+    :param data: 辞書
+    :type data: dict
+    :return: 辞書以外の値の数
+    :rtype: int
+    """
+    # 辞書の値は再帰的に数える
+    return sum(_count_leaves(value) if isinstance(value, dict) and value else 1 for value in data.values())
+
+
+def _peak(func):
+    """
+    指定された関数を実行した際のピークメモリ使用量を計測する。
+
+    :param func: 計測対象の関数
+    :type func: function
+    :return: ピークメモリ使用量（バイト）
+    :rtype: int
+    """
+    # キャッシュを破棄してから計測する
+    api.invalidate()
+    gc.collect()
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    api.invalidate()
+    return peak
+
+
+def _get_all_data_without_schema(model, layer_id):
+    """
+    スキーマを無効にして、指定されたモデルのget_all_data()を実行する。
+
+    :param model: モデルクラス
+    :type model: type
+    :param layer_id: レイヤID
+    :type layer_id: str
+    """
+    # 実行中のみスキーマを無効にする
+    schema, model._schema = model._schema, None
+    try:
+        model.get_all_data(layer_id)
+    finally:
+        model._schema = schema
+
+
+def main(count=50000):
+    """
+    ベンチマークを実行する。
+
+    :param count: レイヤの件数
+    :type count: int
+    """
+    # フィールドの数ごとに2つの方法でレイヤ全体をマッピングする
+    layer_id = 'bench%d' % count
+    leaves = _count_leaves(make_feature(layer_id, 1))
+    print('records: %d, keys per record: %d' % (count, leaves))
+    with StandInProcess():
+        for fields in (1, 3, 6, 10, len(FacilityModel._fields)):
+            model = _make_model(fields)
+            baseline = _peak(lambda: _get_all_data_without_schema(model, layer_id))
+            projected = _peak(lambda: model.get_all_data(layer_id))
+            print('fields %2d (keys x%.2f)  all keys %7.1fMB  projected %7.1fMB (peak x%.2f)' % (
+                fields, fields / leaves, baseline / 1e6, projected / 1e6, projected / baseline))
+
+
+if __name__ == '__main__':
+    main()
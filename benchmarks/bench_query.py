@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright 2015-2019 Jun-ya HASEBA
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+キャッシュしたレイヤに対する繰り返しの絞り込みの所要時間を、モデルのリストに対する内包表記とクエリで比較する。
+
+    python -m benchmarks.bench_query
+"""
+
+import time
+
+from benchmarks._server import CATEGORIES, make_layer
+from pyny.collection import ModelCollection
+from pyny.fields import DateTimeField, FloatField, IntegerField, StringField
+from pyny.models import Model
+from pyny.query import Query
+
+
+class FacilityModel(Model):
+    """
+    ベンチマークに使用するモデル。
+    """
+    id = IntegerField('feature_id')
+    category = StringField('attrs.attr0')
+    latitude = FloatField('attrs.attr6')
+    created = DateTimeField()
+
+
+def _elapsed(func, repeat):
+    """
+    指定された関数の1回あたりの所要時間を計測する。
+
+    :param func: 計測対象の関数
+    :type func: function
+    :param repeat: 繰り返し回数
+    :type repeat: int
+    :return: 1回あたりの所要時間（秒）
+    :rtype: float
+    """
+    # 経過時間を計測する
+    start = time.perf_counter()
+    for i in range(repeat):
+        func(i)
+    return (time.perf_counter() - start) / repeat
+
+
+def main(count=100000, repeat=100):
+    """
+    ベンチマークを実行する。
+
+    :param count: レイヤの件数
+    :type count: int
+    :param repeat: 繰り返し回数
+    :type repeat: int
+    """
+    # 同じデータからモデルのリストとクエリを用意する
+    records = make_layer('bench', count)
+    models = [FacilityModel(data) for data in records]
+    query = Query(ModelCollection.from_records(FacilityModel, records))
+    print('records: %d, queries: %d' % (count, repeat))
+
+    # 条件ごとに1回あたりの所要時間を比較する
+    cases = (
+        ('category == c', lambda i: [m for m in models if m.category == CATEGORIES[i % 7]],
+         lambda i: list(query.filter(category=CATEGORIES[i % 7]))),
+        ('latitude range', lambda i: [m for m in models if 35.90 <= m.latitude < 35.90 + i / 100000],
+         lambda i: list(query.filter(latitude__gte=35.90, latitude__lt=35.90 + i / 100000))),
+        ('category + range', lambda i: [m for m in models if m.category == CATEGORIES[i % 7] and m.latitude >= 35.92],
+         lambda i: list(query.filter(category=CATEGORIES[i % 7], latitude__gte=35.92))),
+        ('count(category)', lambda i: sum(1 for m in models if m.category == CATEGORIES[i % 7]),
+         lambda i: query.filter(category=CATEGORIES[i % 7]).count()),
+    )
+    for name, comprehension, indexed in cases:
+        baseline = _elapsed(comprehension, repeat)
+        elapsed = _elapsed(indexed, repeat)
+        print('%-18s list %8.3fms  query %8.3fms (x%.1f)' % (name, baseline * 1000, elapsed * 1000, baseline / elapsed))
+
+
+if __name__ == '__main__':
+    main()
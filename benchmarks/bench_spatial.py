@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright 2015-2019 Jun-ya HASEBA
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+キャッシュしたレイヤに対する繰り返しの空間検索の所要時間を、全件の距離の計算と空間インデックスで比較する。
+
+    python -m benchmarks.bench_spatial
+"""
+
+import random
+import time
+
+from benchmarks._server import make_layer
+from pyny.collection import ModelCollection
+from pyny.fields import IntegerField, PointField
+from pyny.models import Model
+from pyny.spatial import SpatialIndex, haversine, points_of
+
+
+class FacilityModel(Model):
+    """
+    ベンチマークに使用するモデル。
+    """
+    id = IntegerField('feature_id')
+    location = PointField('geometry')
+
+
+def _elapsed(func, repeat):
+    """
+    指定された関数の1回あたりの所要時間を計測する。
+
+    :param func: 計測対象の関数
+    :type func: function
+    :param repeat: 繰り返し回数
+    :type repeat: int
+    :return: 1回あたりの所要時間（秒）
+    :rtype: float
+    """
+    # 経過時間を計測する
+    start = time.perf_counter()
+    for i in range(repeat):
+        func(i)
+    return (time.perf_counter() - start) / repeat
+
+
+def main(count=100000, repeat=100):
+    """
+    ベンチマークを実行する。
+
+    :param count: レイヤの件数
+    :type count: int
+    :param repeat: 繰り返し回数
+    :type repeat: int
+    """
+    # 合成データの座標は重複するため、流山市周辺に一様に散らばる座標で置き換える
+    rand = random.Random(0)
+    records = make_layer('bench', count)
+    for data in records:
+        data['geometry'] = 'POINT(%.7f %.7f)' % (139.88 + rand.random() / 10, 35.83 + rand.random() / 10)
+    collection = ModelCollection.from_records(FacilityModel, records)
+    # 同じデータから点のリストと空間インデックスを用意する
+    points = points_of(collection, 'location')
+    start = time.perf_counter()
+    index = SpatialIndex(points, collection)
+    print('records: %d, queries: %d, build: %.3fs' % (count, repeat, time.perf_counter() - start))
+
+    def brute_force(lat, lon):
+        return sorted((haversine(lat, lon, y, x), i) for i, (x, y) in enumerate(points))
+
+    def position(i):
+        return 35.83 + (i * 37 % 100) / 1000, 139.88 + (i * 61 % 100) / 1000
+
+    # 検索の種類ごとに1回あたりの所要時間を比較する
+    cases = (
+        ('nearest(k=5)', lambda i: brute_force(*position(i))[:5],
+         lambda i: index.nearest(*position(i), k=5)),
+        ('within_radius(300m)', lambda i: [d for d in brute_force(*position(i)) if d[0] <= 300],
+         lambda i: index.within_radius(*position(i), meters=300)),
+        ('within_bbox', lambda i: [p for p in points if 35.86 <= p[1] <= 35.87 and 139.90 <= p[0] <= 139.91],
+         lambda i: index.within_bbox(35.86, 139.90, 35.87, 139.91)),
+    )
+    for name, baseline_func, indexed_func in cases:
+        baseline = _elapsed(baseline_func, max(repeat // 10, 1))
+        elapsed = _elapsed(indexed_func, repeat)
+        print('%-20s scan %9.3fms  index %8.3fms (x%.1f)' % (name, baseline * 1000, elapsed * 1000, baseline / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright 2015-2019 Jun-ya HASEBA
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+get_all_data()とiter_all_data()のピークメモリ使用量をレイヤの件数ごとに比較する。
+
+    python -m benchmarks.bench_stream
+"""
+
+import tracemalloc
+
+from benchmarks._server import StandInProcess
+from pyny import api
+
+
+def _peak(func):
+    """
+    指定された関数を実行した際のピークメモリ使用量を計測する。
+
+    :param func: 計測対象の関数
+    :type func: function
+    :return: ピークメモリ使用量（KiB）
+    :rtype: int
+    """
+    # tracemallocでピークメモリ使用量を計測する
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] // 1024
+    finally:
+        tracemalloc.stop()
+
+
+def main(counts=(1000, 10000, 50000)):
+    """
+    ベンチマークを実行する。
+
+    :param counts: 計測するレイヤの件数
+    :type counts: tuple
+    """
+    # 件数ごとにピークメモリ使用量を計測する
+    print('%8s %16s %16s' % ('records', 'get_all_data', 'iter_all_data'))
+    with StandInProcess():
+        for count in counts:
+            layer_id = 'bench%d' % count
+            loaded = _peak(lambda: len(api.get_all_data(layer_id)))
+            streamed = _peak(lambda: sum(1 for _ in api.iter_all_data(layer_id)))
+            print('%8d %13d KiB %13d KiB' % (count, loaded, streamed))
+
+
+if __name__ == '__main__':
+    main()
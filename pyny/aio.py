@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright 2015-2019 Jun-ya HASEBA
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+pyny.apiと同じ機能をasyncioのコルーチンとして提供するモジュール。
+ノンブロッキングのソケットで通信するため、1つのイベントループで多数のリクエストを同時に処理できる。
+"""
+
+import asyncio
+import http.client
+import io
+from urllib.parse import urljoin, urlsplit
+import weakref
+
+from pyny import api
+from pyny.pool import MAX_REDIRECTS, REDIRECT_STATUSES, USER_AGENT, HttpError
+
+
+# 同時に実行するリクエストの最大数（イベントループごと）
+MAX_CONCURRENCY = 100
+
+# 1リクエストあたりのタイムアウト（秒）
+TIMEOUT = 30
+
+# イベントループをキーとした同時実行数を制限するセマフォ
+_semaphores = weakref.WeakKeyDictionary()
+
+
+async def get_by_id(layer_id, feature_id):
+    """
+    指定されたレイヤID、項目IDにマッチするデータを取得する。
+
+    :param layer_id: レイヤID
+    :type layer_id: str
+    :param feature_id: 項目ID
+    :type feature_id: int
+    :return: マッチするデータが存在する場合はそのデータ、存在しない場合はNone
+    :rtype: dict
+    """
+    # レイヤインデックスから項目IDが一致するデータを探索して複製する
+    index = await get_layer_index(layer_id)
+    return api._copy_json(index.get(feature_id))
+
+
+async def get_data(layer_id, count, schema=None):
+    """
+    指定されたレイヤIDにマッチするデータを指定された件数ぶん取得する。
+
+    :param layer_id: レイヤID
+    :type layer_id: str
+    :param count: 件数
+    :type count: int
+    :param schema: レスポンスの解析時に各データに適用するスキーマ
+    :type schema: pyny.api.Schema
+    :return: 辞書にまとめられたデータのリスト
+    :rtype: list
+    """
+    # 当該レイヤIDのデータを取得する
+    url = api.NAGAREYAMA_WEB_API_URL % (layer_id, count)
+    data = await (_get_json(url) if schema is None else _get_json(url, schema))
+    return data['results']
+
+
+async def get_all_data(layer_id, schema=None):
+    """
+    指定されたレイヤIDにマッチするすべてのデータを取得する。
+    取得したデータはpyny.api.layer_cacheにキャッシュされ、有効期間内であれば再利用される（返却するデータはその複製）。
+    スキーマを指定した場合の動作はpyny.api.get_all_data()と同じ。
+
+    :param layer_id: レイヤID
+    :type layer_id: str
+    :param schema: レスポンスの解析時に各データに適用するスキーマ
+    :type schema: pyny.api.Schema
+    :return: 辞書にまとめられたデータのリスト
+    :rtype: list
+    """
+    # スキーマを指定した場合はキャッシュされたインデックスがなければスキーマを適用して取得する
+    if schema is not None:
+        index = api.layer_cache.get((layer_id, api.LayerIndex))
+        return api._copy_json(index.records) if index is not None else await _fetch_all_data(layer_id, schema)
+
+    # レイヤインデックスからすべてのデータを取得して複製する
+    index = await get_layer_index(layer_id)
+    return api._copy_json(index.records)
+
+
+async def _fetch_all_data(layer_id, schema=None):
+    """
+    指定されたレイヤIDにマッチするすべてのデータをWeb APIから取得する。
+    件数の求め方はpyny.api._fetch_all_data()と同じで、件数のキャッシュもpyny.apiと共有する。
+
+    :param layer_id: レイヤID
+    :type layer_id: str
+    :param schema: レスポンスの解析時に各データに適用するスキーマ
+    :type schema: pyny.api.Schema
+    :return: 辞書にまとめられたデータのリスト
+    :rtype: list
+    """
+    # 件数を確認せずに投機的にデータを取得する
+    page_size = max(api.layer_cache.get((layer_id, api.get_data_count)) or 0, api.SPECULATIVE_PAGE_SIZE)
+    url = api.NAGAREYAMA_WEB_API_URL % (layer_id, page_size)
+    data = await (_get_json(url) if schema is None else _get_json(url, schema))
+    data_count = int(data['num'])
+    api.layer_cache.set((layer_id, api.get_data_count), data_count, api.COUNT_TTL)
+    results = data['results']
+    if len(results) < page_size or data_count <= page_size:
+        return results
+
+    # 取得しきれなかった場合はレスポンスの件数を指定して取得し直す
+    url = api.NAGAREYAMA_WEB_API_URL % (layer_id, data_count)
+    data = await (_get_json(url) if schema is None else _get_json(url, schema))
+    return data['results']
+
+
+async def get_data_count(layer_id):
+    """
+    指定されたレイヤIDにマッチするデータの件数を取得する。
+
+    :param layer_id: レイヤID
+    :type layer_id: str
+    :return: データの件数
+    :rtype: int
+    """
+    # データの件数を取得してキャッシュする
+    data = await _get_json(api.NAGAREYAMA_WEB_API_URL % (layer_id, 1))
+    data_count = int(data['num'])
+    api.layer_cache.set((layer_id, api.get_data_count), data_count, api.COUNT_TTL)
+    return data_count
+
+
+async def get_layer_index(layer_id):
+    """
+    指定されたレイヤIDのレイヤインデックスを取得する。
+    インデックスのキャッシュはpyny.apiと共有し、同時の構築はpyny.api.single_flightで1回にまとめる。
+
+    :param layer_id: レイヤID
+    :type layer_id: str
+    :return: レイヤインデックス
+    :rtype: pyny.api.LayerIndex
+    """
+    # キャッシュされたインデックスを探索する
+    index = api.layer_cache.get((layer_id, api.LayerIndex))
+    if index is not None:
+        return index
+
+    # 同じレイヤIDのインデックスを構築中のタスクがあれば、その結果を待つ
+    return await api.single_flight.do_async((layer_id, api.LayerIndex), _build_layer_index, layer_id)
+
+
+async def _build_layer_index(layer_id):
+    """
+    指定されたレイヤIDのすべてのデータを取得してレイヤインデックスを構築し、キャッシュする。
+
+    :param layer_id: レイヤID
+    :type layer_id: str
+    :return: レイヤインデックス
+    :rtype: pyny.api.LayerIndex
+    """
+    # すべてのデータを取得してインデックスを構築する
+    index = api.LayerIndex(layer_id, await _fetch_all_data(layer_id))
+    api.layer_cache.set((layer_id, api.LayerIndex), index)
+    return index
+
+
+async def _get_json(url, schema=None):
+    """
+    指定されたURLにGETでアクセスし、結果のJSONをPythonオブジェクトとして取得する。
+    同じURL、同じスキーマへの同時のリクエストはpyny.api.single_flightで1回にまとめる。
+
+    :param url: URL
+    :type url: str
+    :param schema: 'results'の各要素に解析時に適用するスキーマ
+    :type schema: pyny.api.Schema
+    :return: Pythonオブジェクトに変換したJSONの内容
+    :rtype: dict
+    :raises WebApiError: Web APIへのリクエストが正常に完了しなかった
+    """
+    # 同じURL、同じスキーマへのリクエストを実行中のタスクがあれば、その結果を待つ
+    if schema is None:
+        return await api.single_flight.do_async(url, _get_json_limited, url)
+    return await api.single_flight.do_async((url, schema), _get_json_limited, url, schema)
+
+
+async def _get_json_limited(url, schema=None):
+    """
+    指定されたURLにGETでアクセスし、結果のJSONをPythonオブジェクトとして取得する。
+    同時に実行するリクエストの数はMAX_CONCURRENCYまでに制限される。
+
+    :param url: URL
+    :type url: str
+    :param schema: 'results'の各要素に解析時に適用するスキーマ
+    :type schema: pyny.api.Schema
+    :return: Pythonオブジェクトに変換したJSONの内容
+    :rtype: dict
+    :raises WebApiError: Web APIへのリクエストが正常に完了しなかった
+    """
+    # JSONを取得してPythonオブジェクトに変換する
+    async with _get_semaphore():
+        try:
+            return await asyncio.wait_for(_fetch_json(url) if schema is None else _fetch_json(url, schema), TIMEOUT)
+        except Exception as e:
+            raise api.WebApiError(e)
+
+
+def _get_semaphore():
+    """
+    実行中のイベントループに対応するセマフォを取得する。
+
+    :return: セマフォ
+    :rtype: asyncio.Semaphore
+    """
+    # イベントループごとにセマフォを生成する
+    loop = asyncio.get_event_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(MAX_CONCURRENCY)
+    return semaphore
+
+
+async def _fetch_json(url, schema=None):
+    """
+    指定されたURLにGETでアクセスし、リダイレクトを追跡して結果のJSONを取得する。
+
+    :param url: URL
+    :type url: str
+    :param schema: 'results'の各要素に解析時に適用するスキーマ
+    :type schema: pyny.api.Schema
+    :return: Pythonオブジェクトに変換したJSONの内容
+    :rtype: dict
+    :raises HttpError: ステータスコードが正常ではなかった
+    """
+    # リダイレクトを追跡しながらレスポンスを取得する
+    for _ in range(MAX_REDIRECTS + 1):
+        status, reason, headers, body = await _request(url)
+        if status in REDIRECT_STATUSES and headers.get('Location'):
+            url = urljoin(url, headers.get('Location'))
+            continue
+        if status >= 300:
+            raise HttpError(url, status, reason)
+        encoding = headers.get_content_charset() or 'utf-8'
+        return api._loads(body.decode(encoding, 'ignore'), schema)
+    raise HttpError(url, status, 'Too many redirects')
+
+
+async def _request(url):
+    """
+    指定されたURLにGETリクエストを送信し、レスポンスを読み込む。
+
+    :param url: URL
+    :type url: str
+    :return: ステータスコード、ステータスの説明、レスポンスヘッダ、レスポンスボディのタプル
+    :rtype: tuple
+    :raises ValueError: URLがHTTPのURLではなかった
+    """
+    # URLを分解する
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        raise ValueError('unknown url type: %r' % url)
+    path = (parts.path or '/') + ('?' + parts.query if parts.query else '')
+    port = parts.port or (443 if parts.scheme == 'https' else 80)
+
+    # リクエストを送信する
+    reader, writer = await asyncio.open_connection(parts.hostname, port, ssl=parts.scheme == 'https')
+    try:
+        writer.write((
+            'GET %s HTTP/1.1\r\n'
+            'Host: %s\r\n'
+            'User-Agent: %s\r\n'
+            'Accept-Encoding: identity\r\n'
+            'Connection: close\r\n'
+            '\r\n' % (path, parts.netloc, USER_AGENT)
+        ).encode('ascii'))
+
+        # ステータス行とヘッダを読み込む
+        status_line = (await reader.readline()).decode('iso-8859-1').rstrip('\r\n')
+        version, status, reason = (status_line.split(' ', 2) + [''])[:3]
+        if not version.startswith('HTTP/') or not status.isdigit():
+            raise http.client.BadStatusLine(status_line)
+        header_bytes = await reader.readuntil(b'\r\n\r\n')
+        headers = http.client.parse_headers(io.BytesIO(header_bytes))
+
+        # ボディを読み込む
+        if headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            body = await _read_chunked(reader)
+        elif headers.get('Content-Length') is not None:
+            body = await reader.readexactly(int(headers.get('Content-Length')))
+        else:
+            body = await reader.read()
+        return int(status), reason, headers, body
+    finally:
+        writer.close()
+
+
+async def _read_chunked(reader):
+    """
+    チャンク形式のレスポンスボディを読み込む。
+
+    :param reader: ストリームリーダー
+    :type reader: asyncio.StreamReader
+    :return: レスポンスボディ
+    :rtype: bytes
+    """
+    # サイズが0のチャンクが現れるまで読み込む
+    chunks = []
+    while True:
+        size = int((await reader.readline()).split(b';', 1)[0].strip(), 16)
+        if size == 0:
+            break
+        chunks.append(await reader.readexactly(size))
+        await reader.readline()
+    return b''.join(chunks)
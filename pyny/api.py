@@ -16,13 +16,47 @@
 # limitations under the License.
 #
 
+import codecs
 import json
-from urllib.request import urlopen
+import re
+
+from pyny.cache import MemoryCache, SingleFlight
+from pyny.pool import ConnectionPool
 
 
 # 流山市オープンデータWeb APIのURL
 NAGAREYAMA_WEB_API_URL = 'http://nagareyama.ecom-plat.jp/map/api/feature/8?layers=%s&pagenum=%d'
 
+# 件数が不明なレイヤのすべてのデータを取得する際に、1回目のリクエストで要求する件数
+SPECULATIVE_PAGE_SIZE = 1000
+
+# 取得したデータの件数をキャッシュする期間（秒）
+COUNT_TTL = 3600
+
+# ストリーミング時に一度に読み込むバイト数
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# 取得したレイヤのデータをキャッシュする期間（秒）
+CACHE_TTL = 300
+
+# 取得したレイヤのデータをキャッシュするメモリ量の上限（バイト、おおよその値）
+CACHE_MAX_SIZE = 128 * 1024 * 1024
+
+# Web APIへのアクセスに使用するコネクションプール
+connection_pool = ConnectionPool()
+
+# Web APIのレスポンスを保存するキャッシュ（pyny.cache.DiskCacheを設定すると有効になる）
+http_cache = None
+
+# 取得したレイヤのデータのキャッシュ
+layer_cache = MemoryCache(CACHE_MAX_SIZE, CACHE_TTL)
+
+# 同じレイヤ、同じURLへの同時のリクエストを1回にまとめる仕組み
+single_flight = SingleFlight()
+
+# JSONの空白文字にマッチする正規表現
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
 
 class WebApiError(Exception):
     """
@@ -30,9 +64,170 @@ class WebApiError(Exception):
     """
 
 
+class LayerIndex:
+    """
+    1レイヤぶんのデータを項目IDで引けるようにしたインデックス。
+    """
+
+    def __init__(self, layer_id, records):
+        """
+        LayerIndexを構築する。
+
+        :param layer_id: レイヤID
+        :type layer_id: str
+        :param records: 辞書にまとめられたデータのリスト
+        :type records: list
+        """
+        # プロパティを設定する
+        self.layer_id = layer_id
+        self.records = records
+
+        # 項目IDが重複する場合は先頭のデータを優先する
+        self._by_id = {}
+        for record in records:
+            self._by_id.setdefault(record.get('feature_id'), record)
+
+    def __len__(self):
+        """
+        インデックスに含まれるデータの件数を取得する。
+
+        :return: データの件数
+        :rtype: int
+        """
+        return len(self._by_id)
+
+    def __contains__(self, feature_id):
+        """
+        指定された項目IDのデータが含まれているかどうかを判定する。
+
+        :param feature_id: 項目ID
+        :type feature_id: int
+        :return: 含まれている場合はTrue
+        :rtype: bool
+        """
+        return feature_id in self._by_id
+
+    def get(self, feature_id):
+        """
+        指定された項目IDにマッチするデータを取得する。
+
+        :param feature_id: 項目ID
+        :type feature_id: int
+        :return: マッチするデータが存在する場合はそのデータ、存在しない場合はNone
+        :rtype: dict
+        """
+        return self._by_id.get(feature_id)
+
+
+class Schema:
+    """
+    レスポンスの'results'の各要素について、解析時に残す項目と値の変換方法を表すスキーマ。
+    スキーマを適用した要素は元と同じ構造の辞書で、スキーマの項目のみを含み、値は変換済みとなる。
+    """
+
+    def __init__(self, paths):
+        """
+        Schemaを構築する。
+        リストのインデックスを含むパスや、ほかのパスと重複するパスは、辞書として辿れる位置の値を変換せずにそのまま残す。
+
+        :param paths: キーのパス（タプル）と変換関数（変換しない場合はNone）のタプルのシーケンス
+        :type paths: list
+        """
+        # パスをキーの木にまとめる
+        root = {}
+        for keys, convert in paths:
+            if not keys or not isinstance(keys[0], str):
+                # 先頭からリストとして辿るパスがある場合はデータ全体をそのまま残す
+                root = None
+                break
+            node = root
+            for i, key in enumerate(keys):
+                if i == len(keys) - 1 or not isinstance(keys[i + 1], str):
+                    # 重複するパスや、インデックスの手前までのパスは変換せずに残す
+                    node[key] = (convert,) if key not in node and i == len(keys) - 1 else None
+                    break
+                if key not in node:
+                    node[key] = {}
+                    node = node[key]
+                elif isinstance(node[key], dict):
+                    node = node[key]
+                else:
+                    # ほかのパスの末尾を経由するパスは、その値を変換せずに残す
+                    node[key] = None
+                    break
+
+        # プロパティを設定する
+        self._tree = None if root is None else _compile_tree(root)
+
+    def apply(self, data):
+        """
+        指定されたデータにスキーマを適用する。
+
+        :param data: 辞書にまとめられたデータ
+        :type data: dict
+        :return: スキーマの項目のみを含み、値を変換した辞書（辞書以外が指定された場合はそのまま）
+        :rtype: dict
+        """
+        # キーの木に沿って値を取り出す
+        if self._tree is None or data.__class__ is not dict:
+            return data
+        return _apply_tree(self._tree, data)
+
+
+def _compile_tree(node):
+    """
+    キーの木を、スキーマの適用時に辿るタプルに変換する。
+
+    :param node: キーをキー、変換関数のタプル・子の木・None（変換せずに残す）を値とした辞書
+    :type node: dict
+    :return: キー、変換関数、子の木のタプルのタプル
+    :rtype: tuple
+    """
+    # 葉は変換関数、節は子の木を持たせる
+    compiled = []
+    for key, value in node.items():
+        if isinstance(value, dict):
+            compiled.append((key, None, _compile_tree(value)))
+        else:
+            compiled.append((key, value[0] if value else None, None))
+    return tuple(compiled)
+
+
+def _apply_tree(tree, data):
+    """
+    キーの木に沿ってデータから値を取り出し、変換した辞書を生成する。
+
+    :param tree: キー、変換関数、子の木のタプルのタプル
+    :type tree: tuple
+    :param data: 辞書
+    :type data: dict
+    :return: 木に含まれる項目のみを含み、値を変換した辞書
+    :rtype: dict
+    """
+    # 節は子の木を辿り、葉は値を変換する
+    result = {}
+    for key, convert, subtree in tree:
+        value = data.get(key)
+        if value is None:
+            continue
+        if subtree is not None:
+            if value.__class__ is dict:
+                value = _apply_tree(subtree, value)
+            # 辞書以外で辿れない値は、マッピング時と同じ結果になるようそのまま残す
+        elif convert is not None:
+            try:
+                value = convert(value)
+            except Exception:
+                # 変換できない値はマッピング時に同じ例外が送出されるよう変換前の値を残す
+                pass
+        result[key] = value
+    return result
+
+
 def get_by_id(layer_id, feature_id):
     """
     指定されたレイヤID、項目IDにマッチするデータを取得する。
+    返却するデータはキャッシュされたデータの複製で、変更してもキャッシュには影響しない。
 
     :param layer_id: レイヤID
     :type layer_id: str
@@ -41,18 +236,34 @@ def get_by_id(layer_id, feature_id):
     :return: マッチするデータが存在する場合はそのデータ、存在しない場合はNone
     :rtype: dict
     """
-    # すべてのデータを取得する
-    all_data = get_all_data(layer_id)
+    # レイヤインデックスから項目IDが一致するデータを探索して複製する
+    return _copy_json(get_layer_index(layer_id).get(feature_id))
 
-    # 項目IDが一致するデータを探索する
-    for data in all_data:
-        if data['feature_id'] == feature_id:
-            return data
+
+def get_by_ids(layer_id, feature_ids, as_dict=False):
+    """
+    指定されたレイヤID、複数の項目IDにマッチするデータをまとめて取得する。
+    返却するデータはキャッシュされたデータの複製で、変更してもキャッシュには影響しない。
+
+    :param layer_id: レイヤID
+    :type layer_id: str
+    :param feature_ids: 項目IDのリスト
+    :type feature_ids: list
+    :param as_dict: 項目IDをキーとした辞書で返却するかどうか
+    :type as_dict: bool
+    :return: 項目IDと同じ順序で並べたデータのリスト（マッチしない項目IDの位置はNone）、
+             as_dictがTrueの場合は項目IDをキーとした辞書
+    :rtype: list
+    """
+    # レイヤインデックスから項目IDが一致するデータを探索して複製する
+    index = get_layer_index(layer_id)
+    if as_dict:
+        return {feature_id: _copy_json(index.get(feature_id)) for feature_id in feature_ids}
     else:
-        return None
+        return [_copy_json(index.get(feature_id)) for feature_id in feature_ids]
 
 
-def get_data(layer_id, count):
+def get_data(layer_id, count, schema=None):
     """
     指定されたレイヤIDにマッチするデータを指定された件数ぶん取得する。
 
@@ -60,58 +271,446 @@ def get_data(layer_id, count):
     :type layer_id: str
     :param count: 件数
     :type count: int
+    :param schema: レスポンスの解析時に各データに適用するスキーマ
+    :type schema: Schema
     :return: 辞書にまとめられたデータのリスト
     :rtype: list
     """
     # 当該レイヤIDのデータを取得する
-    data = _get_json(NAGAREYAMA_WEB_API_URL % (layer_id, count))
+    url = NAGAREYAMA_WEB_API_URL % (layer_id, count)
+    data = _get_json(url) if schema is None else _get_json(url, schema)
     return data['results']
 
 
-def get_all_data(layer_id):
+def get_all_data(layer_id, schema=None):
     """
     指定されたレイヤIDにマッチするすべてのデータを取得する。
+    取得したデータはlayer_cacheにキャッシュされ、有効期間内であれば再利用される（返却するデータはその複製）。
+    スキーマを指定した場合、レイヤインデックスがキャッシュされていなければ、
+    レスポンスの解析時にスキーマを適用したデータを取得する（このデータはキャッシュされない）。
 
     :param layer_id: レイヤID
     :type layer_id: str
+    :param schema: レスポンスの解析時に各データに適用するスキーマ
+    :type schema: Schema
     :return: 辞書にまとめられたデータのリスト
     :rtype: list
     """
+    # スキーマを指定した場合はキャッシュされたインデックスがなければスキーマを適用して取得する
+    if schema is not None:
+        index = layer_cache.get((layer_id, LayerIndex))
+        return _copy_json(index.records) if index is not None else _fetch_all_data(layer_id, schema)
+
+    # レイヤインデックスからすべてのデータを取得して複製する
+    return _copy_json(get_layer_index(layer_id).records)
+
+
+def _fetch_all_data(layer_id, schema=None):
+    """
+    指定されたレイヤIDにマッチするすべてのデータをWeb APIから取得する。
+    件数のキャッシュがあればその件数、なければSPECULATIVE_PAGE_SIZEを要求し、
+    レスポンスの件数が要求を超えている場合のみ、その件数を指定して改めてすべてのデータを取得する。
+
+    :param layer_id: レイヤID
+    :type layer_id: str
+    :param schema: レスポンスの解析時に各データに適用するスキーマ
+    :type schema: Schema
+    :return: 辞書にまとめられたデータのリスト
+    :rtype: list
+    """
+    # 件数を確認せずに投機的にデータを取得する
+    page_size = max(layer_cache.get((layer_id, get_data_count)) or 0, SPECULATIVE_PAGE_SIZE)
+    url = NAGAREYAMA_WEB_API_URL % (layer_id, page_size)
+    data = _get_json(url) if schema is None else _get_json(url, schema)
+    data_count = int(data['num'])
+    layer_cache.set((layer_id, get_data_count), data_count, COUNT_TTL)
+    results = data['results']
+    if len(results) < page_size or data_count <= page_size:
+        return results
+
+    # 取得しきれなかった場合はレスポンスの件数を指定して取得し直す
+    # （Web APIはページの指定に対応していないため、ページ単位では取得できない）
+    url = NAGAREYAMA_WEB_API_URL % (layer_id, data_count)
+    data = _get_json(url) if schema is None else _get_json(url, schema)
+    return data['results']
+
+
+def iter_all_data(layer_id, schema=None):
+    """
+    指定されたレイヤIDにマッチするすべてのデータを、レスポンスの受信と並行して1件ずつ返却する。
+    レスポンス全体をメモリに展開しないため、件数の多いレイヤでもメモリ使用量はほぼ一定となる。
+
+    :param layer_id: レイヤID
+    :type layer_id: str
+    :param schema: 解析した各データに適用するスキーマ
+    :type schema: Schema
+    :return: 辞書にまとめられたデータのイテレータ
+    :rtype: generator
+    :raises WebApiError: Web APIへのリクエストが正常に完了しなかった
+    """
     # データの件数を取得する
     data_count = get_data_count(layer_id)
 
-    # 当該レイヤIDのすべてのデータを取得する
-    return get_data(layer_id, data_count)
+    # 当該レイヤIDのすべてのデータを1件ずつ返却する
+    results = _iter_json_results(NAGAREYAMA_WEB_API_URL % (layer_id, data_count))
+    yield from results if schema is None else map(schema.apply, results)
 
 
 def get_data_count(layer_id):
     """
     指定されたレイヤIDにマッチするデータの件数を取得する。
+    取得した件数はlayer_cacheにCOUNT_TTLの期間キャッシュされ、get_all_data()で再利用される。
 
     :param layer_id: レイヤID
     :type layer_id: str
     :return: データの件数
     :rtype: int
     """
-    # データの件数を取得する
+    # データの件数を取得してキャッシュする
     data = _get_json(NAGAREYAMA_WEB_API_URL % (layer_id, 1))
-    return int(data['num'])
+    data_count = int(data['num'])
+    layer_cache.set((layer_id, get_data_count), data_count, COUNT_TTL)
+    return data_count
+
+
+def get_layer_index(layer_id):
+    """
+    指定されたレイヤIDのレイヤインデックスを取得する。
+    有効期間内のインデックスがキャッシュされていればそれを再利用し、なければ新たに構築する。
+
+    :param layer_id: レイヤID
+    :type layer_id: str
+    :return: レイヤインデックス
+    :rtype: LayerIndex
+    """
+    # キャッシュされたインデックスを探索する
+    index = layer_cache.get((layer_id, LayerIndex))
+    if index is not None:
+        return index
+
+    # 同じレイヤIDのインデックスを構築中のスレッドがあれば、その結果を待つ
+    return single_flight.do((layer_id, LayerIndex), _build_layer_index, layer_id)
+
+
+def _build_layer_index(layer_id):
+    """
+    指定されたレイヤIDのすべてのデータを取得してレイヤインデックスを構築し、キャッシュする。
+
+    :param layer_id: レイヤID
+    :type layer_id: str
+    :return: レイヤインデックス
+    :rtype: LayerIndex
+    """
+    # すべてのデータを取得してインデックスを構築する
+    index = LayerIndex(layer_id, _fetch_all_data(layer_id))
+    layer_cache.set((layer_id, LayerIndex), index)
+    return index
+
+
+def invalidate(layer_id=None):
+    """
+    指定されたレイヤIDのキャッシュを破棄する。
+
+    :param layer_id: レイヤID（省略した場合はすべてのレイヤ）
+    :type layer_id: str
+    """
+    # キャッシュを破棄する
+    layer_cache.invalidate(layer_id)
+
+
+def _copy_json(value):
+    """
+    JSONから変換したPythonオブジェクトを、辞書とリストを再帰的に複製してコピーする。
+    copy.deepcopy()よりも高速に複製するため、辞書とリスト以外の値は不変とみなしてそのまま共有する。
+
+    :param value: JSONから変換したPythonオブジェクト
+    :type value: object
+    :return: 複製したオブジェクト
+    :rtype: object
+    """
+    # 辞書とリストは要素を複製し、それ以外の値はそのまま返却する
+    cls = value.__class__
+    if cls is dict:
+        return {k: _copy_json(v) for k, v in value.items()}
+    if cls is list:
+        return [_copy_json(v) for v in value]
+    return value
+
+
+def _get_json(url, schema=None):
+    """
+    指定されたURLにGETでアクセスし、結果のJSONをPythonオブジェクトとして取得する。
+
+    :param url: URL
+    :type url: str
+    :param schema: 'results'の各要素に解析時に適用するスキーマ
+    :type schema: Schema
+    :return: Pythonオブジェクトに変換したJSONの内容
+    :rtype: dict
+    :raises WebApiError: Web APIへのリクエストが正常に完了しなかった
+    """
+    # 同じURL、同じスキーマへのリクエストを実行中のスレッドがあれば、その結果を待つ
+    if schema is None:
+        return single_flight.do(url, _fetch_json, url)
+    return single_flight.do((url, schema), _fetch_json, url, schema)
 
 
-def _get_json(url):
+def _fetch_json(url, schema=None):
     """
     指定されたURLにGETでアクセスし、結果のJSONをPythonオブジェクトとして取得する。
 
     :param url: URL
     :type url: str
+    :param schema: 'results'の各要素に解析時に適用するスキーマ
+    :type schema: Schema
     :return: Pythonオブジェクトに変換したJSONの内容
     :rtype: dict
     :raises WebApiError: Web APIへのリクエストが正常に完了しなかった
     """
     # JSONを取得してPythonオブジェクトに変換する
     try:
-        with urlopen(url) as response:
+        if http_cache is not None:
+            body, encoding = http_cache.fetch(connection_pool, url)
+            return _loads(body.decode(encoding, 'ignore'), schema)
+        with connection_pool.urlopen(url) as response:
             encoding = response.headers.get_content_charset() or 'utf-8'
-            return json.loads(response.read().decode(encoding, 'ignore'))
+            if schema is not None:
+                # スキーマを指定した場合はレスポンス全体を読み込まずに受信しながら解析する
+                return _apply_schema(_JsonStreamReader(response, encoding), schema)
+            return _loads(response.read().decode(encoding, 'ignore'), schema)
     except Exception as e:
         raise WebApiError(e)
+
+
+def _loads(text, schema=None):
+    """
+    JSONの文字列をPythonオブジェクトに変換する。
+    スキーマを指定した場合は'results'の要素を1件ずつ解析してスキーマを適用し、解析済みの要素を保持しない。
+
+    :param text: JSONの文字列
+    :type text: str
+    :param schema: 'results'の各要素に適用するスキーマ
+    :type schema: Schema
+    :return: Pythonオブジェクトに変換したJSONの内容
+    :rtype: dict
+    :raises ValueError: JSONとして解析できなかった
+    """
+    # スキーマを指定しない場合はまとめて変換する
+    if schema is None:
+        return json.loads(text)
+
+    # 'results'の要素ごとにスキーマを適用する
+    return _apply_schema(_JsonStreamReader(None, text=text), schema)
+
+
+def _apply_schema(reader, schema):
+    """
+    JSONのリーダーから'results'の要素を1件ずつ取り出してスキーマを適用する。
+
+    :param reader: JSONのリーダー
+    :type reader: _JsonStreamReader
+    :param schema: 'results'の各要素に適用するスキーマ
+    :type schema: Schema
+    :return: スキーマを適用した'results'と、それ以外のメンバーをまとめた辞書
+    :rtype: dict
+    :raises ValueError: JSONとして解析できなかった
+    """
+    # 'results'の要素ごとにスキーマを適用し、それ以外のメンバーと合わせて返却する
+    apply = schema.apply
+    results = [apply(data) for data in reader.iter_array('results')]
+    return dict(reader.meta, results=results)
+
+
+def _iter_json_results(url):
+    """
+    指定されたURLにGETでアクセスし、結果のJSONの'results'の要素を受信しながら1件ずつ返却する。
+
+    :param url: URL
+    :type url: str
+    :return: Pythonオブジェクトに変換した'results'の要素のイテレータ
+    :rtype: generator
+    :raises WebApiError: Web APIへのリクエストが正常に完了しなかった
+    """
+    # JSONを受信しながらPythonオブジェクトに変換する
+    try:
+        with connection_pool.urlopen(url) as response:
+            encoding = response.headers.get_content_charset() or 'utf-8'
+            yield from _JsonStreamReader(response, encoding).iter_array('results')
+    except WebApiError:
+        raise
+    except Exception as e:
+        raise WebApiError(e)
+
+
+class _JsonStreamReader:
+    """
+    ファイルライクオブジェクトから少しずつ読み込みながらJSONを解析するリーダー。
+    トップレベルのオブジェクトの中の1つの配列について、要素を1件ずつ取り出すことができる。
+    """
+
+    def __init__(self, fp, encoding='utf-8', chunk_size=None, text=None):
+        """
+        _JsonStreamReaderを構築する。
+
+        :param fp: 読み込み対象のファイルライクオブジェクト
+        :type fp: io.RawIOBase
+        :param encoding: 文字コード
+        :type encoding: str
+        :param chunk_size: 一度に読み込むバイト数
+        :type chunk_size: int
+        :param text: 読み込み済みのJSONの文字列（指定した場合はfpから読み込まない）
+        :type text: str
+        """
+        # プロパティを設定する
+        self.meta = {}
+        self._fp = fp
+        self._decoder = codecs.getincrementaldecoder(encoding)('ignore')
+        self._chunk_size = chunk_size or STREAM_CHUNK_SIZE
+        self._raw_decode = json.JSONDecoder().raw_decode
+        self._buf = text or ''
+        self._pos = 0
+        self._eof = text is not None
+
+    def iter_array(self, key):
+        """
+        トップレベルのオブジェクトの指定されたキーの配列の要素を1件ずつ返却する。
+        それ以外のキーの値はmetaに格納する。
+
+        :param key: 配列のキー
+        :type key: str
+        :return: 配列の要素のイテレータ
+        :rtype: generator
+        :raises ValueError: JSONとして解析できなかった
+        """
+        # トップレベルのオブジェクトのメンバーを順に解析する
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            name = self._decode()
+            self._expect(':')
+            if name == key:
+                yield from self._iter_elements()
+            else:
+                self.meta[name] = self._decode()
+            if self._expect(',}') == '}':
+                return
+
+    def _iter_elements(self):
+        """
+        現在位置の配列の要素を1件ずつ返却する。
+
+        :return: 配列の要素のイテレータ
+        :rtype: generator
+        """
+        # 配列の要素を順に解析する
+        self._expect('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        if self._eof:
+            # 全体を読み込み済みの場合は、続きの読み込みを考慮せずに解析する
+            yield from self._iter_buffered_elements()
+            return
+        while True:
+            yield self._decode()
+            if self._expect(',]') == ']':
+                return
+
+    def _iter_buffered_elements(self):
+        """
+        全体を読み込み済みのバッファから、現在位置の配列の要素を1件ずつ返却する。
+
+        :return: 配列の要素のイテレータ
+        :rtype: generator
+        :raises ValueError: JSONとして解析できなかった
+        """
+        # 空白の読み飛ばしと値の解析を繰り返す
+        buf, decode, skip = self._buf, self._raw_decode, _WHITESPACE.match
+        pos = self._pos
+        while True:
+            value, pos = decode(buf, skip(buf, pos).end())
+            pos = skip(buf, pos).end()
+            ch = buf[pos:pos + 1]
+            self._pos = pos + 1
+            yield value
+            if ch == ']':
+                return
+            if ch != ',':
+                raise ValueError('Expecting \',]\' at position %d: %r' % (pos, ch))
+            pos += 1
+
+    def _decode(self):
+        """
+        現在位置のJSONの値を1つ解析する。
+
+        :return: Pythonオブジェクトに変換した値
+        :rtype: object
+        """
+        # 値が途中で途切れている場合は続きを読み込んでから解析し直す
+        self._peek()
+        while True:
+            try:
+                value, end = self._raw_decode(self._buf, self._pos)
+            except ValueError:
+                if not self._fill():
+                    raise
+                continue
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def _expect(self, chars):
+        """
+        次の空白以外の文字が指定された文字のいずれかであることを確認して読み進める。
+
+        :param chars: 期待する文字
+        :type chars: str
+        :return: 読み進めた文字
+        :rtype: str
+        :raises ValueError: 期待する文字ではなかった
+        """
+        # 次の文字を確認する
+        ch = self._peek()
+        if ch not in chars:
+            raise ValueError('Expecting %r at position %d: %r' % (chars, self._pos, ch))
+        self._pos += 1
+        return ch
+
+    def _peek(self):
+        """
+        空白を読み飛ばし、次の文字を取得する。
+
+        :return: 次の文字
+        :rtype: str
+        :raises ValueError: データの終端に達した
+        """
+        # 空白以外の文字が現れるまで読み進める
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise ValueError('Unexpected end of JSON data')
+
+    def _fill(self):
+        """
+        ファイルライクオブジェクトから続きを読み込み、バッファに追加する。
+        解析済みの部分はバッファから取り除く。
+
+        :return: 続きを読み込めた場合はTrue、終端に達していた場合はFalse
+        :rtype: bool
+        """
+        # 終端に達している場合は何もしない
+        if self._eof:
+            return False
+
+        # 続きを読み込んで解析済みの部分を取り除く
+        chunk = self._fp.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+        self._buf = self._buf[self._pos:] + self._decoder.decode(chunk, final=self._eof)
+        self._pos = 0
+        return True
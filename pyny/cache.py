@@ -0,0 +1,647 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright 2015-2019 Jun-ya HASEBA
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import weakref
+
+
+# estimate_size()がすべての要素をたどるコンテナの最大の要素数
+ESTIMATE_SAMPLE_SIZE = 256
+
+
+class MemoryCache:
+    """
+    解析済みのレイヤのデータなどをプロセス内に保持するキャッシュ。
+    エントリごとに有効期間を持ち、おおよその合計サイズが上限を超えた場合は最も長く参照されていないものから破棄する。
+    上限より大きい値は、ほかのエントリをすべて破棄したうえで保持する（最も新しいエントリは常に保持される）。
+    参照時はロックを取得しないため、多数のスレッドから同時に参照することができる。
+    キーはレイヤIDを先頭要素としたタプルとする。
+    """
+
+    def __init__(self, max_size=128 * 1024 * 1024, ttl=300):
+        """
+        MemoryCacheを構築する。
+
+        :param max_size: キャッシュの合計サイズの上限（バイト、おおよその値）
+        :type max_size: int
+        :param ttl: エントリの有効期間（秒）、Noneの場合は無期限
+        :type ttl: float
+        """
+        # プロパティを設定する
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._size = 0
+
+    def __len__(self):
+        """
+        保持しているエントリの数を取得する。
+
+        :return: エントリの数
+        :rtype: int
+        """
+        return len(self._entries)
+
+    @property
+    def size(self):
+        """
+        保持しているエントリのおおよその合計サイズを取得する。
+
+        :return: 合計サイズ（バイト）
+        :rtype: int
+        """
+        return self._size
+
+    def get(self, key, default=None):
+        """
+        指定されたキーの値を取得する。
+
+        :param key: キー
+        :type key: tuple
+        :param default: エントリが存在しないか有効期間が切れていた場合に返却する値
+        :type default: object
+        :return: キャッシュしている値
+        :rtype: object
+        """
+        # ロックを取得せずにエントリを参照する
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+
+        # 有効期間が切れている場合は破棄する
+        value, expires, _ = entry
+        if expires is not None and expires <= time.monotonic():
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    self._discard(key)
+            return default
+
+        # ロックを取得できた場合のみ参照順を更新する
+        if self._lock.acquire(False):
+            try:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+            finally:
+                self._lock.release()
+        return value
+
+    def set(self, key, value, ttl=None, size=None):
+        """
+        指定されたキーに値を設定する。
+        合計サイズが上限を超えた場合は最も長く参照されていないエントリから破棄する。
+        設定した値自体は、上限より大きい場合でも破棄されない。
+
+        :param key: キー
+        :type key: tuple
+        :param value: 値
+        :type value: object
+        :param ttl: 有効期間（秒、省略した場合は構築時に指定した値）
+        :type ttl: float
+        :param size: 値のサイズ（バイト、省略した場合はestimate_size()で推定する）
+        :type size: int
+        """
+        # 値のサイズと有効期限を求める
+        if size is None:
+            size = estimate_size(value)
+        ttl = self.ttl if ttl is None else ttl
+        expires = time.monotonic() + ttl if ttl is not None else None
+
+        # エントリを追加し、上限を超えたぶんを破棄する
+        # （上限より大きい値は、ほかのエントリをすべて破棄して単独で保持する）
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (value, expires, size)
+            self._size += size
+            while self._size > self.max_size and len(self._entries) > 1:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate(self, layer_id=None):
+        """
+        指定されたレイヤIDのエントリを破棄する。
+
+        :param layer_id: レイヤID（省略した場合はすべてのエントリ）
+        :type layer_id: str
+        """
+        # 該当するエントリを破棄する
+        with self._lock:
+            if layer_id is None:
+                self._entries.clear()
+                self._size = 0
+                return
+            for key in [k for k in self._entries if k[0] == layer_id]:
+                self._discard(key)
+
+    def _discard(self, key):
+        """
+        指定されたキーのエントリを破棄する。ロックを取得した状態で呼び出すこと。
+
+        :param key: キー
+        :type key: tuple
+        """
+        # エントリを取り除いて合計サイズを更新する
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry[2]
+
+
+class SingleFlight:
+    """
+    同じキーに対する同時の呼び出しを1回の実行にまとめる仕組み。
+    実行中の呼び出しと同じキーで呼び出したスレッドは、その完了を待って同じ結果（または例外）を受け取る。
+    コルーチン関数はdo_async()で同じイベントループ内の呼び出しをまとめる。
+    """
+
+    def __init__(self):
+        """
+        SingleFlightを構築する。
+        """
+        # プロパティを設定する
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._tasks = weakref.WeakKeyDictionary()
+        self._stats = {'executions': 0, 'coalesced': 0}
+
+    def do(self, key, func, *args):
+        """
+        指定されたキーで関数を実行する。
+        同じキーの呼び出しが実行中の場合は、実行せずにその結果を待つ。
+
+        :param key: キー
+        :type key: object
+        :param func: 実行する関数
+        :type func: function
+        :param args: 関数に渡す引数
+        :type args: tuple
+        :return: 関数の戻り値
+        :rtype: object
+        """
+        # 実行中の呼び出しがあれば相乗りする
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self._stats['executions'] += 1
+                leader = True
+            else:
+                self._stats['coalesced'] += 1
+                leader = False
+
+        # 相乗りした場合は完了を待って同じ結果を返却する
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        # 関数を実行し、待っているスレッドに結果を通知する
+        try:
+            call.result = func(*args)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key, func, *args):
+        """
+        指定されたキーでコルーチン関数を実行する。
+        同じイベントループで同じキーの呼び出しが実行中の場合は、実行せずにその結果を待つ。
+        呼び出し元のいずれかがキャンセルされても、実行中の呼び出しはキャンセルしない。
+
+        :param key: キー
+        :type key: object
+        :param func: 実行するコルーチン関数
+        :type func: function
+        :param args: 関数に渡す引数
+        :type args: tuple
+        :return: 関数の戻り値
+        :rtype: object
+        """
+        # 実行中のタスクがあれば相乗りし、なければタスクを生成する
+        loop = asyncio.get_event_loop()
+        with self._lock:
+            tasks = self._tasks.get(loop)
+            if tasks is None:
+                tasks = self._tasks[loop] = {}
+            task = tasks.get(key)
+            if task is None:
+                task = tasks[key] = loop.create_task(func(*args))
+                task.add_done_callback(lambda _: tasks.pop(key, None))
+                self._stats['executions'] += 1
+            else:
+                self._stats['coalesced'] += 1
+
+        # タスクの完了を待って結果を返却する
+        return await asyncio.shield(task)
+
+    def stats(self):
+        """
+        呼び出しの状況を取得する。
+
+        :return: 実際に実行した回数（executions）、相乗りした回数（coalesced）の辞書
+        :rtype: dict
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def reset_stats(self):
+        """
+        呼び出しの状況を初期化する。
+        """
+        with self._lock:
+            for key in self._stats:
+                self._stats[key] = 0
+
+
+class _Call:
+    """
+    SingleFlightで実行中の1回の呼び出し。
+    """
+
+    def __init__(self):
+        """
+        _Callを構築する。
+        """
+        # プロパティを設定する
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def estimate_size(obj):
+    """
+    指定されたオブジェクトが参照しているオブジェクトを含めたおおよそのメモリ使用量を推定する。
+    要素数がESTIMATE_SAMPLE_SIZEを超えるコンテナは、等間隔に抜き出した要素のみをたどり、要素数の比率で拡大して推定する。
+
+    :param obj: 対象のオブジェクト
+    :type obj: object
+    :return: メモリ使用量（バイト）
+    :rtype: int
+    """
+    # 参照しているオブジェクトを、推定に掛ける倍率とともに順にたどる
+    size = 0.0
+    seen = set()
+    stack = [(obj, 1.0)]
+    while stack:
+        target, weight = stack.pop()
+        if id(target) in seen:
+            continue
+        seen.add(id(target))
+        size += sys.getsizeof(target) * weight
+        if isinstance(target, dict):
+            stack.extend(_sample(target.keys(), weight))
+            stack.extend(_sample(target.values(), weight))
+        elif isinstance(target, (list, tuple, set, frozenset)):
+            stack.extend(_sample(target, weight))
+        elif not isinstance(target, type):
+            if hasattr(target, '__dict__'):
+                stack.append((target.__dict__, weight))
+            for c in type(target).__mro__:
+                slots = c.__dict__.get('__slots__', ())
+                slots = (slots,) if isinstance(slots, str) else slots
+                stack.extend((getattr(target, k), weight) for k in slots if hasattr(target, k))
+    return int(size)
+
+
+def _sample(items, weight):
+    """
+    指定されたコンテナの要素を、推定に掛ける倍率とともに返却する。
+    要素数がESTIMATE_SAMPLE_SIZEを超える場合は等間隔に抜き出し、倍率を要素数の比率で拡大する。
+
+    :param items: コンテナの要素
+    :type items: collections.abc.Collection
+    :param weight: コンテナの推定に掛ける倍率
+    :type weight: float
+    :return: 要素と倍率のタプルのリスト
+    :rtype: list
+    """
+    # 要素数が少ない場合はすべての要素をたどる
+    count = len(items)
+    if count <= ESTIMATE_SAMPLE_SIZE:
+        return [(item, weight) for item in items]
+
+    # 等間隔に抜き出した要素のみをたどる
+    step = count / ESTIMATE_SAMPLE_SIZE
+    indexes = {int(i * step) for i in range(ESTIMATE_SAMPLE_SIZE)}
+    weight *= count / len(indexes)
+    if isinstance(items, (list, tuple)):
+        return [(items[i], weight) for i in sorted(indexes)]
+    return [(item, weight) for i, item in enumerate(items) if i in indexes]
+
+
+class DiskCache:
+    """
+    Web APIのレスポンスをURLごとにディスクへ保存するキャッシュ。
+    保存したレスポンスはETag、Last-Modifiedを使った条件付きリクエストで再検証し、
+    合計サイズが上限を超えた場合は最も長く参照されていないものから破棄する。
+    """
+
+    # キャッシュファイルの拡張子
+    SUFFIX = '.cache'
+
+    def __init__(self, directory, max_size=64 * 1024 * 1024, max_age=0):
+        """
+        DiskCacheを構築する。
+
+        :param directory: キャッシュを保存するディレクトリ
+        :type directory: str
+        :param max_size: キャッシュの合計サイズの上限（バイト）
+        :type max_size: int
+        :param max_age: 再検証せずにキャッシュを使用する期間（秒）
+        :type max_age: float
+        """
+        # プロパティを設定する
+        self.directory = directory
+        self.max_size = max_size
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'revalidations': 0}
+
+        # 保存済みのキャッシュの合計サイズを求める
+        os.makedirs(directory, exist_ok=True)
+        self._size = sum(size for _, size, _ in self._entries())
+
+    def fetch(self, pool, url):
+        """
+        指定されたURLのレスポンスボディを、キャッシュを使用して取得する。
+
+        :param pool: リクエストに使用するコネクションプール
+        :type pool: pyny.pool.ConnectionPool
+        :param url: URL
+        :type url: str
+        :return: レスポンスボディと文字コードのタプル
+        :rtype: tuple
+        """
+        # 有効期間内のキャッシュがあればそのまま使用する
+        path = self._path(url)
+        entry = self._load(path)
+        if entry is not None and time.time() - float(entry['stored']) < self.max_age:
+            self._count('hits')
+            return entry['body'], entry['encoding']
+
+        # キャッシュがあれば条件付きリクエストで再検証する
+        headers = {}
+        if entry is not None:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+        with pool.urlopen(url, headers) as response:
+            body = response.read()
+            if response.status == 304 and entry is not None:
+                self._count('revalidations')
+                self._refresh(path, url, entry)
+                return entry['body'], entry['encoding']
+            encoding = response.headers.get_content_charset() or 'utf-8'
+            etag = response.getheader('ETag')
+            last_modified = response.getheader('Last-Modified')
+
+        # 取得したレスポンスを保存する
+        self._count('misses')
+        self._save(path, url, body, encoding, etag, last_modified)
+        return body, encoding
+
+    def stats(self):
+        """
+        キャッシュの利用状況を取得する。
+
+        :return: ヒット数（hits）、ミス数（misses）、再検証によるヒット数（revalidations）の辞書
+        :rtype: dict
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def reset_stats(self):
+        """
+        キャッシュの利用状況を初期化する。
+        """
+        with self._lock:
+            for key in self._stats:
+                self._stats[key] = 0
+
+    def clear(self):
+        """
+        保存しているすべてのキャッシュを削除する。
+        """
+        # キャッシュファイルを削除する
+        with self._lock:
+            for path, _, _ in self._entries():
+                self._remove(path)
+            self._size = 0
+
+    def _path(self, url):
+        """
+        指定されたURLのキャッシュファイルのパスを取得する。
+
+        :param url: URL
+        :type url: str
+        :return: キャッシュファイルのパス
+        :rtype: str
+        """
+        # URLのハッシュ値をファイル名とする
+        return os.path.join(self.directory, hashlib.sha1(url.encode('utf-8')).hexdigest() + self.SUFFIX)
+
+    def _load(self, path):
+        """
+        指定されたキャッシュファイルを読み込む。
+        読み込んだファイルは最終参照日時を更新する。
+
+        :param path: キャッシュファイルのパス
+        :type path: str
+        :return: キャッシュの内容（存在しない場合はNone）
+        :rtype: dict
+        """
+        # ヘッダ行とボディを読み込む
+        try:
+            with open(path, 'rb') as f:
+                line = f.readline()
+                entry = json.loads(line.decode('utf-8'))
+                entry['header_size'] = len(line)
+                entry['body'] = f.read()
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def _save(self, path, url, body, encoding, etag, last_modified):
+        """
+        指定された内容をキャッシュファイルに保存する。
+
+        :param path: キャッシュファイルのパス
+        :type path: str
+        :param url: URL
+        :type url: str
+        :param body: レスポンスボディ
+        :type body: bytes
+        :param encoding: 文字コード
+        :type encoding: str
+        :param etag: ETag
+        :type etag: str
+        :param last_modified: Last-Modified
+        :type last_modified: str
+        """
+        # 一時ファイルに書き込んでから置き換える
+        header = _header(url, encoding, etag, last_modified)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header)
+            f.write(body)
+        with self._lock:
+            self._size -= self._file_size(path)
+            os.replace(temp_path, path)
+            self._size += len(header) + len(body)
+            self._evict()
+
+    def _refresh(self, path, url, entry):
+        """
+        再検証したキャッシュファイルの保存日時を更新する。
+        ボディは書き換えず、同じ長さのヘッダ行のみを上書きする（長さが変わる場合はファイル全体を保存し直す）。
+
+        :param path: キャッシュファイルのパス
+        :type path: str
+        :param url: URL
+        :type url: str
+        :param entry: 読み込んだキャッシュの内容
+        :type entry: dict
+        """
+        # ヘッダ行の長さが変わらなければヘッダ行のみを上書きする
+        header = _header(url, entry['encoding'], entry['etag'], entry['last_modified'])
+        if len(header) == entry['header_size']:
+            try:
+                with open(path, 'r+b') as f:
+                    f.write(header)
+                return
+            except OSError:
+                pass
+
+        # ヘッダ行の長さが変わる場合やファイルを開けない場合はファイル全体を保存し直す
+        self._save(path, url, entry['body'], entry['encoding'], entry['etag'], entry['last_modified'])
+
+    def _evict(self):
+        """
+        合計サイズが上限に収まるまで、最終参照日時の古いキャッシュから削除する。
+        """
+        # 上限に収まっている場合は何もしない
+        if self._size <= self.max_size:
+            return
+
+        # 最終参照日時の古い順に削除する
+        for path, size, _ in sorted(self._entries(), key=lambda entry: entry[2]):
+            if self._size <= self.max_size:
+                break
+            if self._remove(path):
+                self._size -= size
+
+    def _entries(self):
+        """
+        保存しているキャッシュファイルの一覧を取得する。
+
+        :return: パス、サイズ、最終参照日時のタプルのリスト
+        :rtype: list
+        """
+        # キャッシュファイルの情報を収集する
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(self.SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _count(self, key):
+        """
+        指定された利用状況のカウンタを1増やす。
+
+        :param key: カウンタの名前
+        :type key: str
+        """
+        with self._lock:
+            self._stats[key] += 1
+
+    @staticmethod
+    def _file_size(path):
+        """
+        指定されたファイルのサイズを取得する。
+
+        :param path: ファイルのパス
+        :type path: str
+        :return: ファイルのサイズ（存在しない場合は0）
+        :rtype: int
+        """
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _remove(path):
+        """
+        指定されたファイルを削除する。
+
+        :param path: ファイルのパス
+        :type path: str
+        :return: 削除できた場合はTrue
+        :rtype: bool
+        """
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+
+def _header(url, encoding, etag, last_modified):
+    """
+    キャッシュファイルのヘッダ行を生成する。
+    保存日時は固定長の文字列とし、再検証時にヘッダ行のみを同じ長さで上書きできるようにする。
+
+    :param url: URL
+    :type url: str
+    :param encoding: 文字コード
+    :type encoding: str
+    :param etag: ETag
+    :type etag: str
+    :param last_modified: Last-Modified
+    :type last_modified: str
+    :return: 改行を含むヘッダ行
+    :rtype: bytes
+    """
+    # 保存日時を小数点以下6桁の文字列としてJSONに変換する
+    return json.dumps({
+        'url': url,
+        'encoding': encoding,
+        'etag': etag,
+        'last_modified': last_modified,
+        'stored': '%.6f' % time.time(),
+    }).encode('utf-8') + b'\n'
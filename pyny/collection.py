@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright 2015-2019 Jun-ya HASEBA
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+モデルのリストをフィールドごとの列として保持するコレクションを提供するモジュール。
+整数、浮動小数点数のフィールドはarray.array（NumPyがインストールされている場合はnumpy.ndarray）に格納する。
+"""
+
+from array import array
+
+from pyny.fields import FloatField, IntegerField, PointField
+from pyny.geometry import Point
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# 数値のフィールドクラスと、その列に使用する型コード
+_TYPECODES = ((IntegerField, 'q'), (FloatField, 'd'))
+
+
+class ModelCollection:
+    """
+    モデルのリストをフィールドごとの列として保持するコレクション。
+    行のモデルは参照されるたびに列から構築し、コレクションには保持しない。
+    """
+
+    def __init__(self, model, columns, length, records=None):
+        """
+        ModelCollectionを構築する。
+
+        :param model: モデルクラス
+        :type model: type
+        :param columns: フィールド名をキーとした列の辞書
+        :type columns: dict
+        :param length: 行数
+        :type length: int
+        :param records: 行のモデルをコンストラクタで構築する場合の、辞書にまとめられたデータのリスト
+        :type records: list
+        """
+        # プロパティを設定する
+        self.model = model
+        self.columns = columns
+        self._length = length
+        self._records = records
+        self._indexes = {}
+        self._numpy_columns = tuple(k for k, v in columns.items() if numpy is not None and isinstance(v, numpy.ndarray))
+
+    @classmethod
+    def from_records(cls, model, records):
+        """
+        指定されたデータのリストからコレクションを構築する。
+        独自のコンストラクタを持つモデルの場合は、行のモデルをコンストラクタで構築するためにデータのリストも保持する。
+
+        :param model: モデルクラス
+        :type model: type
+        :param records: 辞書にまとめられたデータのリスト
+        :type records: list
+        :return: コレクション
+        :rtype: ModelCollection
+        """
+        # フィールドごとに値をまとめて変換して列にまとめる
+        records = records if isinstance(records, list) else list(records)
+        columns = {}
+        for k, _, keys in model._plan:
+            field = model._fields[k]
+            values = field._convert_column(_extract(model, records, keys))
+            columns[k] = _pack(field, values)
+
+        # 独自のコンストラクタを持つモデル（スキーマが生成されないモデル）はデータのリストも保持する
+        return cls(model, columns, len(records), records if model._schema is None else None)
+
+    def column(self, name):
+        """
+        指定されたフィールドの列を取得する。
+
+        :param name: フィールド名
+        :type name: str
+        :return: 列（list、array.arrayまたはnumpy.ndarray）
+        :rtype: object
+        :raises KeyError: 指定されたフィールドが存在しない
+        """
+        # 列を返却する
+        return self.columns[name]
+
+    def to_list(self):
+        """
+        すべての行をモデルとして構築し、リストにまとめる。
+
+        :return: モデルのリスト
+        :rtype: list
+        """
+        # すべての行を構築する
+        return list(self)
+
+    def __len__(self):
+        """
+        行数を取得する。
+
+        :return: 行数
+        :rtype: int
+        """
+        # 行数を返却する
+        return self._length
+
+    def __iter__(self):
+        """
+        各行のモデルを順に構築して返却する。
+
+        :return: モデルのイテレータ
+        :rtype: generator
+        """
+        # 行ごとにモデルを構築する
+        for i in range(self._length):
+            yield self._make_row(i)
+
+    def __getitem__(self, index):
+        """
+        指定された行のモデル、またはスライスした範囲のコレクションを取得する。
+
+        :param index: 行番号またはスライス
+        :type index: int
+        :return: 行番号を指定した場合はモデル、スライスを指定した場合はコレクション
+        :rtype: object
+        :raises IndexError: 行番号が範囲外
+        """
+        # スライスの場合は各列をスライスしたコレクションを返却する
+        if isinstance(index, slice):
+            length = len(range(*index.indices(self._length)))
+            records = self._records[index] if self._records is not None else None
+            return self.__class__(self.model, {k: v[index] for k, v in self.columns.items()}, length, records)
+
+        # 行番号の場合は当該行のモデルを構築する
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError('ModelCollection index out of range')
+        return self._make_row(index)
+
+    def __repr__(self):
+        """
+        コレクションの文字列表現を取得する。
+
+        :return: 文字列表現
+        :rtype: str
+        """
+        # モデルクラス名と行数を返却する
+        return '<%s of %s: %d rows>' % (self.__class__.__name__, self.model.__name__, self._length)
+
+    def _make_row(self, index):
+        """
+        指定された行のモデルを構築する。
+        構築したモデルはコレクションに保持しないため、参照するたびに別のモデルとなる。
+
+        :param index: 行番号
+        :type index: int
+        :return: モデル
+        :rtype: pyny.models.Model
+        """
+        # 独自のコンストラクタを持つモデルはコンストラクタで構築する
+        if self._records is not None:
+            return self.model(self._records[index])
+
+        # 変換済みの値を直接設定する
+        row = self.model.__new__(self.model)
+        for k, column in self.columns.items():
+            value = column[index]
+            setattr(row, k, value.item() if k in self._numpy_columns else value)
+        return row
+
+
+def _extract(model, records, keys):
+    """
+    指定されたデータのリストから、指定されたキーのパスに対応する値を列としてまとめて取り出す。
+    辞書のキーのみからなるパスは、キーごとに全行をまとめて探索する。
+
+    :param model: モデルクラス
+    :type model: type
+    :param records: 辞書にまとめられたデータのリスト
+    :type records: list
+    :param keys: キーのパス
+    :type keys: tuple
+    :return: 値のリスト
+    :rtype: list
+    """
+    # リストのインデックスを含むパスは1行ずつ探索する
+    if any(isinstance(key, int) for key in keys):
+        return [model._get_value(data, keys) for data in records]
+
+    # キーごとに全行の値を取り出す
+    values = records
+    for key in keys:
+        values = [v.get(key) if v else None for v in values]
+    return values
+
+
+def _pack(field, values):
+    """
+    指定されたフィールドの値のリストを列に格納する。
+    数値のフィールドで値がすべて揃っている場合のみ、array.arrayまたはnumpy.ndarrayに格納する。
+    点のフィールドで値がすべて揃っている場合は、x座標とy座標の2つの配列に格納する。
+
+    :param field: フィールド
+    :type field: pyny.fields.BaseField
+    :param values: 変換後の値のリストまたはnumpy.ndarray
+    :type values: object
+    :return: 列
+    :rtype: object
+    """
+    # NumPyで変換済みの配列はそのまま列とする
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        return values
+
+    # 点の列は座標ごとの配列に格納する
+    if isinstance(field, PointField) and None not in values:
+        return PointColumn(array('d', (p[0] for p in values)), array('d', (p[1] for p in values)))
+
+    # 数値以外のフィールド、値が存在しない行を含む列はリストのまま返却する
+    typecode = next((t for c, t in _TYPECODES if isinstance(field, c)), None)
+    if typecode is None or None in values:
+        return values
+
+    # 数値の列を格納する
+    try:
+        if numpy is not None:
+            return numpy.array(values, dtype='int64' if typecode == 'q' else 'float64')
+        return array(typecode, values)
+    except (OverflowError, TypeError):
+        return values
+
+
+class PointColumn:
+    """
+    点の列をx座標、y座標の2つの配列として保持する。
+    """
+    __slots__ = ('xs', 'ys')
+
+    def __init__(self, xs, ys):
+        """
+        PointColumnを構築する。
+
+        :param xs: x座標（経度）の配列
+        :type xs: array.array
+        :param ys: y座標（緯度）の配列
+        :type ys: array.array
+        """
+        # プロパティを設定する
+        self.xs = xs
+        self.ys = ys
+
+    def tolist(self):
+        """
+        すべての点をリストにまとめる。
+
+        :return: 点のリスト
+        :rtype: list
+        """
+        # 座標を組み合わせて点を生成する
+        return [Point(x, y) for x, y in zip(self.xs, self.ys)]
+
+    def __len__(self):
+        """
+        点の数を取得する。
+
+        :return: 点の数
+        :rtype: int
+        """
+        # 配列の長さを返却する
+        return len(self.xs)
+
+    def __getitem__(self, index):
+        """
+        指定された位置の点、またはスライスした範囲の列を取得する。
+
+        :param index: 位置またはスライス
+        :type index: int
+        :return: 位置を指定した場合は点、スライスを指定した場合は列
+        :rtype: object
+        """
+        # スライスの場合は両方の配列をスライスする
+        if isinstance(index, slice):
+            return PointColumn(self.xs[index], self.ys[index])
+        return Point(self.xs[index], self.ys[index])
@@ -19,6 +19,60 @@
 from abc import ABCMeta, abstractmethod
 import datetime
 import decimal
+from functools import lru_cache
+import re
+import sys
+
+from pyny.geometry import Geometry, Point, parse_many, parse_point, parse_wkt
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# DateFieldの既定のフォーマット
+DATE_FORMAT = '%Y/%m/%d'
+
+# DateTimeFieldの既定のフォーマット
+DATETIME_FORMAT = '%Y/%m/%d %H:%M:%S'
+
+# CachedFieldが変換結果を記憶する値の既定の最大数（フィールドごと）
+CACHE_SIZE = 1024
+
+# 既定のフォーマットの日付、日時にマッチする正規表現
+_DATE_PATTERN = re.compile(r'\d{4}/\d{2}/\d{2}', re.ASCII)
+_DATETIME_PATTERN = re.compile(r'\d{4}/\d{2}/\d{2} \d{2}:\d{2}:\d{2}', re.ASCII)
+
+# ISO 8601形式の文字列を日付、日時に変換する関数
+if hasattr(datetime.date, 'fromisoformat'):
+    _date_fromisoformat = datetime.date.fromisoformat
+    _datetime_fromisoformat = datetime.datetime.fromisoformat
+else:
+    def _date_fromisoformat(text):
+        """
+        ISO 8601形式の日付の文字列を日付に変換する（fromisoformat()が存在しないバージョン向け）。
+
+        :param text: 文字列
+        :type text: str
+        :return: 日付
+        :rtype: datetime.date
+        """
+        # 各要素を切り出して変換する
+        return datetime.date(int(text[:4]), int(text[5:7]), int(text[8:10]))
+
+    def _datetime_fromisoformat(text):
+        """
+        ISO 8601形式の日時の文字列を日時に変換する（fromisoformat()が存在しないバージョン向け）。
+
+        :param text: 文字列
+        :type text: str
+        :return: 日時
+        :rtype: datetime.datetime
+        """
+        # 各要素を切り出して変換する
+        return datetime.datetime(int(text[:4]), int(text[5:7]), int(text[8:10]),
+                                 int(text[11:13]), int(text[14:16]), int(text[17:19]))
 
 
 class BaseField(metaclass=ABCMeta):
@@ -37,6 +91,32 @@ class BaseField(metaclass=ABCMeta):
         # プロパティを設定する
         self.name = name
 
+    def __get__(self, instance, owner):
+        """
+        遅延変換するモデルのインスタンスから当フィールドの値を取得する。
+        初回の参照時に変換前の値を変換し、以降はインスタンスに設定した変換後の値が参照される。
+
+        :param instance: モデルのインスタンス
+        :type instance: pyny.models.Model
+        :param owner: モデルクラス
+        :type owner: type
+        :return: 変換後の値（遅延変換するモデルのインスタンス以外から参照した場合は当フィールド）
+        :rtype: object
+        """
+        # 変換前の値を保持していない場合は当フィールドを返却する
+        raw = getattr(instance, '_raw', None)
+        if raw is None:
+            return self
+        name = owner._field_names.get(self)
+        if name not in raw:
+            return self
+
+        # 値を変換してインスタンスに設定する
+        value = raw[name]
+        value = self.convert(value) if value is not None else None
+        instance.__dict__[name] = value
+        return value
+
     @abstractmethod
     def convert(self, target):
         """
@@ -50,6 +130,34 @@ class BaseField(metaclass=ABCMeta):
         """
         raise NotImplementedError()
 
+    def convert_many(self, values):
+        """
+        指定された値のリストをまとめて変換する。
+        値が存在しない要素（None）はNoneのまま返却する。
+        サブクラスで型に応じたより高速な変換を実装してもよい。
+
+        :param values: 変換対象の値のリスト
+        :type values: list
+        :return: 変換後の値のリスト
+        :rtype: list
+        """
+        # 値を1件ずつ変換する
+        convert = self.convert
+        return [convert(v) if v is not None else None for v in values]
+
+    def _convert_column(self, values):
+        """
+        コレクションの列とする値のリストをまとめて変換する。
+        数値のフィールドでは、NumPyで変換したnumpy.ndarrayをリストに戻さずにそのまま返却する。
+
+        :param values: 変換対象の値のリスト
+        :type values: list
+        :return: 変換後の値のリストまたはnumpy.ndarray
+        :rtype: object
+        """
+        # 値のリストをまとめて変換する
+        return self.convert_many(values)
+
 
 class StringField(BaseField):
     """
@@ -114,6 +222,34 @@ class IntegerField(BaseField):
         # 対象を整数に変換する
         return int(target)
 
+    def convert_many(self, values):
+        """
+        指定された値のリストをまとめて整数に変換する。
+
+        :param values: 変換対象の値のリスト
+        :type values: list
+        :return: 変換後の値のリスト
+        :rtype: list
+        """
+        # 文字列、整数の要素は変換メソッドを呼び出さずに変換する
+        convert = self.convert
+        return [int(v) if v.__class__ is str else v if v.__class__ is int or v is None else convert(v)
+                for v in values]
+
+    def _convert_column(self, values):
+        """
+        コレクションの列とする値のリストをまとめて整数に変換する。
+        NumPyがインストールされている場合、値がすべて揃った文字列のリストはNumPyでまとめてnumpy.ndarrayに変換する。
+
+        :param values: 変換対象の値のリスト
+        :type values: list
+        :return: 変換後の値のリストまたはnumpy.ndarray
+        :rtype: object
+        """
+        # NumPyでまとめて変換できる場合はその結果を返却する
+        converted = _convert_with_numpy(values, 'int64')
+        return converted if converted is not None else self.convert_many(values)
+
 
 class DecimalField(BaseField):
     """
@@ -146,6 +282,19 @@ class DecimalField(BaseField):
         # 対象を固定小数点数に変換する
         return decimal.Decimal(str(target))
 
+    def convert_many(self, values):
+        """
+        指定された値のリストをまとめて固定小数点数に変換する。
+
+        :param values: 変換対象の値のリスト
+        :type values: list
+        :return: 変換後の値のリスト
+        :rtype: list
+        """
+        # 文字列の要素は変換メソッドを呼び出さずに変換する
+        convert = self.convert
+        return [decimal.Decimal(v) if v.__class__ is str else None if v is None else convert(v) for v in values]
+
 
 class FloatField(BaseField):
     """
@@ -178,25 +327,64 @@ class FloatField(BaseField):
         # 対象を浮動小数点数に変換する
         return float(target)
 
+    def convert_many(self, values):
+        """
+        指定された値のリストをまとめて浮動小数点数に変換する。
+
+        :param values: 変換対象の値のリスト
+        :type values: list
+        :return: 変換後の値のリスト
+        :rtype: list
+        """
+        # 文字列、浮動小数点数の要素は変換メソッドを呼び出さずに変換する
+        convert = self.convert
+        return [float(v) if v.__class__ is str else v if v.__class__ is float or v is None else convert(v)
+                for v in values]
+
+    def _convert_column(self, values):
+        """
+        コレクションの列とする値のリストをまとめて浮動小数点数に変換する。
+        NumPyがインストールされている場合、値がすべて揃った文字列のリストはNumPyでまとめてnumpy.ndarrayに変換する。
+
+        :param values: 変換対象の値のリスト
+        :type values: list
+        :return: 変換後の値のリストまたはnumpy.ndarray
+        :rtype: object
+        """
+        # NumPyでまとめて変換できる場合はその結果を返却する
+        converted = _convert_with_numpy(values, 'float64')
+        return converted if converted is not None else self.convert_many(values)
+
 
 class DateField(BaseField):
     """
     日付を表現するフィールドクラス。
     """
 
-    def __init__(self, name=None, fmt='%Y/%m/%d'):
+    def __init__(self, name=None, fmt=DATE_FORMAT, memo_size=None):
         """
         DateFieldを構築する。
+        既定のフォーマットの文字列はstrptime()を使用せずに変換する。
 
         :param name: 当フィールドが参照する項目のキー
         :type name: str
         :param fmt: 日付のフォーマット
         :type fmt: str
+        :param memo_size: 変換結果を記憶する文字列の最大数（省略した場合は記憶しない）
+        :type memo_size: int
         """
         # プロパティを設定する
         super().__init__(name)
         self._fmt = fmt
 
+        # フォーマットに応じた変換関数を選択する
+        if fmt == DATE_FORMAT:
+            self._parse = _parse_date
+        else:
+            self._parse = lambda text: datetime.datetime.strptime(text, fmt).date()
+        if memo_size:
+            self._parse = lru_cache(maxsize=memo_size)(self._parse)
+
     def convert(self, target):
         """
         指定された値を日付に変換する。
@@ -211,7 +399,27 @@ class DateField(BaseField):
             return target
 
         # 対象を日付に変換する
-        return datetime.datetime.strptime(str(target), self._fmt).date()
+        return self._parse(str(target))
+
+    def convert_many(self, values):
+        """
+        指定された値のリストをまとめて日付に変換する。
+        NumPyがインストールされている場合、既定のフォーマットの文字列のみのリストはdatetime64でまとめて変換する。
+
+        :param values: 変換対象の値のリスト
+        :type values: list
+        :return: 変換後の値のリスト
+        :rtype: list
+        """
+        # NumPyでまとめて変換できる場合はその結果を返却する
+        if self._parse is _parse_date:
+            converted = _convert_iso_with_numpy(values, _DATE_PATTERN, 'datetime64[D]')
+            if converted is not None:
+                return converted
+
+        # 文字列の要素は変換メソッドを呼び出さずに変換する
+        parse, convert = self._parse, self.convert
+        return [parse(v) if v.__class__ is str else None if v is None else convert(v) for v in values]
 
 
 class DateTimeField(BaseField):
@@ -219,19 +427,30 @@ class DateTimeField(BaseField):
     日時を表現するフィールドクラス。
     """
 
-    def __init__(self, name=None, fmt='%Y/%m/%d %H:%M:%S'):
+    def __init__(self, name=None, fmt=DATETIME_FORMAT, memo_size=None):
         """
         DateTimeFieldを構築する。
+        既定のフォーマットの文字列はstrptime()を使用せずに変換する。
 
         :param name: 当フィールドが参照する項目のキー
         :type name: str
         :param fmt: 日時のフォーマット
         :type fmt: str
+        :param memo_size: 変換結果を記憶する文字列の最大数（省略した場合は記憶しない）
+        :type memo_size: int
         """
         # プロパティを設定する
         super().__init__(name)
         self._fmt = fmt
 
+        # フォーマットに応じた変換関数を選択する
+        if fmt == DATETIME_FORMAT:
+            self._parse = _parse_datetime
+        else:
+            self._parse = lambda text: datetime.datetime.strptime(text, fmt)
+        if memo_size:
+            self._parse = lru_cache(maxsize=memo_size)(self._parse)
+
     def convert(self, target):
         """
         指定された値を日時に変換する。
@@ -246,4 +465,266 @@ class DateTimeField(BaseField):
             return target
 
         # 対象を日時に変換する
-        return datetime.datetime.strptime(str(target), self._fmt)
+        return self._parse(str(target))
+
+    def convert_many(self, values):
+        """
+        指定された値のリストをまとめて日時に変換する。
+        NumPyがインストールされている場合、既定のフォーマットの文字列のみのリストはdatetime64でまとめて変換する。
+
+        :param values: 変換対象の値のリスト
+        :type values: list
+        :return: 変換後の値のリスト
+        :rtype: list
+        """
+        # NumPyでまとめて変換できる場合はその結果を返却する
+        if self._parse is _parse_datetime:
+            converted = _convert_iso_with_numpy(values, _DATETIME_PATTERN, 'datetime64[s]')
+            if converted is not None:
+                return converted
+
+        # 文字列の要素は変換メソッドを呼び出さずに変換する
+        parse, convert = self._parse, self.convert
+        return [parse(v) if v.__class__ is str else None if v is None else convert(v) for v in values]
+
+
+class GeometryField(BaseField):
+    """
+    WKT形式のジオメトリを表現するフィールドクラス。
+    """
+
+    def __init__(self, name=None):
+        """
+        GeometryFieldを構築する。
+
+        :param name: 当フィールドが参照する項目のキー
+        :type name: str
+        """
+        # プロパティを設定する
+        super().__init__(name)
+
+    def convert(self, target):
+        """
+        指定された値をジオメトリに変換する。
+
+        :param target: 変換対象の値
+        :type target: object
+        :return: 変換後の値
+        :rtype: pyny.geometry.Geometry
+        """
+        # 対象がジオメトリの場合はそのまま返却する
+        if isinstance(target, Geometry):
+            return target
+
+        # 対象をジオメトリに変換する
+        return parse_wkt(str(target))
+
+    def convert_many(self, values):
+        """
+        指定された値のリストをまとめてジオメトリに変換する。
+        文字列のみのリストはpyny.geometry.parse_many()でまとめて解析する。
+
+        :param values: 変換対象の値のリスト
+        :type values: list
+        :return: 変換後の値のリスト
+        :rtype: list
+        """
+        # 文字列と値が存在しない要素のみの場合はまとめて解析する
+        if all(v.__class__ is str or v is None for v in values):
+            return parse_many(values)
+        return super().convert_many(values)
+
+
+class PointField(BaseField):
+    """
+    WKT形式のPOINTを表現するフィールドクラス。
+    """
+
+    def __init__(self, name=None):
+        """
+        PointFieldを構築する。
+
+        :param name: 当フィールドが参照する項目のキー
+        :type name: str
+        """
+        # プロパティを設定する
+        super().__init__(name)
+
+    def convert(self, target):
+        """
+        指定された値を点に変換する。
+
+        :param target: 変換対象の値
+        :type target: object
+        :return: 変換後の値
+        :rtype: pyny.geometry.Point
+        """
+        # 対象が点の場合はそのまま返却する
+        if isinstance(target, Point):
+            return target
+
+        # 対象を点に変換する
+        return parse_point(str(target))
+
+    def convert_many(self, values):
+        """
+        指定された値のリストをまとめて点に変換する。
+        文字列のみのリストはpyny.geometry.parse_many()でまとめて解析する。
+
+        :param values: 変換対象の値のリスト
+        :type values: list
+        :return: 変換後の値のリスト
+        :rtype: list
+        """
+        # 文字列と値が存在しない要素のみの場合はまとめて解析する
+        if all(v.__class__ is str or v is None for v in values):
+            return parse_many(values, point=True)
+        return super().convert_many(values)
+
+
+class CachedField(BaseField):
+    """
+    ほかのフィールドの変換結果を記憶するフィールドクラス。
+    分類名のように値の種類が少ない項目に使用すると、等しい値の変換結果が1つのオブジェクトを共有するため、
+    変換の負荷とメモリ使用量が小さくなる。変換結果が変更不可能なオブジェクトとなるフィールドに使用すること。
+    """
+
+    def __init__(self, field, maxsize=CACHE_SIZE, intern=True):
+        """
+        CachedFieldを構築する。
+        記憶した値の数がmaxsizeに達した場合、以降の値は記憶せずに変換する。
+
+        :param field: 変換を委譲するフィールド
+        :type field: BaseField
+        :param maxsize: 変換結果を記憶する値の最大数
+        :type maxsize: int
+        :param intern: 変換結果の文字列をインターンするかどうか
+        :type intern: bool
+        """
+        # プロパティを設定する
+        super().__init__(field.name)
+        self.field = field
+        self.maxsize = maxsize
+        self.intern = intern
+        self._memo = {}
+
+    def convert(self, target):
+        """
+        指定された値を委譲先のフィールドで変換する。
+        一度変換した値は記憶し、以降は同じオブジェクトを返却する。
+
+        :param target: 変換対象の値
+        :type target: object
+        :return: 変換後の値
+        :rtype: object
+        """
+        # 文字列はそのまま、それ以外は型と組み合わせてキーとする（1と1.0、Trueを区別する）
+        key = target if target.__class__ is str else (target.__class__, target)
+        try:
+            value = self._memo.get(key, self)
+        except TypeError:
+            # ハッシュ化できない値は記憶せずに変換する
+            return self._convert(target)
+        if value is not self:
+            return value
+
+        # 変換して記憶する
+        value = self._convert(target)
+        if len(self._memo) < self.maxsize:
+            self._memo[key] = value
+        return value
+
+    def _convert(self, target):
+        """
+        指定された値を委譲先のフィールドで変換し、文字列であればインターンする。
+
+        :param target: 変換対象の値
+        :type target: object
+        :return: 変換後の値
+        :rtype: object
+        """
+        # 委譲先のフィールドで変換する
+        value = self.field.convert(target)
+        if self.intern and value.__class__ is str:
+            value = sys.intern(value)
+        return value
+
+
+def _parse_date(text):
+    """
+    既定のフォーマットの文字列を日付に変換する。
+    桁数が既定のフォーマットと一致しない文字列はstrptime()で変換する。
+
+    :param text: 文字列
+    :type text: str
+    :return: 日付
+    :rtype: datetime.date
+    :raises ValueError: 日付化できない文字列が指定された
+    """
+    # 区切り文字を置き換えてISO 8601形式として変換する
+    if _DATE_PATTERN.fullmatch(text):
+        return _date_fromisoformat(text.replace('/', '-'))
+    return datetime.datetime.strptime(text, DATE_FORMAT).date()
+
+
+def _parse_datetime(text):
+    """
+    既定のフォーマットの文字列を日時に変換する。
+    桁数が既定のフォーマットと一致しない文字列はstrptime()で変換する。
+
+    :param text: 文字列
+    :type text: str
+    :return: 日時
+    :rtype: datetime.datetime
+    :raises ValueError: 日時化できない文字列が指定された
+    """
+    # 区切り文字を置き換えてISO 8601形式として変換する
+    if _DATETIME_PATTERN.fullmatch(text):
+        return _datetime_fromisoformat(text.replace('/', '-'))
+    return datetime.datetime.strptime(text, DATETIME_FORMAT)
+
+
+def _convert_with_numpy(values, dtype):
+    """
+    NumPyで文字列のリストをまとめて数値の配列に変換する。
+
+    :param values: 変換対象の値のリスト
+    :type values: list
+    :param dtype: 変換後の型
+    :type dtype: str
+    :return: 変換後の配列（NumPyで変換できない場合はNone）
+    :rtype: numpy.ndarray
+    """
+    # NumPyがインストールされていない場合、文字列以外や値が存在しない要素を含む場合は変換しない
+    if numpy is None or not values or values[0].__class__ is not str or None in values:
+        return None
+    try:
+        return numpy.array(values, dtype=dtype)
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+
+def _convert_iso_with_numpy(values, pattern, dtype):
+    """
+    NumPyで既定のフォーマットの文字列のリストをまとめて日付、日時に変換する。
+
+    :param values: 変換対象の値のリスト
+    :type values: list
+    :param pattern: 既定のフォーマットにマッチする正規表現
+    :type pattern: re.Pattern
+    :param dtype: 変換後の型
+    :type dtype: str
+    :return: 変換後の値のリスト（NumPyで変換できない場合はNone）
+    :rtype: list
+    """
+    # すべての要素が既定のフォーマットの文字列である場合のみ、ISO 8601形式に置き換えて変換する
+    # （datetime64は0年を扱えるが、datetimeは扱えないため、0年を含む場合は変換しない）
+    if numpy is None or not values:
+        return None
+    match = pattern.fullmatch
+    if not all(v.__class__ is str and match(v) for v in values) or min(values).startswith('0000'):
+        return None
+    try:
+        return numpy.array([v.replace('/', '-') for v in values], dtype=dtype).tolist()
+    except ValueError:
+        return None
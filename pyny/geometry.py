@@ -0,0 +1,393 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright 2015-2019 Jun-ya HASEBA
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+WKT（Well-Known Text）形式のジオメトリを解析するモジュール。
+正規表現を使用せず、括弧の位置を走査して座標の並びを切り出し、array.arrayにまとめて格納する。
+"""
+
+from array import array
+from collections import namedtuple
+
+
+# 点の座標（経度、緯度の順）
+Point = namedtuple('Point', ('x', 'y'))
+
+# 解析できるジオメトリの種類
+GEOMETRY_TYPES = ('POINT', 'LINESTRING', 'POLYGON', 'MULTIPOINT', 'MULTILINESTRING', 'MULTIPOLYGON')
+
+# 座標の次元を表す修飾子と、その次元数
+_DIMENSIONS = {'': 2, 'Z': 3, 'M': 3, 'ZM': 4}
+
+# ジオメトリの種類ごとの括弧の入れ子の深さ（座標の並びを囲む括弧を除く）
+_DEPTHS = {'POINT': 0, 'LINESTRING': 0, 'POLYGON': 1, 'MULTIPOINT': 0, 'MULTILINESTRING': 1, 'MULTIPOLYGON': 2}
+
+
+class Geometry:
+    """
+    解析したジオメトリ。
+    座標は次元数ごとに区切らずに並べたarray.array（'d'）に格納し、
+    POLYGONはリングのリスト、MULTI*はそれぞれの要素のリストとして保持する。
+    """
+    __slots__ = ('type', 'coordinates', 'dimensions')
+
+    def __init__(self, geometry_type, coordinates, dimensions=2):
+        """
+        Geometryを構築する。
+
+        :param geometry_type: ジオメトリの種類（'POINT'、'POLYGON'など）
+        :type geometry_type: str
+        :param coordinates: 座標（種類に応じた入れ子のリストとarray.array）
+        :type coordinates: object
+        :param dimensions: 座標の次元数
+        :type dimensions: int
+        """
+        # プロパティを設定する
+        self.type = geometry_type
+        self.coordinates = coordinates
+        self.dimensions = dimensions
+
+    def points(self):
+        """
+        ジオメトリを構成するすべての点を順に取得する。
+
+        :return: 点（x、y）のイテレータ
+        :rtype: generator
+        """
+        # 入れ子をたどって座標の並びを取り出す
+        stack = [self.coordinates]
+        while stack:
+            target = stack.pop()
+            if isinstance(target, array):
+                for i in range(0, len(target), self.dimensions):
+                    yield Point(target[i], target[i + 1])
+            else:
+                stack.extend(reversed(target))
+
+    def bounds(self):
+        """
+        ジオメトリを囲む矩形を取得する。
+
+        :return: 最小のx、最小のy、最大のx、最大のyのタプル（点が存在しない場合はNone）
+        :rtype: tuple
+        """
+        # すべての点の最小値と最大値を求める
+        points = list(self.points())
+        if not points:
+            return None
+        xs, ys = [p.x for p in points], [p.y for p in points]
+        return min(xs), min(ys), max(xs), max(ys)
+
+    def __eq__(self, other):
+        """
+        ジオメトリが等しいかどうかを判定する。
+
+        :param other: 比較対象
+        :type other: object
+        :return: 種類、座標、次元数がすべて等しい場合はTrue
+        :rtype: bool
+        """
+        # 各プロパティを比較する
+        if not isinstance(other, Geometry):
+            return NotImplemented
+        return (self.type, self.dimensions, self.coordinates) == (other.type, other.dimensions, other.coordinates)
+
+    def __hash__(self):
+        """
+        ジオメトリのハッシュ値を取得する。
+
+        :return: 種類、次元数、座標から求めたハッシュ値
+        :rtype: int
+        """
+        # 座標をタプルに変換してハッシュ値を求める
+        return hash((self.type, self.dimensions, _freeze(self.coordinates)))
+
+    def __repr__(self):
+        """
+        ジオメトリの文字列表現を取得する。
+
+        :return: 文字列表現
+        :rtype: str
+        """
+        # 種類と座標を返却する
+        return 'Geometry(%r, %r)' % (self.type, self.coordinates)
+
+
+def parse_wkt(text):
+    """
+    WKT形式の文字列を解析する。
+
+    :param text: WKT形式の文字列
+    :type text: str
+    :return: ジオメトリ
+    :rtype: Geometry
+    :raises ValueError: WKT形式の文字列として解析できない
+    """
+    # 最も多い「POINT(x y)」の形式は括弧の内側を直接分割する
+    if text.startswith('POINT(') and text.endswith(')'):
+        values = text[6:-1].split()
+        if len(values) == 2:
+            try:
+                return Geometry('POINT', array('d', (float(values[0]), float(values[1]))))
+            except ValueError:
+                pass
+
+    # 種類と次元を読み取る
+    start = text.find('(')
+    header = (text[:start] if start >= 0 else text).upper().split()
+    if not header or header[0] not in GEOMETRY_TYPES:
+        raise ValueError('invalid WKT: %r' % text[:50])
+    geometry_type = header[0]
+    modifier = ''.join(header[1:])
+    empty = modifier.endswith('EMPTY')
+    modifier = modifier[:-5] if empty else modifier
+    if modifier not in _DIMENSIONS:
+        raise ValueError('invalid WKT: %r' % text[:50])
+    dimensions = _DIMENSIONS[modifier]
+
+    # EMPTYの場合は空のジオメトリを返却する
+    if empty:
+        if start >= 0:
+            raise ValueError('invalid WKT: %r' % text[:50])
+        return Geometry(geometry_type, [] if _DEPTHS[geometry_type] else array('d'), dimensions)
+
+    # 座標を読み取る
+    if start < 0:
+        raise ValueError('invalid WKT: %r' % text[:50])
+    scanner = _Scanner(text, start, dimensions)
+    if geometry_type == 'MULTIPOINT':
+        coordinates = scanner.read_multipoint()
+    else:
+        coordinates = scanner.read(_DEPTHS[geometry_type])
+    scanner.finish()
+    if geometry_type == 'POINT' and len(coordinates) != dimensions:
+        raise ValueError('invalid WKT: %r' % text[:50])
+    return Geometry(geometry_type, coordinates, dimensions)
+
+
+def parse_point(text):
+    """
+    WKT形式のPOINTの文字列を解析する。
+
+    :param text: WKT形式の文字列
+    :type text: str
+    :return: 点
+    :rtype: Point
+    :raises ValueError: WKT形式のPOINTとして解析できない
+    """
+    # 「POINT(x y)」の形式は括弧の内側を直接分割する
+    if text.startswith('POINT(') and text.endswith(')'):
+        values = text[6:-1].split()
+        if len(values) == 2:
+            try:
+                return Point(float(values[0]), float(values[1]))
+            except ValueError:
+                pass
+
+    # それ以外の形式は汎用の解析を行う
+    geometry = parse_wkt(text)
+    if geometry.type != 'POINT' or not geometry.coordinates:
+        raise ValueError('not a POINT: %r' % text[:50])
+    return Point(geometry.coordinates[0], geometry.coordinates[1])
+
+
+def parse_many(texts, point=False):
+    """
+    WKT形式の文字列のリストをまとめて解析する。
+    「POINT(x y)」の形式は関数を呼び出さずにループの中で直接変換し、値が存在しない要素はNoneとする。
+
+    :param texts: WKT形式の文字列のリスト
+    :type texts: list
+    :param point: POINTとして解析するかどうか（Trueの場合はPoint、Falseの場合はGeometryのリストを返却する）
+    :type point: bool
+    :return: 解析結果のリスト
+    :rtype: list
+    :raises ValueError: WKT形式の文字列として解析できない要素が存在する
+    """
+    # 頻繁に参照する関数をローカル変数に束縛して順に解析する
+    parse = parse_point if point else parse_wkt
+    new_tuple = tuple.__new__
+    results = []
+    append = results.append
+    for text in texts:
+        if text is None:
+            append(None)
+            continue
+        if point and text[:6] == 'POINT(' and text[-1:] == ')':
+            values = text[6:-1].split()
+            if len(values) == 2:
+                try:
+                    append(new_tuple(Point, (float(values[0]), float(values[1]))))
+                    continue
+                except ValueError:
+                    pass
+        append(parse(text))
+    return results
+
+
+class _Scanner:
+    """
+    WKT形式の文字列の括弧の内側を走査する。
+    """
+
+    def __init__(self, text, pos, dimensions):
+        """
+        _Scannerを構築する。
+
+        :param text: WKT形式の文字列
+        :type text: str
+        :param pos: 走査を開始する位置（最初の開き括弧の位置）
+        :type pos: int
+        :param dimensions: 座標の次元数
+        :type dimensions: int
+        """
+        # プロパティを設定する
+        self.text = text
+        self.pos = pos
+        self.dimensions = dimensions
+
+    def read(self, depth):
+        """
+        現在の位置から、指定された深さの入れ子の括弧を読み取る。
+
+        :param depth: 座標の並びを囲む括弧を除いた入れ子の深さ
+        :type depth: int
+        :return: 深さが0の場合は座標の並び、それ以外の場合は要素のリスト
+        :rtype: object
+        """
+        # 座標の並びは閉じ括弧までをまとめて変換する
+        self._expect('(')
+        if depth == 0:
+            end = self.text.find(')', self.pos)
+            if end < 0:
+                raise self._error()
+            coordinates = self._to_array(self.text[self.pos:end])
+            self.pos = end + 1
+            return coordinates
+
+        # 入れ子の要素をカンマで区切って読み取る
+        items = [self.read(depth - 1)]
+        while self._skip() == ',':
+            self.pos += 1
+            items.append(self.read(depth - 1))
+        self._expect(')')
+        return items
+
+    def read_multipoint(self):
+        """
+        MULTIPOINTの座標を読み取る。
+        各点を括弧で囲む形式（MULTIPOINT((x y), (x y))）と囲まない形式の両方に対応する。
+
+        :return: 座標の並び
+        :rtype: array.array
+        """
+        # 点を括弧で囲まない形式は1つの座標の並びとして読み取る
+        save = self.pos
+        self._expect('(')
+        if self._skip() != '(':
+            self.pos = save
+            return self.read(0)
+
+        # 点ごとに読み取って連結する
+        coordinates = self.read(0)
+        while self._skip() == ',':
+            self.pos += 1
+            coordinates.extend(self.read(0))
+        self._expect(')')
+        return coordinates
+
+    def finish(self):
+        """
+        末尾に余分な文字が存在しないことを確認する。
+        """
+        # 空白以外が残っていればエラーとする
+        if self._skip():
+            raise self._error()
+
+    def _to_array(self, text):
+        """
+        カンマで区切った座標の並びを配列に変換する。
+
+        :param text: 座標の並び（括弧の内側）
+        :type text: str
+        :return: 座標の配列
+        :rtype: array.array
+        """
+        # 各点の次元数を確認して数値に変換する
+        values = []
+        dimensions = self.dimensions
+        for point in text.split(','):
+            point = point.split()
+            if len(point) != dimensions:
+                raise self._error()
+            values.extend(point)
+        try:
+            return array('d', map(float, values))
+        except ValueError:
+            raise self._error()
+
+    def _expect(self, char):
+        """
+        空白を読み飛ばし、現在の位置が指定された文字であることを確認して読み進める。
+
+        :param char: 文字
+        :type char: str
+        """
+        # 期待する文字でなければエラーとする
+        if self._skip() != char:
+            raise self._error()
+        self.pos += 1
+
+    def _skip(self):
+        """
+        空白を読み飛ばし、現在の位置の文字を取得する。
+
+        :return: 現在の位置の文字（末尾に達した場合は空文字列）
+        :rtype: str
+        """
+        # 空白以外の文字まで読み進める
+        text, pos = self.text, self.pos
+        while pos < len(text) and text[pos] in ' \t\r\n':
+            pos += 1
+        self.pos = pos
+        return text[pos:pos + 1]
+
+    def _error(self):
+        """
+        解析できない位置を示す例外を生成する。
+
+        :return: 例外
+        :rtype: ValueError
+        """
+        # 位置と前後の文字列を含める
+        return ValueError('invalid WKT at %d: %r' % (self.pos, self.text[max(self.pos - 20, 0):self.pos + 20]))
+
+
+def _freeze(coordinates):
+    """
+    入れ子のリストとarray.arrayで表した座標を、ハッシュ化できる入れ子のタプルに変換する。
+
+    :param coordinates: 座標
+    :type coordinates: object
+    :return: 入れ子のタプル
+    :rtype: tuple
+    """
+    # array.arrayはそのまま、リストは要素ごとにタプルに変換する
+    if isinstance(coordinates, array):
+        return tuple(coordinates)
+    return tuple(_freeze(c) for c in coordinates)
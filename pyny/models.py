@@ -16,15 +16,277 @@
 # limitations under the License.
 #
 
-from pyny import api
-from pyny.fields import BaseField
+from collections import OrderedDict
+import copy
+import keyword
 
+from pyny import aio, api
+from pyny.collection import ModelCollection
+from pyny.fields import (BaseField, DateField, DateTimeField, DecimalField, FloatField, GeometryField, IntegerField,
+                         PointField, StringField)
+from pyny.query import Query
+from pyny.spatial import SpatialIndex, points_of
 
-class Model:
+
+# 生成するコンストラクタで型の判定をインライン化するフィールドクラスと、その変換後の型
+_INLINE_TYPES = {StringField: 'str', IntegerField: 'int'}
+
+# 変換済みの値を再度変換しても同じ値を返却するため、JSONの解析時に変換してよいフィールドクラス
+_PRECONVERT_TYPES = (StringField, IntegerField, DecimalField, FloatField, DateField, DateTimeField, GeometryField,
+                     PointField)
+
+
+class ModelMeta(type):
+    """
+    モデルクラスのメタクラス。
+    クラスの生成時にフィールドを1度だけ収集し、インスタンスの構築に使用するマッピングの手順を組み立てる。
+    """
+
+    @classmethod
+    def __prepare__(mcs, name, bases, **kwargs):
+        """
+        クラス定義の名前空間を生成する。
+        フィールドを定義した順序を保持するため、順序付きの辞書を使用する。
+
+        :param name: クラス名
+        :type name: str
+        :param bases: 基底クラスのタプル
+        :type bases: tuple
+        :return: 名前空間
+        :rtype: collections.OrderedDict
+        """
+        # 順序付きの辞書を返却する
+        return OrderedDict()
+
+    def __new__(mcs, name, bases, namespace, compact=None, lazy=None, **kwargs):
+        """
+        モデルクラスを生成する。
+
+        :param name: クラス名
+        :type name: str
+        :param bases: 基底クラスのタプル
+        :type bases: tuple
+        :param namespace: 名前空間
+        :type namespace: collections.OrderedDict
+        :param compact: インスタンスの属性を__slots__に格納するかどうか（省略した場合は基底クラスの設定を引き継ぐ）
+        :type compact: bool
+        :param lazy: 値の変換を初回の参照時まで遅らせるかどうか（省略した場合は基底クラスの設定を引き継ぐ）
+        :type lazy: bool
+        :return: モデルクラス
+        :rtype: type
+        :raises TypeError: compactとlazyの両方が有効になっている
+        """
+        # 基底クラスのフィールドを先に、当クラスで定義したフィールドをあとに並べる
+        # （基底クラスのフィールドを再定義した場合は元の位置のまま置き換える）
+        fields = OrderedDict()
+        for base in reversed(bases):
+            fields.update(getattr(base, '_fields', {}))
+        for k, v in namespace.items():
+            if isinstance(v, BaseField):
+                fields[k] = v
+            elif k in fields:
+                # フィールド以外の属性で上書きされたフィールドは除外する
+                del fields[k]
+
+        # コンパクトなモデルではフィールドをクラス属性から__slots__に置き換える
+        namespace = dict(namespace)
+        if compact is None:
+            compact = any(getattr(base, '_compact', False) for base in bases)
+        if lazy is None:
+            lazy = any(getattr(base, '_lazy', False) for base in bases)
+        if compact and lazy:
+            raise TypeError('compact and lazy cannot be combined: %s' % name)
+        if lazy:
+            # 遅延変換ではフィールドから属性名を引くため、複数の属性に設定された同じフィールドは属性ごとに複製する
+            shared = set()
+            for k, v in fields.items():
+                if v in shared:
+                    fields[k] = namespace[k] = copy.copy(v)
+                shared.add(v)
+        if compact:
+            slotted = {k for base in bases for c in base.__mro__ for k in c.__dict__.get('__slots__', ())}
+            for k in fields:
+                namespace.pop(k, None)
+            namespace['__slots__'] = tuple(namespace.get('__slots__', ())) + tuple(k for k in fields if k not in slotted)
+            namespace.setdefault('__getstate__', _getstate)
+            namespace.setdefault('__setstate__', _setstate)
+        namespace['_compact'] = compact
+        namespace['_lazy'] = lazy
+
+        # フィールドとマッピングの手順をクラスに設定する
+        cls = super().__new__(mcs, name, bases, namespace, **kwargs)
+        cls._fields = fields
+        cls._plan = tuple((k, v.convert, _compile_path(v.name or k)) for k, v in fields.items())
+        cls._field_names = {v: k for k, v in fields.items()}
+
+        # 継承したものを含めて独自のコンストラクタを持たないクラスには、専用のコンストラクタと、
+        # JSONの解析時に適用するスキーマを生成する
+        # （独自のコンストラクタはフィールド以外の項目を参照する可能性があるため、スキーマを適用しない）
+        cls._schema = None
+        if '__init__' not in namespace and _is_default_init(cls.__init__):
+            cls.__init__ = _make_init(cls)
+            cls._schema = api.Schema(
+                (keys, v.convert if type(v) in _PRECONVERT_TYPES and not lazy else None)
+                for (_, _, keys), v in zip(cls._plan, fields.values())
+            )
+        return cls
+
+    def __init__(cls, name, bases, namespace, compact=None, lazy=None, **kwargs):
+        """
+        モデルクラスを初期化する。
+
+        :param name: クラス名
+        :type name: str
+        :param bases: 基底クラスのタプル
+        :type bases: tuple
+        :param namespace: 名前空間
+        :type namespace: collections.OrderedDict
+        :param compact: インスタンスの属性を__slots__に格納するかどうか
+        :type compact: bool
+        :param lazy: 値の変換を初回の参照時まで遅らせるかどうか
+        :type lazy: bool
+        """
+        # compact、lazy以外の引数を引き渡す
+        super().__init__(name, bases, namespace, **kwargs)
+
+
+def _getstate(self):
+    """
+    コンパクトなモデルのインスタンスをpickleで保存する際の状態を取得する。
+
+    :return: フィールド名をキーとした辞書
+    :rtype: dict
+    """
+    # 設定されているフィールドの値を辞書にまとめる
+    return {k: getattr(self, k) for k in self._fields if hasattr(self, k)}
+
+
+def _setstate(self, state):
+    """
+    pickleから復元したコンパクトなモデルのインスタンスに状態を設定する。
+
+    :param state: フィールド名をキーとした辞書
+    :type state: dict
+    """
+    # 各フィールドに値を設定する
+    for k, v in state.items():
+        setattr(self, k, v)
+
+
+def _compile_path(name):
+    """
+    フィールドが参照する項目のキーを、辞書を探索するためのパスに変換する。
+    キーはドットで区切り、数字のみの要素はリストのインデックスとして整数に変換する。
+
+    :param name: 項目のキー（例: 'attrs.attr7'、'files.0.url'）
+    :type name: str
+    :return: キーのパス
+    :rtype: tuple
+    """
+    # ドットで分割し、数字のみの要素を整数に変換する
+    return tuple(int(key) if key.isdigit() else key for key in name.split('.'))
+
+
+def _get_index(data, index):
+    """
+    指定されたリストから指定されたインデックスの値を取得する。
+    辞書が指定された場合はインデックスを文字列にしたキーで探索する。
+
+    :param data: 探索対象のリストまたは辞書
+    :type data: list
+    :param index: インデックス
+    :type index: int
+    :return: 取得した値（インデックスが範囲外の場合はNone）
+    :rtype: object
+    """
+    # リストの場合は範囲内のインデックスのみ参照する
+    if isinstance(data, (list, tuple)):
+        return data[index] if index < len(data) else None
+    return data.get(str(index))
+
+
+def _make_init(cls):
+    """
+    指定されたモデルクラス専用のコンストラクタを生成する。
+    フィールドごとに辞書の探索、型の判定、属性への代入を直接記述したソースコードを組み立ててコンパイルする。
+    当クラス以外（独自のコンストラクタを定義したサブクラスなど）から呼び出された場合はModel.__init__()に処理を委ねる。
+
+    :param cls: モデルクラス
+    :type cls: type
+    :return: コンストラクタ
+    :rtype: function
+    """
+    # 関数から参照する変換メソッドなどを名前空間に登録する
+    namespace = {'_cls': cls, '_generic_init': Model.__init__, '_get_index': _get_index}
+    lines = [
+        'def __init__(self, data):',
+        '    if self.__class__ is not _cls:',
+        '        return _generic_init(self, data)',
+        '    if not data:',
+        '        data = {}',
+    ]
+    if cls._lazy:
+        lines.append('    raw = {}')
+    for i, (k, field) in enumerate(cls._fields.items()):
+        # キーのパスに沿って値を取得する
+        for j, key in enumerate(_compile_path(field.name or k)):
+            if isinstance(key, int):
+                access = '_get_index(%s, %d)' % ('data' if j == 0 else 'v', key)
+            else:
+                access = '%s.get(%r)' % ('data' if j == 0 else 'v', key)
+            lines.append('    v = %s' % access if j == 0 else '    v = %s if v else None' % access)
+
+        # 遅延変換するモデルでは変換前の値を保持する
+        if cls._lazy:
+            lines.append('    raw[%r] = v' % k)
+            continue
+
+        # 値を変換する（文字列、整数はすでに変換後の型であれば変換メソッドを呼び出さない）
+        namespace['_convert%d' % i] = field.convert
+        value = 'None if v is None else _convert%d(v)' % i
+        if type(field) in _INLINE_TYPES:
+            value = 'v if v.__class__ is %s else %s' % (_INLINE_TYPES[type(field)], value)
+
+        # 属性に値を代入する
+        if k.isidentifier() and not keyword.iskeyword(k):
+            lines.append('    self.%s = %s' % (k, value))
+        else:
+            lines.append('    setattr(self, %r, %s)' % (k, value))
+
+    if cls._lazy:
+        lines.append('    self._raw = raw')
+
+    # ソースコードをコンパイルして関数を取り出す
+    exec(compile('\n'.join(lines), '<pyny.models %s.__init__>' % cls.__qualname__, 'exec'), namespace)
+    init = namespace['__init__']
+    init.__qualname__ = '%s.__init__' % cls.__qualname__
+    init.__doc__ = Model.__init__.__doc__
+    init._generated = True
+    return init
+
+
+def _is_default_init(init):
+    """
+    指定されたコンストラクタが、Model.__init__()または_make_init()で生成したコンストラクタかどうかを判定する。
+
+    :param init: コンストラクタ
+    :type init: function
+    :return: Model.__init__()または生成したコンストラクタの場合はTrue
+    :rtype: bool
+    """
+    # 生成したコンストラクタには目印の属性を設定している
+    return init is Model.__init__ or getattr(init, '_generated', False)
+
+
+class Model(metaclass=ModelMeta):
     """
     JSONをマッピングするモデルのスーパークラス。
     モデルクラスを定義する場合は当クラスを継承すること。
+    基底クラスで定義したフィールドも継承される。
+    クラスの定義時にcompact=Trueを指定すると、インスタンスの属性を__dict__ではなく__slots__に格納する。
+    lazy=Trueを指定すると、各フィールドの値は初回の参照時に変換される。
     """
+    __slots__ = ()
 
     def __init__(self, data):
         """
@@ -33,16 +295,15 @@ class Model:
         :param data: マッピング対象のJSON
         :type data: dict
         """
-        # JSONをモデルにマッピングする
-        for k, v in self.__class__.__dict__.items():
-            # フィールドクラス以外は無視する
-            if not isinstance(v, BaseField):
-                continue
+        # 遅延変換するモデルでは変換前の値のみを保持する
+        if self._lazy:
+            self._raw = {k: self._get_value(data, keys) for k, _, keys in self._plan}
+            return
 
-            # プロパティに値を設定する
-            field_name = v.name or k
-            value = self._get_value(data, field_name)
-            setattr(self, k, v.convert(value) if value is not None else None)
+        # クラスの生成時に組み立てた手順に従ってJSONをモデルにマッピングする
+        for k, convert, keys in self._plan:
+            value = self._get_value(data, keys)
+            setattr(self, k, convert(value) if value is not None else None)
 
     @classmethod
     def get_by_id(cls, layer_id, feature_id):
@@ -63,6 +324,28 @@ class Model:
         else:
             return None
 
+    @classmethod
+    def get_by_ids(cls, layer_id, feature_ids, as_dict=False):
+        """
+        指定されたレイヤID、複数の項目IDにマッチするデータをまとめて取得する。
+
+        :param layer_id: レイヤID
+        :type layer_id: str
+        :param feature_ids: 項目IDのリスト
+        :type feature_ids: list
+        :param as_dict: 項目IDをキーとした辞書で返却するかどうか
+        :type as_dict: bool
+        :return: 項目IDと同じ順序で並べたモデルのリスト（マッチしない項目IDの位置はNone）、
+                 as_dictがTrueの場合は項目IDをキーとした辞書
+        :rtype: list
+        """
+        # 条件に合致するデータを取得する
+        all_data = api.get_by_ids(layer_id, feature_ids, as_dict)
+        if as_dict:
+            return {k: cls(v) if v else None for k, v in all_data.items()}
+        else:
+            return [cls(data) if data else None for data in all_data]
+
     @classmethod
     def get_data(cls, layer_id, count):
         """
@@ -75,38 +358,218 @@ class Model:
         :return: マッピングされたモデルのリスト
         :rtype: list
         """
-        # 条件に合致するデータを取得する
-        return [cls(data) for data in api.get_data(layer_id, count)]
+        # 条件に合致するデータをスキーマを適用して取得する
+        return [cls(data) for data in api.get_data(layer_id, count, cls._schema)]
 
     @classmethod
     def get_all_data(cls, layer_id):
         """
         指定されたレイヤIDにマッチするすべてのデータを取得する。
+        スキーマを適用して取得したデータはpyny.api.layer_cacheにキャッシュされ、有効期間内であれば再利用される。
+        モデルは呼び出しごとにマッピングするため、変更してもキャッシュには影響しない。
 
         :param layer_id: レイヤID
         :type layer_id: str
         :return: マッピングされたモデルのリスト
         :rtype: list
         """
+        # 独自のコンストラクタを持つモデルは、複製されたデータからマッピングする
+        # （独自のコンストラクタはデータを変更したり保持したりする可能性があるため）
+        if cls._schema is None:
+            return [cls(data) for data in api.get_all_data(layer_id)]
+
+        # キャッシュされたデータを探索し、なければ取得してからマッピングする
+        records = api.layer_cache.get((layer_id, cls))
+        if records is None:
+            records = api.single_flight.do((layer_id, cls), cls._load_all_data, layer_id)
+        return [cls(data) for data in records]
+
+    @classmethod
+    def get_collection(cls, layer_id):
+        """
+        指定されたレイヤIDにマッチするすべてのデータを、フィールドごとの列にまとめたコレクションとして取得する。
+        構築したコレクションはpyny.api.layer_cacheにキャッシュされ、有効期間内であれば再利用される。
+
+        :param layer_id: レイヤID
+        :type layer_id: str
+        :return: コレクション
+        :rtype: pyny.collection.ModelCollection
+        """
+        # キャッシュされたコレクションを探索し、なければ構築する
+        collection = api.layer_cache.get((layer_id, cls, ModelCollection))
+        if collection is None:
+            collection = api.single_flight.do((layer_id, cls, ModelCollection), cls._build_collection, layer_id)
+        return collection
+
+    @classmethod
+    def query(cls, layer_id):
+        """
+        指定されたレイヤIDにマッチするすべてのデータに対するクエリを取得する。
+        クエリが構築したインデックスはキャッシュされたコレクションに保持され、以降のクエリで再利用される。
+
+        :param layer_id: レイヤID
+        :type layer_id: str
+        :return: クエリ
+        :rtype: pyny.query.Query
+        """
+        # コレクションに対するクエリを生成する
+        return Query(cls.get_collection(layer_id))
+
+    @classmethod
+    def get_spatial_index(cls, layer_id, field=None, lat=None, lon=None):
+        """
+        指定されたレイヤIDにマッチするすべてのデータの座標から空間インデックスを取得する。
+        座標はPointFieldまたはGeometryFieldのフィールド名か、緯度と経度のフィールド名の組で指定する。
+        構築したインデックスはpyny.api.layer_cacheにキャッシュされ、有効期間内であれば再利用される。
+
+        :param layer_id: レイヤID
+        :type layer_id: str
+        :param field: PointFieldまたはGeometryFieldのフィールド名
+        :type field: str
+        :param lat: 緯度のフィールド名（fieldを省略した場合）
+        :type lat: str
+        :param lon: 経度のフィールド名（fieldを省略した場合）
+        :type lon: str
+        :return: 空間インデックス
+        :rtype: pyny.spatial.SpatialIndex
+        """
+        # キャッシュされたインデックスを探索し、なければ構築する
+        key = (layer_id, cls, SpatialIndex, field, lat, lon)
+        index = api.layer_cache.get(key)
+        if index is None:
+            index = api.single_flight.do(key, cls._build_spatial_index, key)
+        return index
+
+    @classmethod
+    def iter_all_data(cls, layer_id):
+        """
+        指定されたレイヤIDにマッチするすべてのデータを、レスポンスの受信と並行して1件ずつ返却する。
+
+        :param layer_id: レイヤID
+        :type layer_id: str
+        :return: マッピングされたモデルのイテレータ
+        :rtype: generator
+        """
+        # 条件に合致するデータを1件ずつマッピングする
+        for data in api.iter_all_data(layer_id, cls._schema):
+            yield cls(data)
+
+    @classmethod
+    async def aget_by_id(cls, layer_id, feature_id):
+        """
+        指定されたレイヤID、項目IDにマッチするデータを非同期に取得する。
+
+        :param layer_id: レイヤID
+        :type layer_id: str
+        :param feature_id: 項目ID
+        :type feature_id: int
+        :return: マッチするデータが存在する場合はそのデータ、存在しない場合はNone
+        :rtype: Model
+        """
         # 条件に合致するデータを取得する
-        return [cls(data) for data in api.get_all_data(layer_id)]
+        data = await aio.get_by_id(layer_id, feature_id)
+        if data:
+            return cls(data)
+        else:
+            return None
 
-    def _get_value(self, data, key):
+    @classmethod
+    async def aget_data(cls, layer_id, count):
         """
-        指定された辞書から指定されたキーに対応する値を取得する。
-        キーにドットが含まれる場合はドットをキーの区切り文字として再帰的に辞書を探索する。
+        指定されたレイヤIDにマッチするデータを指定された件数ぶん非同期に取得する。
+
+        :param layer_id: レイヤID
+        :type layer_id: str
+        :param count: 件数
+        :type count: int
+        :return: マッピングされたモデルのリスト
+        :rtype: list
+        """
+        # 条件に合致するデータを取得する
+        return [cls(data) for data in await aio.get_data(layer_id, count, cls._schema)]
+
+    @classmethod
+    async def aget_all_data(cls, layer_id):
+        """
+        指定されたレイヤIDにマッチするすべてのデータを非同期に取得する。
+
+        :param layer_id: レイヤID
+        :type layer_id: str
+        :return: マッピングされたモデルのリスト
+        :rtype: list
+        """
+        # 条件に合致するデータを取得する
+        return [cls(data) for data in await aio.get_all_data(layer_id, cls._schema)]
+
+    @classmethod
+    def _load_all_data(cls, layer_id):
+        """
+        指定されたレイヤIDにマッチするすべてのデータを、マッピングする前の状態で取得する。
+        レイヤインデックスがキャッシュされていなければ、スキーマを適用して取得したデータをキャッシュする。
+
+        :param layer_id: レイヤID
+        :type layer_id: str
+        :return: 辞書にまとめられたデータのリスト
+        :rtype: list
+        """
+        # キャッシュされたレイヤインデックスがあれば、そのデータを複製せずに使用する
+        index = api.layer_cache.get((layer_id, api.LayerIndex))
+        if index is not None:
+            return index.records
+
+        # スキーマを適用して取得したすべてのデータをキャッシュする
+        records = api.get_all_data(layer_id, cls._schema)
+        api.layer_cache.set((layer_id, cls), records)
+        return records
+
+    @classmethod
+    def _build_collection(cls, layer_id):
+        """
+        指定されたレイヤIDにマッチするすべてのデータからコレクションを構築し、キャッシュする。
+
+        :param layer_id: レイヤID
+        :type layer_id: str
+        :return: コレクション
+        :rtype: pyny.collection.ModelCollection
+        """
+        # すべてのデータから列を構築してキャッシュする
+        collection = ModelCollection.from_records(cls, api.get_all_data(layer_id, cls._schema))
+        api.layer_cache.set((layer_id, cls, ModelCollection), collection)
+        return collection
+
+    @classmethod
+    def _build_spatial_index(cls, key):
+        """
+        キャッシュのキーに指定されたレイヤID、フィールド名から空間インデックスを構築し、キャッシュする。
+
+        :param key: キャッシュのキー
+        :type key: tuple
+        :return: 空間インデックス
+        :rtype: pyny.spatial.SpatialIndex
+        """
+        # コレクションの列から座標を取り出してインデックスを構築する
+        layer_id, field, lat, lon = key[0], key[3], key[4], key[5]
+        collection = cls.get_collection(layer_id)
+        index = SpatialIndex(points_of(collection, field, lat, lon), collection)
+        api.layer_cache.set(key, index)
+        return index
+
+    @staticmethod
+    def _get_value(data, keys):
+        """
+        指定された辞書から指定されたキーのパスに対応する値を取得する。
+        パスの途中の値が存在しない場合はNoneを返却する。
 
         :param data: 探索対象の辞書
         :type data: dict
-        :param key: キー
-        :type key: str
+        :param keys: _compile_path()で変換したキーのパス
+        :type keys: tuple
         :return: 辞書から取得した値
         :rtype: object
         """
-        # 辞書を再帰的に探索する
-        if '.' in key:
-            new_keys = key.split('.', 1)
-            new_data = data.get(new_keys[0])
-            return self._get_value(new_data, new_keys[1]) if new_data else None
-        else:
-            return data.get(key)
+        # パスに沿って辞書、リストを順に探索する
+        for key in keys:
+            if not data:
+                return None
+            data = _get_index(data, key) if isinstance(key, int) else data.get(key)
+        return data
@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright 2015-2019 Jun-ya HASEBA
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import base64
+from contextlib import contextmanager
+import http.client
+import sys
+import threading
+from urllib.parse import unquote, urljoin, urlsplit
+from urllib.request import getproxies, proxy_bypass
+
+
+# リダイレクトとして扱うステータスコード
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+# リダイレクトを追跡する最大回数
+MAX_REDIRECTS = 5
+
+# リクエストに付与するUser-Agent（urllib.request.urlopenと同じ値）
+USER_AGENT = 'Python-urllib/%d.%d' % sys.version_info[:2]
+
+# 再利用したコネクションが切断されていた場合に送出される例外
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class HttpError(Exception):
+    """
+    HTTPリクエストが正常なステータスコードで完了しなかったことを示す例外。
+    """
+
+    def __init__(self, url, status, reason):
+        """
+        HttpErrorを構築する。
+
+        :param url: URL
+        :type url: str
+        :param status: ステータスコード
+        :type status: int
+        :param reason: ステータスの説明
+        :type reason: str
+        """
+        # プロパティを設定する
+        super().__init__('HTTP Error %d: %s (%s)' % (status, reason, url))
+        self.url = url
+        self.status = status
+        self.reason = reason
+
+
+class ConnectionPool:
+    """
+    ホストごとにkeep-aliveのコネクションを保持するHTTPコネクションプール。
+    複数のスレッドから同時に利用することができる。
+    プロキシが設定されている場合は、HTTPのURLには絶対URIで、HTTPSのURLにはCONNECTのトンネルを経由してアクセスする。
+    """
+
+    def __init__(self, maxsize=10, timeout=30, block=False, proxies=None):
+        """
+        ConnectionPoolを構築する。
+
+        :param maxsize: ホストごとに保持するコネクションの最大数
+        :type maxsize: int
+        :param timeout: ソケットのタイムアウト（秒）
+        :type timeout: float
+        :param block: ホストごとの同時接続数がmaxsizeに達した場合に空きを待つかどうか
+        :type block: bool
+        :param proxies: スキームをキーとするプロキシのURL（省略時はurllib.request.getproxies()の値）
+        :type proxies: dict
+        """
+        # プロパティを設定する
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.block = block
+        self.proxies = getproxies() if proxies is None else proxies
+        self._proxies = {
+            scheme: _parse_proxy(self.proxies[scheme]) for scheme in ('http', 'https') if self.proxies.get(scheme)
+        }
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._slots = {}
+
+    @contextmanager
+    def urlopen(self, url, headers=None):
+        """
+        指定されたURLにGETでアクセスし、レスポンスを返却するコンテキストマネージャ。
+        レスポンスを最後まで読み込んだコネクションはブロックを抜ける際にプールへ返却される。
+
+        :param url: URL
+        :type url: str
+        :param headers: リクエストヘッダ
+        :type headers: dict
+        :return: レスポンス
+        :rtype: http.client.HTTPResponse
+        :raises HttpError: ステータスコードが正常ではなかった
+        """
+        # リダイレクトを追跡しながらレスポンスを取得する
+        for _ in range(MAX_REDIRECTS + 1):
+            key, path = self._parse_url(url)
+            conn, response = self._request(key, path, headers or {})
+            if response.status in REDIRECT_STATUSES and response.getheader('Location'):
+                response.read()
+                self._release(key, conn, response)
+                url = urljoin(url, response.getheader('Location'))
+                continue
+            break
+        else:
+            # 最後のレスポンスのコネクションはループ内で返却済み
+            raise HttpError(url, response.status, 'Too many redirects')
+
+        # レスポンスを呼び出し元に渡し、終了後にコネクションを返却する
+        try:
+            if response.status >= 400 or (response.status >= 300 and response.status != 304):
+                raise HttpError(url, response.status, response.reason)
+            yield response
+        finally:
+            self._release(key, conn, response)
+
+    def clear(self):
+        """
+        プールに保持しているすべてのコネクションを切断する。
+        """
+        # 保持しているコネクションを切断する
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+    def _parse_url(self, url):
+        """
+        指定されたURLをプールのキーとリクエストパスに分解する。
+
+        :param url: URL
+        :type url: str
+        :return: プールのキー（スキーム、ホスト、ポート、プロキシ）とリクエストパスのタプル
+        :rtype: tuple
+        :raises ValueError: URLがHTTPのURLではなかった
+        """
+        # URLを分解する
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError('unknown url type: %r' % url)
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+
+        # 除外対象ではないホストにはプロキシを経由してアクセスする
+        proxy = self._proxies.get(parts.scheme)
+        if proxy is not None and proxy_bypass(parts.hostname):
+            proxy = None
+        if proxy is not None and parts.scheme == 'http':
+            path = '%s://%s%s' % (parts.scheme, parts.netloc.rpartition('@')[2], path)
+        return (parts.scheme, parts.hostname, port, proxy), path
+
+    def _request(self, key, path, headers):
+        """
+        プールから取り出したコネクションでリクエストを送信する。
+        再利用したコネクションがサーバ側で切断されていた場合は新しいコネクションで再送する。
+
+        :param key: プールのキー
+        :type key: tuple
+        :param path: リクエストパス
+        :type path: str
+        :param headers: リクエストヘッダ
+        :type headers: dict
+        :return: コネクションとレスポンスのタプル
+        :rtype: tuple
+        """
+        # User-Agentと、HTTPのプロキシの認証情報をヘッダに付与する
+        headers = dict({'User-Agent': USER_AGENT}, **headers)
+        scheme, _, _, proxy = key
+        if scheme == 'http' and proxy is not None and proxy[2] is not None:
+            headers['Proxy-Authorization'] = proxy[2]
+
+        # コネクションを取り出してリクエストを送信する
+        conn, reused = self._checkout(key)
+        try:
+            try:
+                conn.request('GET', path, headers=headers)
+                return conn, conn.getresponse()
+            except _STALE_CONNECTION_ERRORS:
+                if not reused:
+                    raise
+                conn.close()
+                conn.request('GET', path, headers=headers)
+                return conn, conn.getresponse()
+        except BaseException:
+            conn.close()
+            self._checkin(key, None)
+            raise
+
+    def _checkout(self, key):
+        """
+        指定されたキーのコネクションをプールから取り出す。
+        保持しているコネクションがない場合は新たに生成する。
+
+        :param key: プールのキー
+        :type key: tuple
+        :return: コネクションと再利用したかどうかのタプル
+        :rtype: tuple
+        """
+        # 同時接続数の上限に達している場合は空きを待つ
+        if self.block:
+            with self._lock:
+                slot = self._slots.get(key)
+                if slot is None:
+                    slot = self._slots[key] = threading.BoundedSemaphore(self.maxsize)
+            slot.acquire()
+
+        # 保持しているコネクションがあれば再利用する
+        with self._lock:
+            conns = self._idle.get(key)
+            if conns:
+                return conns.pop(), True
+
+        # 新しいコネクションを生成する
+        scheme, host, port, proxy = key
+        if proxy is None:
+            if scheme == 'https':
+                return http.client.HTTPSConnection(host, port, timeout=self.timeout), False
+            return http.client.HTTPConnection(host, port, timeout=self.timeout), False
+
+        # プロキシへのコネクションを生成し、HTTPSの場合はトンネルを設定する
+        proxy_host, proxy_port, auth = proxy
+        if scheme == 'https':
+            conn = http.client.HTTPSConnection(proxy_host, proxy_port, timeout=self.timeout)
+            conn.set_tunnel(host, port, headers={'Proxy-Authorization': auth} if auth is not None else None)
+            return conn, False
+        return http.client.HTTPConnection(proxy_host, proxy_port, timeout=self.timeout), False
+
+    def _checkin(self, key, conn):
+        """
+        指定されたコネクションをプールに返却する。
+
+        :param key: プールのキー
+        :type key: tuple
+        :param conn: コネクション（破棄した場合はNone）
+        :type conn: http.client.HTTPConnection
+        """
+        # 上限に達していなければコネクションを保持する
+        if conn is not None:
+            with self._lock:
+                conns = self._idle.setdefault(key, [])
+                if len(conns) < self.maxsize:
+                    conns.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+
+        # 同時接続数の枠を解放する
+        if self.block:
+            self._slots[key].release()
+
+    def _release(self, key, conn, response):
+        """
+        レスポンスの状態に応じてコネクションをプールに返却するか切断する。
+
+        :param key: プールのキー
+        :type key: tuple
+        :param conn: コネクション
+        :type conn: http.client.HTTPConnection
+        :param response: レスポンス
+        :type response: http.client.HTTPResponse
+        """
+        # 読み残しのないkeep-aliveのコネクションのみ再利用する
+        if response.isclosed() and not response.will_close:
+            self._checkin(key, conn)
+        else:
+            response.close()
+            conn.close()
+            self._checkin(key, None)
+
+
+def _parse_proxy(proxy):
+    """
+    プロキシのURLをホスト、ポート、認証ヘッダの値に分解する。
+
+    :param proxy: プロキシのURL
+    :type proxy: str
+    :return: ホスト、ポート、Proxy-Authorizationヘッダの値（認証情報がない場合はNone）のタプル
+    :rtype: tuple
+    :raises ValueError: プロキシのURLが不正だった
+    """
+    # スキームが省略されている場合はHTTPのプロキシとして扱う
+    parts = urlsplit(proxy if '://' in proxy else 'http://' + proxy)
+    if not parts.hostname:
+        raise ValueError('proxy URL with no authority: %r' % proxy)
+
+    # 認証情報があればBasic認証のヘッダの値を生成する
+    auth = None
+    if parts.username is not None:
+        credentials = '%s:%s' % (unquote(parts.username), unquote(parts.password or ''))
+        auth = 'Basic ' + base64.b64encode(credentials.encode('utf-8')).decode('ascii')
+    return parts.hostname, parts.port or 80, auth
@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright 2015-2019 Jun-ya HASEBA
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+ModelCollectionに対して絞り込み、並べ替え、値の取り出しを行うクエリを提供するモジュール。
+等価条件で使用したフィールドにはハッシュインデックスを、範囲条件で使用したフィールドにはソート済みインデックスを構築し、
+コレクションに保持して以降のクエリで再利用する。
+"""
+
+from bisect import bisect_left, bisect_right
+
+
+# 比較演算子と、その条件を満たすかどうかを判定する関数
+_LOOKUPS = {
+    'exact': lambda value, arg: value == arg,
+    'in': lambda value, arg: value in arg,
+    'gt': lambda value, arg: value is not None and value > arg,
+    'gte': lambda value, arg: value is not None and value >= arg,
+    'lt': lambda value, arg: value is not None and value < arg,
+    'lte': lambda value, arg: value is not None and value <= arg,
+}
+
+
+class Query:
+    """
+    ModelCollectionに対するクエリ。
+    filter()、order_by()は新しいクエリを返却するため、メソッドを連結して条件を組み立てる。
+    """
+
+    def __init__(self, collection, conditions=(), ordering=()):
+        """
+        Queryを構築する。
+
+        :param collection: 対象のコレクション
+        :type collection: pyny.collection.ModelCollection
+        :param conditions: フィールド名、比較演算子、値のタプルのタプル
+        :type conditions: tuple
+        :param ordering: 並べ替えに使用するフィールド名のタプル（降順の場合は先頭に'-'を付与）
+        :type ordering: tuple
+        """
+        # プロパティを設定する
+        self.collection = collection
+        self._conditions = conditions
+        self._ordering = ordering
+        self._positions = None
+
+    def filter(self, **kwargs):
+        """
+        指定された条件で絞り込んだクエリを取得する。
+        条件は「フィールド名=値」または「フィールド名__比較演算子=値」の形式で指定する。
+        比較演算子にはexact、in、gt、gte、lt、lteを使用できる。
+
+        :return: クエリ
+        :rtype: Query
+        :raises ValueError: 存在しないフィールド名、比較演算子が指定された
+        """
+        # 条件を解釈して追加する
+        conditions = list(self._conditions)
+        for key, value in sorted(kwargs.items()):
+            name, _, lookup = key.partition('__')
+            lookup = lookup or 'exact'
+            if name not in self.collection.columns:
+                raise ValueError('unknown field: %s' % name)
+            if lookup not in _LOOKUPS:
+                raise ValueError('unknown lookup: %s' % lookup)
+            conditions.append((name, lookup, value))
+        return self.__class__(self.collection, tuple(conditions), self._ordering)
+
+    def order_by(self, *names):
+        """
+        指定されたフィールドで並べ替えたクエリを取得する。
+        降順に並べ替える場合はフィールド名の先頭に'-'を付与する。値が存在しない行は末尾に並べる。
+
+        :return: クエリ
+        :rtype: Query
+        :raises ValueError: 存在しないフィールド名が指定された
+        """
+        # フィールド名を検証して並べ替えの条件を置き換える
+        for name in names:
+            if name.lstrip('-') not in self.collection.columns:
+                raise ValueError('unknown field: %s' % name.lstrip('-'))
+        return self.__class__(self.collection, self._conditions, names)
+
+    def values(self, *names):
+        """
+        条件に合致する行の値を辞書のリストとして取得する。
+
+        :return: フィールド名をキーとした辞書のリスト（フィールド名を省略した場合はすべてのフィールド）
+        :rtype: list
+        """
+        # 行ごとに指定されたフィールドの値を辞書にまとめる
+        names = names or tuple(self.collection.columns)
+        getters = [(name, self._getter(name)) for name in names]
+        return [{name: get(i) for name, get in getters} for i in self._get_positions()]
+
+    def first(self):
+        """
+        条件に合致する最初の行のモデルを取得する。
+
+        :return: モデル（合致する行が存在しない場合はNone）
+        :rtype: pyny.models.Model
+        """
+        # 最初の行のみモデルを構築する
+        positions = self._get_positions()
+        return self.collection[positions[0]] if positions else None
+
+    def count(self):
+        """
+        条件に合致する行数を取得する。
+
+        :return: 行数
+        :rtype: int
+        """
+        # 行番号の数を返却する
+        return len(self._get_positions())
+
+    def __iter__(self):
+        """
+        条件に合致する行のモデルを順に構築して返却する。
+
+        :return: モデルのイテレータ
+        :rtype: generator
+        """
+        # 行ごとにモデルを構築する
+        for i in self._get_positions():
+            yield self.collection[i]
+
+    def __len__(self):
+        """
+        条件に合致する行数を取得する。
+
+        :return: 行数
+        :rtype: int
+        """
+        # 行数を返却する
+        return self.count()
+
+    def _get_positions(self):
+        """
+        条件に合致する行の行番号を、並べ替えた順序で取得する。
+
+        :return: 行番号のリスト
+        :rtype: list
+        """
+        # 一度求めた行番号は再利用する
+        if self._positions is None:
+            self._positions = self._sort(self._match())
+        return self._positions
+
+    def _match(self):
+        """
+        条件に合致する行の行番号を、元の順序で取得する。
+        最も候補の少ない条件をインデックスで絞り込み、残りの条件は候補の値を直接判定する。
+        同じフィールドに対する範囲条件は1つの範囲としてまとめて絞り込む。
+
+        :return: 行番号のリスト（条件がない場合はNone）
+        :rtype: list
+        """
+        # 条件がない場合は絞り込まない
+        if not self._conditions:
+            return None
+
+        # 等価条件は条件ごとに、範囲条件はフィールドごとにまとめてインデックスから候補の範囲を求める
+        groups = {}
+        for i, (name, lookup, _) in enumerate(self._conditions):
+            groups.setdefault((name, 'sorted') if lookup not in ('exact', 'in') else i, []).append(i)
+        candidates = [(self._lookup([self._conditions[i] for i in group]), group) for group in groups.values()]
+        (_, fetch), covered = min(candidates, key=lambda candidate: candidate[0][0])
+        positions = fetch()
+
+        # 残りの条件を候補の値で判定する
+        for i, (name, lookup, value) in enumerate(self._conditions):
+            if i not in covered:
+                get, test = self._getter(name), _LOOKUPS[lookup]
+                positions = [p for p in positions if test(get(p), value)]
+        return positions
+
+    def _sort(self, positions):
+        """
+        指定された行番号を並べ替える。
+
+        :param positions: 行番号のリスト（Noneの場合はすべての行）
+        :type positions: list
+        :return: 並べ替えた行番号のリスト
+        :rtype: list
+        """
+        # 並べ替えない場合は元の順序のまま返却する
+        if not self._ordering:
+            return list(range(len(self.collection))) if positions is None else positions
+
+        # 絞り込んでいない場合、単一のフィールドの昇順はソート済みインデックスをそのまま使用する
+        if positions is None and len(self._ordering) == 1 and not self._ordering[0].startswith('-'):
+            get = self._getter(self._ordering[0])
+            sorted_positions = self._sorted_index(self._ordering[0])[1]
+            return list(sorted_positions) + [i for i in range(len(self.collection)) if get(i) is None]
+
+        # 安定ソートを後ろの条件から順に適用する（値が存在しない行は昇順、降順とも末尾に並べる）
+        positions = list(range(len(self.collection))) if positions is None else list(positions)
+        for name in reversed(self._ordering):
+            get = self._getter(name.lstrip('-'))
+            present = [p for p in positions if get(p) is not None]
+            present.sort(key=get, reverse=name.startswith('-'))
+            positions = present + [p for p in positions if get(p) is None]
+        return positions
+
+    def _getter(self, name):
+        """
+        行番号から指定されたフィールドの値を取得する関数を取得する。
+
+        :param name: フィールド名
+        :type name: str
+        :return: 行番号を引数とし、Pythonのオブジェクトとして値を返却する関数
+        :rtype: function
+        """
+        # NumPyの列はPythonのオブジェクトに変換して返却する
+        column = self.collection.column(name)
+        if name in self.collection._numpy_columns:
+            return lambda i: column[i].item()
+        return column.__getitem__
+
+    def _lookup(self, conditions):
+        """
+        指定された条件に合致する行の候補をインデックスから求める。
+
+        :param conditions: 1つの等価条件、または同じフィールドに対する範囲条件のリスト
+        :type conditions: list
+        :return: 候補の行数と、候補の行番号のリスト（元の順序）を返却する関数のタプル
+        :rtype: tuple
+        """
+        # 等価条件はハッシュインデックスから求める
+        name, lookup, value = conditions[0]
+        if lookup in ('exact', 'in'):
+            index = self._hash_index(name)
+            keys = [value] if lookup == 'exact' else list(value)
+            groups = [index.get(key, ()) for key in keys]
+            if len(groups) == 1:
+                return len(groups[0]), lambda: list(groups[0])
+            return sum(len(group) for group in groups), lambda: sorted(p for group in groups for p in group)
+
+        # 範囲条件はソート済みインデックスから求める
+        values, positions = self._sorted_index(name)
+        start, end = 0, len(values)
+        for _, lookup, value in conditions:
+            if lookup in ('gt', 'gte'):
+                start = max(start, (bisect_right if lookup == 'gt' else bisect_left)(values, value))
+            else:
+                end = min(end, (bisect_left if lookup == 'lt' else bisect_right)(values, value))
+        return max(end - start, 0), lambda: sorted(positions[start:end])
+
+    def _hash_index(self, name):
+        """
+        指定されたフィールドのハッシュインデックスを取得する。
+
+        :param name: フィールド名
+        :type name: str
+        :return: 値をキーとした行番号のリストの辞書
+        :rtype: dict
+        """
+        # コレクションに保持したインデックスを探索し、なければ構築する
+        index = self.collection._indexes.get((name, 'hash'))
+        if index is None:
+            index = {}
+            for i, value in enumerate(_to_list(self.collection.column(name))):
+                index.setdefault(value, []).append(i)
+            self.collection._indexes[(name, 'hash')] = index
+        return index
+
+    def _sorted_index(self, name):
+        """
+        指定されたフィールドのソート済みインデックスを取得する。
+        値が存在しない行はインデックスに含めない。
+
+        :param name: フィールド名
+        :type name: str
+        :return: 昇順に並べた値のリストと、それぞれの行番号のリストのタプル
+        :rtype: tuple
+        """
+        # コレクションに保持したインデックスを探索し、なければ構築する
+        index = self.collection._indexes.get((name, 'sorted'))
+        if index is None:
+            column = _to_list(self.collection.column(name))
+            positions = sorted((i for i, v in enumerate(column) if v is not None), key=column.__getitem__)
+            index = ([column[i] for i in positions], positions)
+            self.collection._indexes[(name, 'sorted')] = index
+        return index
+
+
+def _to_list(column):
+    """
+    指定された列をPythonのオブジェクトのリストに変換する。
+
+    :param column: 列（list、array.arrayまたはnumpy.ndarray）
+    :type column: object
+    :return: 値のリスト
+    :rtype: list
+    """
+    # 配列の場合はリストに変換する
+    return column.tolist() if hasattr(column, 'tolist') else column
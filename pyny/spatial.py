@@ -0,0 +1,533 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright 2015-2019 Jun-ya HASEBA
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+点の座標を格子状のセルに振り分ける空間インデックスを提供するモジュール。
+最近傍、矩形、半径による検索は、検索位置の周辺のセルに含まれる点の距離（ハバーサイン距離）のみを計算する。
+NumPyがインストールされている場合、候補の多い検索の距離の計算をNumPyで行う。
+また、空間インデックスを使用して2つのレイヤを結合する関数を提供する。
+"""
+
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+import heapq
+import math
+
+from pyny.geometry import Geometry
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# 地球の平均半径（メートル）
+EARTH_RADIUS = 6371008.8
+
+# 緯度1度あたりの距離（メートル）
+_METERS_PER_DEGREE = EARTH_RADIUS * math.pi / 180
+
+# 1つのセルに含める点の数の目安
+_POINTS_PER_CELL = 4
+
+# NumPyで距離を計算する候補の数の下限
+_NUMPY_THRESHOLD = 64
+
+# 結合で並列に検索する場合の、スレッドあたりの分割数
+_CHUNKS_PER_WORKER = 4
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """
+    2点間の距離をハバーサインの公式で求める。
+
+    :param lat1: 1点目の緯度
+    :type lat1: float
+    :param lon1: 1点目の経度
+    :type lon1: float
+    :param lat2: 2点目の緯度
+    :type lat2: float
+    :param lon2: 2点目の経度
+    :type lon2: float
+    :return: 距離（メートル）
+    :rtype: float
+    """
+    # 緯度、経度をラジアンに変換して距離を求める
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2 +
+         math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+
+class SpatialIndex:
+    """
+    点の座標を格子状のセルに振り分けた空間インデックス。
+    """
+
+    def __init__(self, points, items=None, cell_size=None):
+        """
+        SpatialIndexを構築する。
+
+        :param points: 点（経度、緯度の順のタプル）のリスト（Noneの要素はインデックスに含めない）
+        :type points: list
+        :param items: 検索結果として返却する、点と同じ順序のオブジェクトのシーケンス（省略した場合は点の位置）
+        :type items: list
+        :param cell_size: セルの大きさ（度、省略した場合は点の密度から決める）
+        :type cell_size: float
+        """
+        # 座標を配列に格納する
+        self.items = items
+        self._positions = array('q')
+        self._xs = array('d')
+        self._ys = array('d')
+        for i, point in enumerate(points):
+            if point is not None:
+                self._positions.append(i)
+                self._xs.append(point[0])
+                self._ys.append(point[1])
+
+        # 点の範囲からセルの大きさを決める
+        count = len(self._xs)
+        if count:
+            self._bounds = (min(self._xs), min(self._ys), max(self._xs), max(self._ys))
+        else:
+            self._bounds = (0.0, 0.0, 0.0, 0.0)
+        if cell_size is None:
+            area = max((self._bounds[2] - self._bounds[0]) * (self._bounds[3] - self._bounds[1]), 1e-12)
+            cell_size = max(math.sqrt(area * _POINTS_PER_CELL / max(count, 1)), 1e-6)
+        self.cell_size = cell_size
+
+        # 各点をセルに振り分ける
+        self._cells = {}
+        for j in range(count):
+            self._cells.setdefault(self._cell(self._xs[j], self._ys[j]), []).append(j)
+        self._cell_bounds = (self._cell(self._bounds[0], self._bounds[1]) + self._cell(self._bounds[2], self._bounds[3]))
+
+        # 経度1度あたりの距離の下限を求めるための、最も極に近い緯度
+        self._max_abs_lat = max(abs(self._bounds[1]), abs(self._bounds[3]))
+
+    def __len__(self):
+        """
+        インデックスに含まれる点の数を取得する。
+
+        :return: 点の数
+        :rtype: int
+        """
+        # 点の数を返却する
+        return len(self._xs)
+
+    def nearest(self, lat, lon, k=1):
+        """
+        指定された座標に近い順にk件の点を検索する。
+
+        :param lat: 緯度
+        :type lat: float
+        :param lon: 経度
+        :type lon: float
+        :param k: 件数
+        :type k: int
+        :return: 検索結果と距離（メートル）のタプルのリスト（近い順）
+        :rtype: list
+        """
+        # 検索位置のセルから外側に向かって、1周ずつセルを調べる
+        if not self._xs or k <= 0:
+            return []
+        cx, cy = self._cell(lon, lat)
+        min_x, min_y, max_x, max_y = self._cell_bounds
+        start = max(0, min_x - cx, cx - max_x, min_y - cy, cy - max_y)
+        end = max(cx - min_x, max_x - cx, cy - min_y, max_y - cy)
+        scale = self._min_meters_per_degree(lat)
+        best = []
+        for ring in range(start, end + 1):
+            # 次の周のセルの点がこれまでのk件より近くなり得ない場合は打ち切る
+            if len(best) == k and (ring - 1) * self.cell_size * scale > -best[0][0]:
+                break
+            if 8 * ring > len(self._cells):
+                # 周のセルの数が点の存在するセルの数を超える場合は、残りのセルをまとめて調べる
+                candidates = [j for (x, y), members in self._cells.items()
+                              if max(abs(x - cx), abs(y - cy)) >= ring for j in members]
+                end = ring
+            else:
+                candidates = [j for cell in self._ring(cx, cy, ring) for j in self._cells.get(cell, ())]
+            for distance, j in zip(self._distances(candidates, lat, lon), candidates):
+                if len(best) < k:
+                    heapq.heappush(best, (-distance, -j))
+                elif distance < -best[0][0]:
+                    heapq.heapreplace(best, (-distance, -j))
+            if ring == end:
+                break
+        return [(self._item(-j), -distance) for distance, j in sorted(best, reverse=True)]
+
+    def within_bbox(self, min_lat, min_lon, max_lat, max_lon):
+        """
+        指定された矩形に含まれる点を検索する。
+
+        :param min_lat: 南端の緯度
+        :type min_lat: float
+        :param min_lon: 西端の経度
+        :type min_lon: float
+        :param max_lat: 北端の緯度
+        :type max_lat: float
+        :param max_lon: 東端の経度
+        :type max_lon: float
+        :return: 検索結果のリスト（インデックスの構築時の順）
+        :rtype: list
+        """
+        # 矩形と重なるセルの点のうち、矩形に含まれる点を返却する
+        xs, ys = self._xs, self._ys
+        matched = [j for j in self._cells_in(min_lon, min_lat, max_lon, max_lat)
+                   if min_lon <= xs[j] <= max_lon and min_lat <= ys[j] <= max_lat]
+        return [self._item(j) for j in sorted(matched)]
+
+    def within_radius(self, lat, lon, meters):
+        """
+        指定された座標から指定された距離以内の点を検索する。
+
+        :param lat: 緯度
+        :type lat: float
+        :param lon: 経度
+        :type lon: float
+        :param meters: 距離（メートル）
+        :type meters: float
+        :return: 検索結果と距離（メートル）のタプルのリスト（近い順）
+        :rtype: list
+        """
+        # 円を囲む矩形と重なるセルの点の距離を求める
+        dlat = meters / _METERS_PER_DEGREE
+        cos = math.cos(math.radians(min(abs(lat) + dlat, 90.0)))
+        dlon = meters / (_METERS_PER_DEGREE * cos) if cos > 1e-9 else 360.0
+        candidates = list(self._cells_in(lon - dlon, lat - dlat, lon + dlon, lat + dlat))
+        matched = [(distance, j) for distance, j in zip(self._distances(candidates, lat, lon), candidates)
+                   if distance <= meters]
+        return [(self._item(j), distance) for distance, j in sorted(matched)]
+
+    def _cell(self, x, y):
+        """
+        指定された座標を含むセルを取得する。
+
+        :param x: 経度
+        :type x: float
+        :param y: 緯度
+        :type y: float
+        :return: セルの列番号、行番号のタプル
+        :rtype: tuple
+        """
+        # 座標をセルの大きさで割る
+        return int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size))
+
+    def _ring(self, cx, cy, ring):
+        """
+        指定されたセルを中心とした指定された周のセルを取得する。
+
+        :param cx: 中心のセルの列番号
+        :type cx: int
+        :param cy: 中心のセルの行番号
+        :type cy: int
+        :param ring: 周（0の場合は中心のセルのみ）
+        :type ring: int
+        :return: セルのイテレータ
+        :rtype: generator
+        """
+        # 上下の辺と左右の辺のセルを順に返却する
+        if ring == 0:
+            yield cx, cy
+            return
+        for x in range(cx - ring, cx + ring + 1):
+            yield x, cy - ring
+            yield x, cy + ring
+        for y in range(cy - ring + 1, cy + ring):
+            yield cx - ring, y
+            yield cx + ring, y
+
+    def _cells_in(self, min_x, min_y, max_x, max_y):
+        """
+        指定された矩形と重なるセルに含まれる点を取得する。
+
+        :param min_x: 西端の経度
+        :type min_x: float
+        :param min_y: 南端の緯度
+        :type min_y: float
+        :param max_x: 東端の経度
+        :type max_x: float
+        :param max_y: 北端の緯度
+        :type max_y: float
+        :return: 点の番号のイテレータ
+        :rtype: generator
+        """
+        # 点が存在する範囲に限定してセルを調べる
+        x0, y0 = self._cell(min_x, min_y)
+        x1, y1 = self._cell(max_x, max_y)
+        x0, y0 = max(x0, self._cell_bounds[0]), max(y0, self._cell_bounds[1])
+        x1, y1 = min(x1, self._cell_bounds[2]), min(y1, self._cell_bounds[3])
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self._cells):
+            # セルの数より範囲が広い場合は点が存在するセルのみを調べる
+            for (x, y), members in self._cells.items():
+                if x0 <= x <= x1 and y0 <= y <= y1:
+                    yield from members
+            return
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                yield from self._cells.get((x, y), ())
+
+    def _distances(self, candidates, lat, lon):
+        """
+        指定された点と座標の距離を求める。
+
+        :param candidates: 点の番号のリスト
+        :type candidates: list
+        :param lat: 緯度
+        :type lat: float
+        :param lon: 経度
+        :type lon: float
+        :return: 距離（メートル）のリスト
+        :rtype: list
+        """
+        # 候補が多い場合はNumPyでまとめて計算する
+        xs, ys = self._xs, self._ys
+        if numpy is not None and len(candidates) >= _NUMPY_THRESHOLD:
+            index = numpy.array(candidates, dtype='int64')
+            phi1, phi2 = numpy.radians(lat), numpy.radians(numpy.frombuffer(ys, dtype='float64')[index])
+            dlon = numpy.radians(numpy.frombuffer(xs, dtype='float64')[index] - lon)
+            a = numpy.sin((phi2 - phi1) / 2) ** 2 + numpy.cos(phi1) * numpy.cos(phi2) * numpy.sin(dlon / 2) ** 2
+            return (2 * EARTH_RADIUS * numpy.arcsin(numpy.minimum(1.0, numpy.sqrt(a)))).tolist()
+        return [haversine(lat, lon, ys[j], xs[j]) for j in candidates]
+
+    def _min_meters_per_degree(self, lat):
+        """
+        インデックスの範囲と指定された緯度における、1度あたりの距離の下限を求める。
+
+        :param lat: 緯度
+        :type lat: float
+        :return: 1度あたりの距離（メートル）
+        :rtype: float
+        """
+        # 経度方向の距離は極に近いほど短くなるため、最も極に近い緯度で求める
+        return _METERS_PER_DEGREE * math.cos(math.radians(min(max(self._max_abs_lat, abs(lat)), 90.0)))
+
+    def _item(self, j):
+        """
+        指定された点に対応する検索結果を取得する。
+
+        :param j: 点の番号
+        :type j: int
+        :return: 検索結果（itemsを省略した場合は点の位置）
+        :rtype: object
+        """
+        # 点の位置に対応するオブジェクトを返却する
+        position = self._positions[j]
+        return position if self.items is None else self.items[position]
+
+
+def points_of(collection, field=None, lat=None, lon=None):
+    """
+    コレクションまたはモデルのリストから点のリストを取り出す。
+
+    :param collection: コレクションまたはモデルのリスト
+    :type collection: object
+    :param field: PointFieldまたはGeometryFieldのフィールド名
+    :type field: str
+    :param lat: 緯度のフィールド名（fieldを省略した場合）
+    :type lat: str
+    :param lon: 経度のフィールド名（fieldを省略した場合）
+    :type lon: str
+    :return: 点（経度、緯度の順のタプル）のリスト（値が存在しない要素はNone）
+    :rtype: list
+    :raises ValueError: フィールド名の指定が不足している
+    """
+    # 列を保持している場合は列から、それ以外の場合はモデルから値を取り出す
+    columns = getattr(collection, 'columns', None)
+    if field is not None:
+        values = _column(collection, columns, field)
+        return [_point_of(value) for value in values]
+    if lat is None or lon is None:
+        raise ValueError('field or both lat and lon must be specified')
+    lats, lons = _column(collection, columns, lat), _column(collection, columns, lon)
+    return [(float(x), float(y)) if x is not None and y is not None else None for x, y in zip(lons, lats)]
+
+
+def nearest_join(left, right, field, right_field=None, k=1, workers=None):
+    """
+    左側の各要素に、右側の要素のうち近い順にk件を結合する。
+    右側に空間インデックスを構築し、左側の各要素の座標で検索する。
+
+    :param left: 左側のコレクションまたはモデルのリスト
+    :type left: object
+    :param right: 右側のコレクション、モデルのリストまたは空間インデックス
+    :type right: object
+    :param field: 左側の座標のフィールド名（緯度と経度のフィールド名のタプルも可）
+    :type field: object
+    :param right_field: 右側の座標のフィールド名（省略した場合はfieldと同じ）
+    :type right_field: object
+    :param k: 左側の1要素あたりに結合する件数
+    :type k: int
+    :param workers: 左側の検索を並列に行うスレッドの数（省略した場合は並列に検索しない）
+    :type workers: int
+    :return: 左側の要素、右側の要素、距離（メートル）のタプルのイテレータ（左側の順、同じ要素の中では近い順）
+    :rtype: generator
+    :raises TypeError: 左側に空間インデックスが指定された
+    """
+    # 右側のインデックスを左側の座標で検索する
+    index = _to_index(right, field if right_field is None else right_field)
+    for item, matches in _probe(left, field, lambda lat, lon: index.nearest(lat, lon, k), workers):
+        for match, distance in matches:
+            yield item, match, distance
+
+
+def distance_join(left, right, meters, field, right_field=None, workers=None):
+    """
+    左側と右側の要素のうち、距離が指定された距離以内の組を結合する。
+    要素数の多い側（空間インデックスが指定された場合はその側）に空間インデックスを構築し、もう一方の側の各要素の座標で検索する。
+
+    :param left: 左側のコレクション、モデルのリストまたは空間インデックス
+    :type left: object
+    :param right: 右側のコレクション、モデルのリストまたは空間インデックス
+    :type right: object
+    :param meters: 距離（メートル）
+    :type meters: float
+    :param field: 左側の座標のフィールド名（緯度と経度のフィールド名のタプルも可）
+    :type field: object
+    :param right_field: 右側の座標のフィールド名（省略した場合はfieldと同じ）
+    :type right_field: object
+    :param workers: 検索を並列に行うスレッドの数（省略した場合は並列に検索しない）
+    :type workers: int
+    :return: 左側の要素、右側の要素、距離（メートル）のタプルのイテレータ（検索した側の順、同じ要素の中では近い順）
+    :rtype: generator
+    :raises TypeError: 両側に空間インデックスが指定された
+    """
+    # 要素数の多い側にインデックスを構築する
+    right_field = field if right_field is None else right_field
+    if isinstance(left, SpatialIndex) or (not isinstance(right, SpatialIndex) and len(left) > len(right)):
+        index = _to_index(left, field)
+        for item, matches in _probe(right, right_field, lambda lat, lon: index.within_radius(lat, lon, meters), workers):
+            for match, distance in matches:
+                yield match, item, distance
+        return
+
+    # 右側のインデックスを左側の座標で検索する
+    index = _to_index(right, right_field)
+    for item, matches in _probe(left, field, lambda lat, lon: index.within_radius(lat, lon, meters), workers):
+        for match, distance in matches:
+            yield item, match, distance
+
+
+def _to_index(side, field):
+    """
+    結合の一方の側から空間インデックスを取得する。
+
+    :param side: コレクション、モデルのリストまたは空間インデックス
+    :type side: object
+    :param field: 座標のフィールド名（緯度と経度のフィールド名のタプルも可）
+    :type field: object
+    :return: 空間インデックス
+    :rtype: SpatialIndex
+    """
+    # 空間インデックスが指定された場合はそのまま使用する
+    if isinstance(side, SpatialIndex):
+        return side
+    return SpatialIndex(_points_for(side, field), side)
+
+
+def _probe(side, field, search, workers):
+    """
+    結合の検索する側の各要素の座標で、空間インデックスを検索する。
+
+    :param side: コレクションまたはモデルのリスト
+    :type side: object
+    :param field: 座標のフィールド名（緯度と経度のフィールド名のタプルも可）
+    :type field: object
+    :param search: 緯度、経度を引数として検索結果を返却する関数
+    :type search: function
+    :param workers: 並列に検索するスレッドの数（Noneの場合は並列に検索しない）
+    :type workers: int
+    :return: 要素と検索結果のタプルのイテレータ（座標が存在しない要素は含まない）
+    :rtype: generator
+    :raises TypeError: 空間インデックスが指定された
+    """
+    # 座標が存在する要素のみを検索する
+    if isinstance(side, SpatialIndex):
+        raise TypeError('the probe side of a join must be a collection or a list of models')
+    targets = [(i, point) for i, point in enumerate(_points_for(side, field)) if point is not None]
+    if not workers or workers <= 1 or len(targets) < 2:
+        for i, point in targets:
+            yield side[i], search(point[1], point[0])
+        return
+
+    # 要素を分割して並列に検索し、元の順序で返却する
+    size = max(-(-len(targets) // (workers * _CHUNKS_PER_WORKER)), 1)
+    chunks = [targets[start:start + size] for start in range(0, len(targets), size)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(lambda chunk: [search(point[1], point[0]) for _, point in chunk], chunks)
+        for chunk, matches in zip(chunks, results):
+            for (i, _), match in zip(chunk, matches):
+                yield side[i], match
+
+
+def _points_for(side, field):
+    """
+    結合の一方の側から点のリストを取り出す。
+
+    :param side: コレクションまたはモデルのリスト
+    :type side: object
+    :param field: 座標のフィールド名（緯度と経度のフィールド名のタプルも可）
+    :type field: object
+    :return: 点（経度、緯度の順のタプル）のリスト
+    :rtype: list
+    """
+    # タプルの場合は緯度と経度のフィールド名とみなす
+    if isinstance(field, tuple):
+        return points_of(side, lat=field[0], lon=field[1])
+    return points_of(side, field)
+
+
+def _column(collection, columns, name):
+    """
+    コレクションまたはモデルのリストから指定されたフィールドの値のリストを取り出す。
+
+    :param collection: コレクションまたはモデルのリスト
+    :type collection: object
+    :param columns: コレクションの列（モデルのリストの場合はNone）
+    :type columns: dict
+    :param name: フィールド名
+    :type name: str
+    :return: 値のリスト
+    :rtype: list
+    """
+    # 列を保持している場合は列をリストに変換する
+    if columns is not None:
+        column = columns[name]
+        return column.tolist() if hasattr(column, 'tolist') else column
+    return [getattr(model, name) for model in collection]
+
+
+def _point_of(value):
+    """
+    PointFieldまたはGeometryFieldの値から点を取り出す。
+    点以外のジオメトリは、ジオメトリを囲む矩形の中心を点とする。
+
+    :param value: 値
+    :type value: object
+    :return: 点（経度、緯度の順のタプル、値が存在しない場合はNone）
+    :rtype: tuple
+    """
+    # ジオメトリの場合は種類に応じて点を求める
+    if isinstance(value, Geometry):
+        if value.type == 'POINT':
+            return (value.coordinates[0], value.coordinates[1]) if value.coordinates else None
+        bounds = value.bounds()
+        return ((bounds[0] + bounds[2]) / 2, (bounds[1] + bounds[3]) / 2) if bounds else None
+    return value
@@ -44,12 +44,13 @@ setup(
         'License :: OSI Approved :: Apache Software License',
         'Programming Language :: Python',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.2',
-        'Programming Language :: Python :: 3.3',
-        'Programming Language :: Python :: 3.4',
+        'Programming Language :: Python :: 3.5',
+        'Programming Language :: Python :: 3.6',
+        'Programming Language :: Python :: 3.7',
         'Topic :: Internet',
     ],
-    packages=find_packages(exclude=['tests']),
+    python_requires='>=3.5',
+    packages=find_packages(exclude=['benchmarks', 'tests']),
     keywords=['web', 'api', 'opendata', 'nagareyama'],
     license='Apache License, Version 2.0',
 )
@@ -0,0 +1,425 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright 2015-2019 Jun-ya HASEBA
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from mock import patch
+from socketserver import ThreadingMixIn
+import threading
+from unittest import TestCase
+
+from pyny.fields import FloatField
+from pyny.models import Model
+
+
+class FloatModel(Model):
+    """
+    非同期のクラスメソッドをテストするためのモデル。
+    """
+    float1 = FloatField()
+    float2 = FloatField('float')
+
+
+class _Server(ThreadingMixIn, HTTPServer):
+    """
+    テスト用のHTTPサーバ。
+    """
+    daemon_threads = True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    テスト用のHTTPサーバのリクエストハンドラ。
+    """
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        """
+        GETリクエストを処理する。
+        """
+        # パスに応じたレスポンスを返却する
+        if self.path == '/redirect':
+            self.send_response(302)
+            self.send_header('Location', '/json')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        elif self.path == '/chunked':
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for chunk in ('{"name": ', '"流山市"}'):
+                data = chunk.encode('utf-8')
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+            self.wfile.write(b'0\r\n\r\n')
+        elif self.path == '/missing':
+            self.send_error(404)
+        else:
+            body = b'{"num": 1}'
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        """
+        ログを出力しない。
+        """
+
+
+def _fake_get_json(results):
+    """
+    指定されたデータを返却する_get_json()の代替となるコルーチン関数を生成する。
+
+    :param results: 返却するデータのリスト
+    :type results: list
+    :return: コルーチン関数
+    :rtype: function
+    """
+    # 呼び出されたURLを記録して指定されたデータ（スキーマを指定された場合は適用したデータ）を返却する
+    async def get_json(url, schema=None):
+        get_json.urls.append(url)
+        return {'num': len(results), 'results': results if schema is None else [schema.apply(d) for d in results]}
+    get_json.urls = []
+    return get_json
+
+
+def _run(coroutine):
+    """
+    指定されたコルーチンを新しいイベントループで実行する。
+
+    :param coroutine: コルーチン
+    :type coroutine: coroutine
+    :return: コルーチンの戻り値
+    :rtype: object
+    """
+    # イベントループを生成して実行する
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class AioTest(TestCase):
+    """
+    aio.pyに対するテストコード。
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        テスト用のHTTPサーバを起動する。
+        """
+        cls.server = _Server(('127.0.0.1', 0), _Handler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = 'http://127.0.0.1:%d' % cls.server.server_port
+
+    @classmethod
+    def tearDownClass(cls):
+        """
+        テスト用のHTTPサーバを停止する。
+        """
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        """
+        テストごとにキャッシュを破棄する。
+        """
+        from pyny import api
+        api.invalidate()
+
+    def test_get_by_id_01(self):
+        """
+        [対象] get_by_id() : No.01
+        [条件] 存在する項目IDを指定して実行する。
+        [結果] マッチするデータが返却される。
+        """
+        from pyny import aio
+        with patch('pyny.aio._get_json', _fake_get_json([{'feature_id': 1}, {'feature_id': 2}])):
+            actual = _run(aio.get_by_id('dummy', 2))
+
+        self.assertEqual({'feature_id': 2}, actual)
+
+    def test_get_by_id_02(self):
+        """
+        [対象] get_by_id() : No.02
+        [条件] 存在しない項目IDを指定して実行する。
+        [結果] Noneが返却される。
+        """
+        from pyny import aio
+        with patch('pyny.aio._get_json', _fake_get_json([{'feature_id': 1}])):
+            actual = _run(aio.get_by_id('dummy', 2015))
+
+        self.assertIsNone(actual)
+
+    def test_get_by_id_03(self):
+        """
+        [対象] get_by_id() : No.03
+        [条件] キャッシュされていないレイヤIDを指定して同時に実行する。
+        [結果] レイヤのデータを取得するリクエストは1回にまとめられる。
+        """
+        from pyny import aio
+        get_json = _fake_get_json([{'feature_id': 1}, {'feature_id': 2}])
+
+        async def slow_get_json(url, schema=None):
+            await asyncio.sleep(0.01)
+            return await get_json(url, schema)
+
+        async def get_all():
+            return await asyncio.gather(*[aio.get_by_id('dummy', i % 2 + 1) for i in range(50)])
+
+        with patch('pyny.aio._get_json', slow_get_json):
+            actual = _run(get_all())
+
+        self.assertEqual([{'feature_id': i % 2 + 1} for i in range(50)], actual)
+        self.assertEqual(1, len(get_json.urls))
+
+    def test_get_data_01(self):
+        """
+        [対象] get_data() : No.01
+        [条件] レイヤIDと件数を指定して実行する。
+        [結果] 件数を指定したURLにアクセスし、データのリストが返却される。
+        """
+        from pyny import aio
+        get_json = _fake_get_json([{'feature_id': 1}])
+        with patch('pyny.aio._get_json', get_json):
+            actual = _run(aio.get_data('dummy', 3))
+
+        self.assertEqual([{'feature_id': 1}], actual)
+        self.assertTrue(get_json.urls[0].endswith('layers=dummy&pagenum=3'))
+
+    def test_get_all_data_01(self):
+        """
+        [対象] get_all_data() : No.01
+        [条件] レイヤIDを指定して実行する。
+        [結果] 件数を確認するリクエストを行わず、すべてのデータが返却される。
+        """
+        from pyny import aio
+        get_json = _fake_get_json([{'feature_id': 1}, {'feature_id': 2}])
+        with patch('pyny.aio._get_json', get_json):
+            actual = _run(aio.get_all_data('dummy'))
+
+        self.assertEqual([{'feature_id': 1}, {'feature_id': 2}], actual)
+        self.assertEqual(1, len(get_json.urls))
+        self.assertTrue(get_json.urls[0].endswith('layers=dummy&pagenum=1000'))
+
+    def test_get_all_data_02(self):
+        """
+        [対象] get_all_data() : No.02
+        [条件] スキーマを指定して実行する。
+        [結果] スキーマを適用したデータが返却され、レイヤインデックスはキャッシュされない。
+        """
+        from pyny import aio, api
+        get_json = _fake_get_json([{'feature_id': '1', 'status': 0}, {'feature_id': '2'}])
+        with patch('pyny.aio._get_json', get_json):
+            actual = _run(aio.get_all_data('dummy', api.Schema([(('feature_id',), int)])))
+
+        self.assertEqual([{'feature_id': 1}, {'feature_id': 2}], actual)
+        self.assertIsNone(api.layer_cache.get(('dummy', api.LayerIndex)))
+
+    def test_get_all_data_03(self):
+        """
+        [対象] get_all_data() : No.03
+        [条件] SPECULATIVE_PAGE_SIZEより件数の多いレイヤIDを指定して実行する。
+        [結果] レスポンスの件数を指定してすべてのデータが取得し直される。
+        """
+        from pyny import aio
+        get_json = _fake_get_json([{'feature_id': 1}, {'feature_id': 2}])
+        with patch('pyny.aio._get_json', get_json), patch('pyny.api.SPECULATIVE_PAGE_SIZE', 1):
+            actual = _run(aio.get_all_data('dummy'))
+
+        self.assertEqual([{'feature_id': 1}, {'feature_id': 2}], actual)
+        self.assertEqual(2, len(get_json.urls))
+        self.assertTrue(get_json.urls[1].endswith('layers=dummy&pagenum=2'))
+
+    def test_get_data_count_01(self):
+        """
+        [対象] get_data_count() : No.01
+        [条件] レイヤIDを指定して実行する。
+        [結果] データの件数が返却される。
+        """
+        from pyny import aio
+        with patch('pyny.aio._get_json', _fake_get_json([{}, {}, {}])):
+            actual = _run(aio.get_data_count('dummy'))
+
+        self.assertEqual(3, actual)
+
+    def test_get_json_01(self):
+        """
+        [対象] _get_json() : No.01
+        [条件] 有効なURLを指定して実行する。
+        [結果] JSONを変換したPythonオブジェクトが返却される。
+        """
+        from pyny import aio
+        actual = _run(aio._get_json(self.base_url + '/json'))
+
+        self.assertEqual({'num': 1}, actual)
+
+    def test_get_json_02(self):
+        """
+        [対象] _get_json() : No.02
+        [条件] チャンク形式で返却するURLを指定して実行する。
+        [結果] JSONを変換したPythonオブジェクトが返却される。
+        """
+        from pyny import aio
+        actual = _run(aio._get_json(self.base_url + '/chunked'))
+
+        self.assertEqual({'name': '流山市'}, actual)
+
+    def test_get_json_03(self):
+        """
+        [対象] _get_json() : No.03
+        [条件] リダイレクトするURLを指定して実行する。
+        [結果] リダイレクト先のJSONを変換したPythonオブジェクトが返却される。
+        """
+        from pyny import aio
+        actual = _run(aio._get_json(self.base_url + '/redirect'))
+
+        self.assertEqual({'num': 1}, actual)
+
+    def test_get_json_04(self):
+        """
+        [対象] _get_json() : No.04
+        [条件] エラーを返却するURLを指定して実行する。
+        [結果] WebApiErrorが送出される。
+        """
+        from pyny import aio, api
+        with self.assertRaises(api.WebApiError):
+            _run(aio._get_json(self.base_url + '/missing'))
+
+    def test_get_json_05(self):
+        """
+        [対象] _get_json() : No.05
+        [条件] 無効なURLを指定して実行する。
+        [結果] WebApiErrorが送出される。
+        """
+        from pyny import aio, api
+        with self.assertRaises(api.WebApiError):
+            _run(aio._get_json('error'))
+
+    def test_get_json_06(self):
+        """
+        [対象] _get_json() : No.06
+        [条件] 同時実行数の上限を超える数のリクエストを同時に実行する。
+        [結果] 同時に実行されるリクエストの数が上限以内に収まる。
+        """
+        from pyny import aio
+        in_flight = [0, 0]
+
+        async def fetch_json(url):
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+            await asyncio.sleep(0.01)
+            in_flight[0] -= 1
+            return {}
+
+        async def fetch_all():
+            return await asyncio.gather(*[aio._get_json('dummy%d' % i) for i in range(10)])
+
+        with patch('pyny.aio.MAX_CONCURRENCY', 3), patch('pyny.aio._fetch_json', fetch_json):
+            _run(fetch_all())
+
+        self.assertEqual(3, in_flight[1])
+
+    def test_get_json_07(self):
+        """
+        [対象] _get_json() : No.07
+        [条件] 同じURLへのリクエストを同時に実行する。
+        [結果] リクエストは1回にまとめられ、pyny.api.single_flightの集約の状況に計上される。
+        """
+        from pyny import aio, api
+        urls = []
+
+        async def fetch_json(url):
+            urls.append(url)
+            await asyncio.sleep(0.01)
+            return {'num': 0}
+
+        async def fetch_all():
+            return await asyncio.gather(*[aio._get_json('dummy') for _ in range(10)])
+
+        api.single_flight.reset_stats()
+        with patch('pyny.aio._fetch_json', fetch_json):
+            actual = _run(fetch_all())
+
+        self.assertEqual(['dummy'], urls)
+        self.assertEqual([{'num': 0}] * 10, actual)
+        self.assertEqual({'executions': 1, 'coalesced': 9}, api.single_flight.stats())
+
+
+class AioModelTest(TestCase):
+    """
+    models.Modelの非同期のクラスメソッドに対するテストコード。
+    """
+
+    def setUp(self):
+        """
+        テストごとにキャッシュを破棄する。
+        """
+        from pyny import api
+        api.invalidate()
+
+    def test_aget_by_id_01(self):
+        """
+        [対象] aget_by_id() : No.01
+        [条件] 存在する項目IDを指定して実行する。
+        [結果] マッピングされたモデルが返却される。
+        """
+        with patch('pyny.aio._get_json', _fake_get_json([{'feature_id': 1, 'float': '1.5'}])):
+            actual = _run(FloatModel.aget_by_id('dummy', 1))
+
+        self.assertEqual(1.5, actual.float2)
+
+    def test_aget_by_id_02(self):
+        """
+        [対象] aget_by_id() : No.02
+        [条件] 存在しない項目IDを指定して実行する。
+        [結果] Noneが返却される。
+        """
+        with patch('pyny.aio._get_json', _fake_get_json([{'feature_id': 1}])):
+            actual = _run(FloatModel.aget_by_id('dummy', 2015))
+
+        self.assertIsNone(actual)
+
+    def test_aget_data_01(self):
+        """
+        [対象] aget_data() : No.01
+        [条件] レイヤIDと件数を指定して実行する。
+        [結果] マッピングされたモデルのリストが返却される。
+        """
+        with patch('pyny.aio._get_json', _fake_get_json([{'float1': '2.5'}])):
+            actual = _run(FloatModel.aget_data('dummy', 1))
+
+        self.assertEqual(2.5, actual[0].float1)
+
+    def test_aget_all_data_01(self):
+        """
+        [対象] aget_all_data() : No.01
+        [条件] レイヤIDを指定して実行する。
+        [結果] マッピングされたモデルのリストが返却される。
+        """
+        with patch('pyny.aio._get_json', _fake_get_json([{'float1': '2.5'}, {'float': '3.5'}])):
+            actual = _run(FloatModel.aget_all_data('dummy'))
+
+        self.assertEqual(2, len(actual))
+        self.assertEqual(2.5, actual[0].float1)
+        self.assertEqual(3.5, actual[1].float2)
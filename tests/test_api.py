@@ -16,6 +16,11 @@
 # limitations under the License.
 #
 
+import io
+import json
+from mock import patch
+import threading
+import time
 from unittest import TestCase
 
 
@@ -24,6 +29,13 @@ class ApiTest(TestCase):
     api.pyに対するテストコード。
     """
 
+    def setUp(self):
+        """
+        テストごとにキャッシュを破棄する。
+        """
+        from pyny import api
+        api.invalidate()
+
     def test_get_by_id_01(self):
         """
         [対象] get_by_id() : No.01
@@ -78,6 +90,68 @@ class ApiTest(TestCase):
         with self.assertRaises(api.WebApiError):
             api.get_by_id('error', 2)
 
+    @patch('pyny.api._get_json')
+    def test_get_by_ids_01(self, get_json):
+        """
+        [対象] get_by_ids() : No.01
+        [条件] 存在する項目IDと存在しない項目IDを混在させて実行する。
+        [結果] 指定した順序でデータが返却され、存在しない項目IDの位置にはNoneが設定される。
+        """
+        get_json.return_value = {
+            'num': 3,
+            'results': [{'feature_id': 1}, {'feature_id': 2}, {'feature_id': 3}],
+        }
+
+        from pyny import api
+        actual = api.get_by_ids('dummy', [3, 2015, 1])
+
+        self.assertEqual([{'feature_id': 3}, None, {'feature_id': 1}], actual)
+
+    @patch('pyny.api._get_json')
+    def test_get_by_ids_02(self, get_json):
+        """
+        [対象] get_by_ids() : No.02
+        [条件] as_dictにTrueを指定して実行する。
+        [結果] 項目IDをキーとした辞書が返却される。
+        """
+        get_json.return_value = {
+            'num': 2,
+            'results': [{'feature_id': 1}, {'feature_id': 2}],
+        }
+
+        from pyny import api
+        actual = api.get_by_ids('dummy', [2, 2015], as_dict=True)
+
+        self.assertEqual({2: {'feature_id': 2}, 2015: None}, actual)
+
+    @patch('pyny.api._get_json')
+    def test_get_by_ids_03(self, get_json):
+        """
+        [対象] get_by_ids() : No.03
+        [条件] 多数の項目IDを指定して実行する。
+        [結果] Web APIへのリクエストはレイヤ1回ぶんのみ行われる。
+        """
+        get_json.return_value = {
+            'num': 100,
+            'results': [{'feature_id': i} for i in range(100)],
+        }
+
+        from pyny import api
+        actual = api.get_by_ids('dummy', range(100))
+
+        self.assertEqual(100, len(actual))
+        self.assertEqual(1, get_json.call_count)
+
+    def test_get_by_ids_04(self):
+        """
+        [対象] get_by_ids() : No.04
+        [条件] 無効なレイヤIDを指定して実行する。
+        [結果] WebApiErrorが送出される。
+        """
+        from pyny import api
+        with self.assertRaises(api.WebApiError):
+            api.get_by_ids('error', [2])
+
     def test_get_data_01(self):
         """
         [対象] get_data() : No.01
@@ -278,6 +352,180 @@ class ApiTest(TestCase):
         with self.assertRaises(api.WebApiError):
             api.get_all_data('error')
 
+    @patch('pyny.api._get_json')
+    def test_get_all_data_03(self, get_json):
+        """
+        [対象] get_all_data() : No.03
+        [条件] 同じレイヤIDを指定して複数回実行する。
+        [結果] Web APIへのリクエストは初回のみ行われ、呼び出しごとに別のリストが返却される。
+        """
+        get_json.return_value = {'num': 1, 'results': [{'feature_id': 1}]}
+
+        from pyny import api
+        actual1 = api.get_all_data('dummy')
+        actual2 = api.get_all_data('dummy')
+
+        self.assertEqual([{'feature_id': 1}], actual2)
+        self.assertIsNot(actual1, actual2)
+        self.assertEqual(1, get_json.call_count)
+
+    @patch('pyny.api._get_json')
+    def test_get_all_data_04(self, get_json):
+        """
+        [対象] get_all_data() : No.04
+        [条件] 同じレイヤIDを指定して複数のスレッドから同時に実行する。
+        [結果] Web APIへのリクエストはレイヤ1回ぶんのみ行われ、すべてのスレッドに同じデータが返却される。
+        """
+        def slow_get_json(url):
+            time.sleep(0.05)
+            return {'num': 1, 'results': [{'feature_id': 1}]}
+        get_json.side_effect = slow_get_json
+
+        from pyny import api
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(api.get_all_data('dummy'))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([[{'feature_id': 1}]] * 5, results)
+        self.assertEqual(1, get_json.call_count)
+
+    @patch('pyny.api._get_json')
+    def test_get_all_data_05(self, get_json):
+        """
+        [対象] get_all_data() : No.05
+        [条件] 件数が不明なレイヤIDを指定して実行する。
+        [結果] 件数を確認するリクエストを行わず、SPECULATIVE_PAGE_SIZEぶんのデータを要求する。
+        """
+        get_json.return_value = {'num': 2, 'results': [{'feature_id': 1}, {'feature_id': 2}]}
+
+        from pyny import api
+        with patch('pyny.api.SPECULATIVE_PAGE_SIZE', 3):
+            actual = api.get_all_data('dummy')
+
+        self.assertEqual([{'feature_id': 1}, {'feature_id': 2}], actual)
+        self.assertEqual(1, get_json.call_count)
+        self.assertTrue(get_json.call_args[0][0].endswith('layers=dummy&pagenum=3'))
+
+    @patch('pyny.api._get_json')
+    def test_get_all_data_06(self, get_json):
+        """
+        [対象] get_all_data() : No.06
+        [条件] SPECULATIVE_PAGE_SIZEより件数の多いレイヤIDを指定して実行する。
+        [結果] レスポンスの件数を指定してすべてのデータが取得し直される。
+        """
+        def get_page(url):
+            page_size = int(url.rsplit('pagenum=', 1)[1])
+            return {'num': 7, 'results': [{'feature_id': i + 1} for i in range(min(page_size, 7))]}
+        get_json.side_effect = get_page
+
+        from pyny import api
+        with patch('pyny.api.SPECULATIVE_PAGE_SIZE', 3):
+            actual = api.get_all_data('dummy')
+
+        self.assertEqual([{'feature_id': i + 1} for i in range(7)], actual)
+        self.assertEqual(2, get_json.call_count)
+        self.assertTrue(get_json.call_args[0][0].endswith('layers=dummy&pagenum=7'))
+
+    @patch('pyny.api._get_json')
+    def test_get_all_data_07(self, get_json):
+        """
+        [対象] get_all_data() : No.07
+        [条件] 件数がキャッシュされているレイヤIDを指定して実行する。
+        [結果] キャッシュされた件数ぶんのデータが1回のリクエストで取得される。
+        """
+        def get_page(url):
+            page_size = int(url.rsplit('pagenum=', 1)[1])
+            return {'num': 5, 'results': [{'feature_id': i + 1} for i in range(min(page_size, 5))]}
+        get_json.side_effect = get_page
+
+        from pyny import api
+        with patch('pyny.api.SPECULATIVE_PAGE_SIZE', 3):
+            self.assertEqual(5, api.get_data_count('dummy'))
+            actual = api.get_all_data('dummy')
+
+        self.assertEqual(5, len(actual))
+        self.assertEqual(2, get_json.call_count)
+        self.assertTrue(get_json.call_args[0][0].endswith('layers=dummy&pagenum=5'))
+
+    @patch('pyny.api._get_json')
+    def test_get_all_data_08(self, get_json):
+        """
+        [対象] get_all_data() : No.08
+        [条件] スキーマを指定して実行する。
+        [結果] スキーマを指定してデータが取得され、レイヤインデックスはキャッシュされない。
+        """
+        get_json.return_value = {'num': 1, 'results': [{'feature_id': 1}]}
+
+        from pyny import api
+        schema = api.Schema([(('feature_id',), int)])
+        actual = api.get_all_data('dummy', schema)
+
+        self.assertEqual([{'feature_id': 1}], actual)
+        self.assertIs(schema, get_json.call_args[0][1])
+        self.assertIsNone(api.layer_cache.get(('dummy', api.LayerIndex)))
+
+    @patch('pyny.api._get_json')
+    def test_get_all_data_09(self, get_json):
+        """
+        [対象] get_all_data() : No.09
+        [条件] レイヤインデックスがキャッシュされた状態で、スキーマを指定して実行する。
+        [結果] リクエストを行わず、キャッシュされたデータが返却される。
+        """
+        get_json.return_value = {'num': 1, 'results': [{'feature_id': 1, 'status': 0}]}
+
+        from pyny import api
+        api.get_layer_index('dummy')
+        actual = api.get_all_data('dummy', api.Schema([(('feature_id',), int)]))
+
+        self.assertEqual([{'feature_id': 1, 'status': 0}], actual)
+        self.assertEqual(1, get_json.call_count)
+
+    @patch('pyny.api._iter_json_results')
+    @patch('pyny.api._get_json')
+    def test_iter_all_data_01(self, get_json, iter_json_results):
+        """
+        [対象] iter_all_data() : No.01
+        [条件] 有効なレイヤIDを指定して実行する。
+        [結果] すべてのデータが1件ずつ返却される。
+        """
+        get_json.return_value = {'num': 2, 'results': [{'feature_id': 1}]}
+        iter_json_results.return_value = iter([{'feature_id': 1}, {'feature_id': 2}])
+
+        from pyny import api
+        actual = api.iter_all_data('dummy')
+
+        self.assertEqual([{'feature_id': 1}, {'feature_id': 2}], list(actual))
+        self.assertTrue(iter_json_results.call_args[0][0].endswith('layers=dummy&pagenum=2'))
+
+    def test_iter_all_data_02(self):
+        """
+        [対象] iter_all_data() : No.02
+        [条件] 無効なレイヤIDを指定して実行する。
+        [結果] WebApiErrorが送出される。
+        """
+        from pyny import api
+        with self.assertRaises(api.WebApiError):
+            list(api.iter_all_data('error'))
+
+    @patch('pyny.api._iter_json_results')
+    @patch('pyny.api._get_json')
+    def test_iter_all_data_03(self, get_json, iter_json_results):
+        """
+        [対象] iter_all_data() : No.03
+        [条件] スキーマを指定して実行する。
+        [結果] スキーマを適用したデータが1件ずつ返却される。
+        """
+        get_json.return_value = {'num': 2, 'results': [{'feature_id': 1}]}
+        iter_json_results.return_value = iter([{'feature_id': '1', 'attrs': {'attr0': 'a'}}, {'feature_id': '2'}])
+
+        from pyny import api
+        actual = api.iter_all_data('dummy', api.Schema([(('feature_id',), int)]))
+
+        self.assertEqual([{'feature_id': 1}, {'feature_id': 2}], list(actual))
+
     def test_get_data_count_01(self):
         """
         [対象] get_data_count() : No.01
@@ -299,6 +547,105 @@ class ApiTest(TestCase):
         with self.assertRaises(api.WebApiError):
             api.get_data_count('error')
 
+    @patch('pyny.api._get_json')
+    def test_get_by_id_04(self, get_json):
+        """
+        [対象] get_by_id() : No.04
+        [条件] 同じレイヤIDを指定して複数回実行する。
+        [結果] Web APIへのリクエストは初回のみ行われる。
+        """
+        get_json.return_value = {
+            'num': 2,
+            'results': [{'feature_id': 1}, {'feature_id': 2}],
+        }
+
+        from pyny import api
+        actual1 = api.get_by_id('dummy', 1)
+        actual2 = api.get_by_id('dummy', 2)
+
+        self.assertEqual({'feature_id': 1}, actual1)
+        self.assertEqual({'feature_id': 2}, actual2)
+        self.assertEqual(1, get_json.call_count)
+
+    @patch('pyny.api._get_json')
+    def test_get_by_id_05(self, get_json):
+        """
+        [対象] get_by_id() : No.05
+        [条件] 返却されたデータを変更してから、同じレイヤIDのデータを再度取得する。
+        [結果] 変更はキャッシュされたデータに影響しない。
+        """
+        get_json.return_value = {
+            'num': 1,
+            'results': [{'feature_id': 1, 'attrs': {'attr0': 'a'}, 'files': [{'url': 'x'}]}],
+        }
+
+        from pyny import api
+        actual = api.get_by_id('dummy', 1)
+        actual['attrs']['attr0'] = 'MUTATED'
+        actual['files'].append({'url': 'y'})
+        api.get_by_ids('dummy', [1])[0]['feature_id'] = 2
+
+        expected = [{'feature_id': 1, 'attrs': {'attr0': 'a'}, 'files': [{'url': 'x'}]}]
+        self.assertEqual(expected, api.get_all_data('dummy'))
+        self.assertEqual(expected[0], api.get_by_id('dummy', 1))
+        self.assertEqual(1, get_json.call_count)
+
+    @patch('pyny.api._get_json')
+    def test_get_layer_index_01(self, get_json):
+        """
+        [対象] get_layer_index() : No.01
+        [条件] 有効期間内に同じレイヤIDを指定して実行する。
+        [結果] キャッシュされたインデックスが返却される。
+        """
+        get_json.return_value = {
+            'num': 1,
+            'results': [{'feature_id': 1}],
+        }
+
+        from pyny import api
+        actual1 = api.get_layer_index('dummy')
+        actual2 = api.get_layer_index('dummy')
+
+        self.assertIs(actual1, actual2)
+
+    @patch('pyny.api.layer_cache.ttl', 0)
+    @patch('pyny.api._get_json')
+    def test_get_layer_index_02(self, get_json):
+        """
+        [対象] get_layer_index() : No.02
+        [条件] 有効期間が切れた状態で実行する。
+        [結果] インデックスが再構築される。
+        """
+        get_json.return_value = {
+            'num': 1,
+            'results': [{'feature_id': 1}],
+        }
+
+        from pyny import api
+        actual1 = api.get_layer_index('dummy')
+        actual2 = api.get_layer_index('dummy')
+
+        self.assertIsNot(actual1, actual2)
+
+    @patch('pyny.api._get_json')
+    def test_invalidate_01(self, get_json):
+        """
+        [対象] invalidate() : No.01
+        [条件] インデックスを構築したレイヤIDを指定して実行する。
+        [結果] 次回の取得時にインデックスが再構築される。
+        """
+        get_json.return_value = {
+            'num': 1,
+            'results': [{'feature_id': 1}],
+        }
+
+        from pyny import api
+        actual1 = api.get_layer_index('dummy')
+        api.invalidate('dummy')
+        actual2 = api.get_layer_index('dummy')
+
+        self.assertIsNot(actual1, actual2)
+
     def test_get_json_01(self):
         """
         [対象] _get_json() : No.01
@@ -340,6 +687,39 @@ class ApiTest(TestCase):
         del(actual['_timestamp'])    # 実行するたびに値が変わってしまうためテスト対象外とする
         self.assertEqual(expected, actual)
 
+    def test_get_json_04(self):
+        """
+        [対象] _get_json() : No.04
+        [条件] http_cacheを設定した状態で実行する。
+        [結果] キャッシュを経由して取得したJSONを変換したPythonオブジェクトが返却される。
+        """
+        class Cache:
+            def fetch(self, pool, url):
+                return '{"name": "流山市"}'.encode('utf-8'), 'utf-8'
+
+        from pyny import api
+        with patch('pyny.api.http_cache', Cache()):
+            actual = api._get_json('http://example.com/')
+
+        self.assertEqual({'name': '流山市'}, actual)
+
+    def test_get_json_05(self):
+        """
+        [対象] _get_json() : No.05
+        [条件] スキーマを指定して実行する。
+        [結果] 'results'の各要素にスキーマが適用され、それ以外のメンバーはそのまま返却される。
+        """
+        class Cache:
+            def fetch(self, pool, url):
+                body = {'num': 2, 'results': [{'feature_id': '1', 'status': 0}, {'feature_id': '2'}], '_timestamp': 1}
+                return json.dumps(body).encode('utf-8'), 'utf-8'
+
+        from pyny import api
+        with patch('pyny.api.http_cache', Cache()):
+            actual = api._get_json('http://example.com/', api.Schema([(('feature_id',), int)]))
+
+        self.assertEqual({'num': 2, 'results': [{'feature_id': 1}, {'feature_id': 2}], '_timestamp': 1}, actual)
+
     def test_get_json_02(self):
         """
         [対象] _get_json() : No.02
@@ -359,3 +739,206 @@ class ApiTest(TestCase):
         from pyny import api
         with self.assertRaises(api.WebApiError):
             api._get_json('http://thunder-claw.com/')
+
+
+class LayerIndexTest(TestCase):
+    """
+    api.LayerIndexに対するテストコード。
+    """
+
+    def _get_target_object(self, *args, **kwargs):
+        """
+        テスト対象のオブジェクトを取得する。
+
+        :param args: 可変長引数
+        :type args: tuple
+        :param kwargs: キーワード引数
+        :type kwargs: dict
+        :return: テスト対象のレイヤインデックス
+        :rtype: pyny.api.LayerIndex
+        """
+        # テスト対象のオブジェクトを生成する
+        from pyny.api import LayerIndex
+        return LayerIndex(*args, **kwargs)
+
+    def test_get_01(self):
+        """
+        [対象] get() : No.01
+        [条件] 存在する項目IDを指定して実行する。
+        [結果] マッチするデータが返却される。
+        """
+        target = self._get_target_object('dummy', [{'feature_id': 1}, {'feature_id': 2}])
+
+        self.assertEqual({'feature_id': 2}, target.get(2))
+
+    def test_get_02(self):
+        """
+        [対象] get() : No.02
+        [条件] 存在しない項目IDを指定して実行する。
+        [結果] Noneが返却される。
+        """
+        target = self._get_target_object('dummy', [{'feature_id': 1}])
+
+        self.assertIsNone(target.get(2))
+
+    def test_get_03(self):
+        """
+        [対象] get() : No.03
+        [条件] 項目IDが重複するデータを含めて構築する。
+        [結果] 先頭のデータが返却される。
+        """
+        target = self._get_target_object('dummy', [{'feature_id': 1, 'no': 1}, {'feature_id': 1, 'no': 2}])
+
+        self.assertEqual({'feature_id': 1, 'no': 1}, target.get(1))
+
+
+class SchemaTest(TestCase):
+    """
+    api.Schemaに対するテストコード。
+    """
+
+    def _get_target_object(self, *args, **kwargs):
+        """
+        テスト対象のオブジェクトを取得する。
+
+        :param args: 可変長引数
+        :type args: tuple
+        :param kwargs: キーワード引数
+        :type kwargs: dict
+        :return: テスト対象のスキーマ
+        :rtype: pyny.api.Schema
+        """
+        # テスト対象のオブジェクトを生成する
+        from pyny.api import Schema
+        return Schema(*args, **kwargs)
+
+    def test_apply_01(self):
+        """
+        [対象] apply() : No.01
+        [条件] 入れ子のキーを含むスキーマを指定したデータに適用する。
+        [結果] スキーマの項目のみを含み、値を変換した辞書が返却される。
+        """
+        target = self._get_target_object([(('feature_id',), int), (('attrs', 'attr0'), None), (('attrs', 'attr1'), float)])
+        data = {'feature_id': '1', 'status': 0, 'attrs': {'attr0': '流山市', 'attr1': '1.5', 'attr2': ''}, 'files': {}}
+
+        self.assertEqual({'feature_id': 1, 'attrs': {'attr0': '流山市', 'attr1': 1.5}}, target.apply(data))
+
+    def test_apply_02(self):
+        """
+        [対象] apply() : No.02
+        [条件] リストのインデックスを含むパスや、重複するパスを含むスキーマを適用する。
+        [結果] 辞書として辿れる位置の値が変換されずにそのまま残される。
+        """
+        target = self._get_target_object([
+            (('files', 0, 'url'), str),
+            (('attrs', 'attr0'), int),
+            (('attrs', 'attr0'), float),
+            (('geo',), str),
+            (('geo', 'lat'), float),
+        ])
+        data = {'files': [{'url': 'a'}], 'attrs': {'attr0': '1', 'attr1': '2'}, 'geo': {'lat': '35.8'}, 'status': 0}
+
+        self.assertEqual({'files': [{'url': 'a'}], 'attrs': {'attr0': '1'}, 'geo': {'lat': '35.8'}}, target.apply(data))
+
+    def test_apply_03(self):
+        """
+        [対象] apply() : No.03
+        [条件] 変換できない値や、辞書として辿れない値を含むデータに適用する。
+        [結果] 当該の値が変換されずにそのまま残され、存在しない値は含まれない。
+        """
+        target = self._get_target_object([(('feature_id',), int), (('attrs', 'attr0'), int), (('created',), str)])
+        data = {'feature_id': 'abc', 'attrs': '', 'status': 0}
+
+        self.assertEqual({'feature_id': 'abc', 'attrs': ''}, target.apply(data))
+
+    def test_apply_04(self):
+        """
+        [対象] apply() : No.04
+        [条件] 辞書以外のデータや、先頭がインデックスのパスを含むスキーマを適用する。
+        [結果] データがそのまま返却される。
+        """
+        target = self._get_target_object([(('feature_id',), int)])
+        self.assertEqual(['1'], target.apply(['1']))
+
+        target = self._get_target_object([(('feature_id',), int), ((0,), str)])
+        data = {'feature_id': '1', 'status': 0}
+        self.assertIs(data, target.apply(data))
+
+
+class JsonStreamReaderTest(TestCase):
+    """
+    api._JsonStreamReaderに対するテストコード。
+    """
+
+    def _get_target_object(self, data, chunk_size=None):
+        """
+        テスト対象のオブジェクトを取得する。
+
+        :param data: 読み込み対象のJSON
+        :type data: object
+        :param chunk_size: 一度に読み込むバイト数
+        :type chunk_size: int
+        :return: テスト対象のリーダー
+        :rtype: pyny.api._JsonStreamReader
+        """
+        # テスト対象のオブジェクトを生成する
+        from pyny.api import _JsonStreamReader
+        fp = io.BytesIO(json.dumps(data, ensure_ascii=False, indent=1).encode('utf-8'))
+        return _JsonStreamReader(fp, 'utf-8', chunk_size)
+
+    def test_iter_array_01(self):
+        """
+        [対象] iter_array() : No.01
+        [条件] 配列を含むJSONを指定して実行する。
+        [結果] 配列の要素が順に返却され、それ以外の値はmetaに格納される。
+        """
+        data = {
+            'num': 12345,
+            'results': [{'feature_id': 1, 'attrs': {'attr0': '市役所・出張所'}}, {'feature_id': 2, 'attrs': {}}],
+            '_timestamp': 1.5,
+        }
+        target = self._get_target_object(data)
+        actual = list(target.iter_array('results'))
+
+        self.assertEqual(data['results'], actual)
+        self.assertEqual({'num': 12345, '_timestamp': 1.5}, target.meta)
+
+    def test_iter_array_02(self):
+        """
+        [対象] iter_array() : No.02
+        [条件] 数値や多バイト文字が読み込みの区切りをまたぐように実行する。
+        [結果] 値が途切れることなく返却される。
+        """
+        data = {
+            'num': 1234567890,
+            'results': [{'feature_id': i, 'name': '流山市%d' % i, 'value': i * 1000003} for i in range(50)],
+        }
+        for chunk_size in (1, 2, 3, 7):
+            target = self._get_target_object(data, chunk_size)
+            actual = list(target.iter_array('results'))
+
+            self.assertEqual(data['results'], actual)
+            self.assertEqual({'num': 1234567890}, target.meta)
+
+    def test_iter_array_03(self):
+        """
+        [対象] iter_array() : No.03
+        [条件] 空の配列を含むJSONを指定して実行する。
+        [結果] 何も返却されない。
+        """
+        target = self._get_target_object({'num': 0, 'results': []})
+        actual = list(target.iter_array('results'))
+
+        self.assertEqual([], actual)
+
+    def test_iter_array_04(self):
+        """
+        [対象] iter_array() : No.04
+        [条件] 途中で途切れたJSONを指定して実行する。
+        [結果] ValueErrorが送出される。
+        """
+        from pyny.api import _JsonStreamReader
+        target = _JsonStreamReader(io.BytesIO(b'{"results": [{"feature_id": 1}, {"feat'))
+
+        with self.assertRaises(ValueError):
+            list(target.iter_array('results'))
@@ -0,0 +1,628 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright 2015-2019 Jun-ya HASEBA
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+from contextlib import contextmanager
+from email.message import Message
+from mock import patch
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest import TestCase
+
+
+class _Response:
+    """
+    テスト用のレスポンス。
+    """
+
+    def __init__(self, status, body, headers):
+        """
+        _Responseを構築する。
+
+        :param status: ステータスコード
+        :type status: int
+        :param body: レスポンスボディ
+        :type body: bytes
+        :param headers: レスポンスヘッダ
+        :type headers: dict
+        """
+        self.status = status
+        self.headers = Message()
+        for k, v in headers.items():
+            self.headers[k] = v
+        self._body = body
+
+    def read(self):
+        """
+        レスポンスボディを読み込む。
+
+        :return: レスポンスボディ
+        :rtype: bytes
+        """
+        return self._body
+
+    def getheader(self, name):
+        """
+        指定されたレスポンスヘッダの値を取得する。
+
+        :param name: ヘッダ名
+        :type name: str
+        :return: ヘッダの値
+        :rtype: str
+        """
+        return self.headers.get(name)
+
+
+class _Pool:
+    """
+    ETagによる条件付きリクエストに応答するテスト用のコネクションプール。
+    """
+
+    def __init__(self, body=b'{"num": 1}', etag='"v1"'):
+        """
+        _Poolを構築する。
+
+        :param body: レスポンスボディ
+        :type body: bytes
+        :param etag: ETag
+        :type etag: str
+        """
+        self.body = body
+        self.etag = etag
+        self.requests = []
+
+    @contextmanager
+    def urlopen(self, url, headers=None):
+        """
+        リクエストを記録してレスポンスを返却する。
+
+        :param url: URL
+        :type url: str
+        :param headers: リクエストヘッダ
+        :type headers: dict
+        :return: レスポンス
+        :rtype: _Response
+        """
+        self.requests.append((url, dict(headers or {})))
+        if (headers or {}).get('If-None-Match') == self.etag:
+            yield _Response(304, b'', {'ETag': self.etag})
+        else:
+            yield _Response(200, self.body, {'ETag': self.etag, 'Content-Type': 'application/json; charset=utf-8'})
+
+
+class MemoryCacheTest(TestCase):
+    """
+    cache.MemoryCacheに対するテストコード。
+    """
+
+    def _get_target_object(self, *args, **kwargs):
+        """
+        テスト対象のオブジェクトを取得する。
+
+        :param args: 可変長引数
+        :type args: tuple
+        :param kwargs: キーワード引数
+        :type kwargs: dict
+        :return: テスト対象のキャッシュ
+        :rtype: pyny.cache.MemoryCache
+        """
+        # テスト対象のオブジェクトを生成する
+        from pyny.cache import MemoryCache
+        return MemoryCache(*args, **kwargs)
+
+    def test_get_01(self):
+        """
+        [対象] get() : No.01
+        [条件] 設定したキーを指定して実行する。
+        [結果] 設定した値が返却される。
+        """
+        target = self._get_target_object()
+        target.set(('c1161', 'a'), [1, 2, 3])
+
+        self.assertEqual([1, 2, 3], target.get(('c1161', 'a')))
+
+    def test_get_02(self):
+        """
+        [対象] get() : No.02
+        [条件] 設定していないキーを指定して実行する。
+        [結果] デフォルト値が返却される。
+        """
+        target = self._get_target_object()
+
+        self.assertIsNone(target.get(('c1161', 'a')))
+        self.assertEqual(0, target.get(('c1161', 'a'), 0))
+
+    def test_get_03(self):
+        """
+        [対象] get() : No.03
+        [条件] 有効期間が切れたキーを指定して実行する。
+        [結果] デフォルト値が返却され、エントリが破棄される。
+        """
+        target = self._get_target_object(ttl=60)
+        target.set(('c1161', 'a'), 'value', ttl=0)
+
+        self.assertIsNone(target.get(('c1161', 'a')))
+        self.assertEqual(0, len(target))
+        self.assertEqual(0, target.size)
+
+    def test_set_01(self):
+        """
+        [対象] set() : No.01
+        [条件] 合計サイズが上限を超えるように実行する。
+        [結果] 最も長く参照されていないエントリから破棄される。
+        """
+        target = self._get_target_object(max_size=300)
+        target.set(('a',), 'a', size=100)
+        target.set(('b',), 'b', size=100)
+        target.set(('c',), 'c', size=100)
+        target.get(('a',))
+        target.set(('d',), 'd', size=100)
+
+        self.assertEqual('a', target.get(('a',)))
+        self.assertIsNone(target.get(('b',)))
+        self.assertEqual('d', target.get(('d',)))
+        self.assertEqual(300, target.size)
+
+    def test_set_02(self):
+        """
+        [対象] set() : No.02
+        [条件] 上限より大きい値を指定して実行する。
+        [結果] ほかのエントリがすべて破棄され、値は単独で保持される。
+        """
+        target = self._get_target_object(max_size=100)
+        target.set(('a',), 'a', size=50)
+        target.set(('b',), 'b', size=101)
+
+        self.assertIsNone(target.get(('a',)))
+        self.assertEqual('b', target.get(('b',)))
+        self.assertEqual(101, target.size)
+
+    def test_set_03(self):
+        """
+        [対象] set() : No.03
+        [条件] サイズを指定せずに実行する。
+        [結果] 値のサイズが推定される。
+        """
+        target = self._get_target_object()
+        target.set(('a',), [{'name': 'x' * 1000}])
+
+        self.assertGreater(target.size, 1000)
+
+    def test_set_04(self):
+        """
+        [対象] set() : No.04
+        [条件] 要素数の多いリストを、サイズを指定せずに指定して実行する。
+        [結果] 一部の要素から推定したサイズが、すべての要素をたどった場合とおおむね一致する。
+        """
+        from pyny import cache
+        value = [{'feature_id': i, 'name': 'x' * (i % 100)} for i in range(10000)]
+        target = self._get_target_object()
+        target.set(('a',), value)
+        with patch('pyny.cache.ESTIMATE_SAMPLE_SIZE', len(value)):
+            expected = cache.estimate_size(value)
+
+        self.assertAlmostEqual(1.0, target.size / expected, delta=0.05)
+
+    def test_invalidate_01(self):
+        """
+        [対象] invalidate() : No.01
+        [条件] レイヤIDを指定して実行する。
+        [結果] 当該レイヤIDのエントリのみ破棄される。
+        """
+        target = self._get_target_object()
+        target.set(('c1161', 'a'), 'a', size=10)
+        target.set(('c1161', 'b'), 'b', size=10)
+        target.set(('c1150', 'a'), 'c', size=10)
+        target.invalidate('c1161')
+
+        self.assertIsNone(target.get(('c1161', 'a')))
+        self.assertIsNone(target.get(('c1161', 'b')))
+        self.assertEqual('c', target.get(('c1150', 'a')))
+        self.assertEqual(10, target.size)
+
+    def test_invalidate_02(self):
+        """
+        [対象] invalidate() : No.02
+        [条件] レイヤIDを指定せずに実行する。
+        [結果] すべてのエントリが破棄される。
+        """
+        target = self._get_target_object()
+        target.set(('c1161', 'a'), 'a', size=10)
+        target.set(('c1150', 'a'), 'b', size=10)
+        target.invalidate()
+
+        self.assertEqual(0, len(target))
+        self.assertEqual(0, target.size)
+
+
+class SingleFlightTest(TestCase):
+    """
+    cache.SingleFlightに対するテストコード。
+    """
+
+    def _get_target_object(self):
+        """
+        テスト対象のオブジェクトを取得する。
+
+        :return: テスト対象のオブジェクト
+        :rtype: pyny.cache.SingleFlight
+        """
+        # テスト対象のオブジェクトを生成する
+        from pyny.cache import SingleFlight
+        return SingleFlight()
+
+    def _run_concurrently(self, target, key, func, count):
+        """
+        指定された関数を複数のスレッドから同じキーで同時に実行する。
+
+        :param target: テスト対象のオブジェクト
+        :type target: pyny.cache.SingleFlight
+        :param key: キー
+        :type key: object
+        :param func: 実行する関数
+        :type func: function
+        :param count: スレッドの数
+        :type count: int
+        :return: 各スレッドの戻り値または送出された例外のリスト
+        :rtype: list
+        """
+        # 最初のスレッドの実行中にほかのスレッドを呼び出す
+        started = threading.Event()
+        release = threading.Event()
+        results = []
+
+        def leader():
+            started.set()
+            release.wait()
+            return func()
+
+        def run(f):
+            try:
+                results.append(target.do(key, f))
+            except Exception as e:
+                results.append(e)
+
+        threads = [threading.Thread(target=run, args=(leader,))]
+        threads[0].start()
+        started.wait()
+        threads += [threading.Thread(target=run, args=(func,)) for _ in range(count - 1)]
+        for thread in threads[1:]:
+            thread.start()
+        while target.stats()['coalesced'] < count - 1:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_do_01(self):
+        """
+        [対象] do() : No.01
+        [条件] 同じキーで同時に実行する。
+        [結果] 関数は1回だけ実行され、すべての呼び出し元に同じ結果が返却される。
+        """
+        target = self._get_target_object()
+        calls = []
+
+        def func():
+            calls.append(1)
+            return object()
+
+        actual = self._run_concurrently(target, 'key', func, 5)
+
+        self.assertEqual(1, len(calls))
+        self.assertEqual(5, len(actual))
+        self.assertTrue(all(result is actual[0] for result in actual))
+        self.assertEqual({'executions': 1, 'coalesced': 4}, target.stats())
+
+    def test_do_02(self):
+        """
+        [対象] do() : No.02
+        [条件] 例外を送出する関数を同じキーで同時に実行する。
+        [結果] すべての呼び出し元に同じ例外が送出される。
+        """
+        target = self._get_target_object()
+        error = ValueError('error')
+
+        def func():
+            raise error
+
+        actual = self._run_concurrently(target, 'key', func, 3)
+
+        self.assertEqual([error, error, error], actual)
+
+    def test_do_03(self):
+        """
+        [対象] do() : No.03
+        [条件] 前回の呼び出しが完了したあとに同じキーで実行する。
+        [結果] 関数が改めて実行される。
+        """
+        target = self._get_target_object()
+        actual1 = target.do('key', lambda: 1)
+        actual2 = target.do('key', lambda: 2)
+
+        self.assertEqual(1, actual1)
+        self.assertEqual(2, actual2)
+        self.assertEqual({'executions': 2, 'coalesced': 0}, target.stats())
+
+    def _run_async(self, coroutine):
+        """
+        指定されたコルーチンを新しいイベントループで実行する。
+
+        :param coroutine: コルーチン
+        :type coroutine: coroutine
+        :return: コルーチンの戻り値
+        :rtype: object
+        """
+        # イベントループを生成して実行する
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(coroutine)
+        finally:
+            loop.close()
+
+    def test_do_async_01(self):
+        """
+        [対象] do_async() : No.01
+        [条件] 同じイベントループで、同じキーで同時に実行する。
+        [結果] 関数は1回だけ実行され、すべての呼び出し元に同じ結果が返却される。
+        """
+        target = self._get_target_object()
+        calls = []
+
+        async def func():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return object()
+
+        async def run():
+            return await asyncio.gather(*[target.do_async('key', func) for _ in range(5)])
+
+        actual = self._run_async(run())
+
+        self.assertEqual(1, len(calls))
+        self.assertTrue(all(result is actual[0] for result in actual))
+        self.assertEqual({'executions': 1, 'coalesced': 4}, target.stats())
+
+    def test_do_async_02(self):
+        """
+        [対象] do_async() : No.02
+        [条件] 例外を送出するコルーチン関数を同じキーで同時に実行する。
+        [結果] すべての呼び出し元に同じ例外が送出される。
+        """
+        target = self._get_target_object()
+        error = ValueError('error')
+
+        async def func():
+            await asyncio.sleep(0.01)
+            raise error
+
+        async def run():
+            return await asyncio.gather(*[target.do_async('key', func) for _ in range(3)], return_exceptions=True)
+
+        actual = self._run_async(run())
+
+        self.assertEqual([error, error, error], actual)
+
+    def test_do_async_03(self):
+        """
+        [対象] do_async() : No.03
+        [条件] 前回の呼び出しが完了したあとに同じキーで実行する。
+        [結果] 関数が改めて実行される。
+        """
+        target = self._get_target_object()
+        values = iter([1, 2])
+
+        async def func():
+            return next(values)
+
+        async def run():
+            actual1 = await target.do_async('key', func)
+            await asyncio.sleep(0)
+            return actual1, await target.do_async('key', func)
+
+        actual = self._run_async(run())
+
+        self.assertEqual((1, 2), actual)
+        self.assertEqual({'executions': 2, 'coalesced': 0}, target.stats())
+
+    def test_reset_stats_01(self):
+        """
+        [対象] reset_stats() : No.01
+        [条件] 呼び出したあとに実行する。
+        [結果] 呼び出しの状況が初期化される。
+        """
+        target = self._get_target_object()
+        target.do('key', lambda: 1)
+        target.reset_stats()
+
+        self.assertEqual({'executions': 0, 'coalesced': 0}, target.stats())
+
+
+class DiskCacheTest(TestCase):
+    """
+    cache.DiskCacheに対するテストコード。
+    """
+
+    def setUp(self):
+        """
+        キャッシュを保存する一時ディレクトリを作成する。
+        """
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """
+        一時ディレクトリを削除する。
+        """
+        shutil.rmtree(self.directory)
+
+    def _get_target_object(self, **kwargs):
+        """
+        テスト対象のオブジェクトを取得する。
+
+        :param kwargs: キーワード引数
+        :type kwargs: dict
+        :return: テスト対象のキャッシュ
+        :rtype: pyny.cache.DiskCache
+        """
+        # テスト対象のオブジェクトを生成する
+        from pyny.cache import DiskCache
+        return DiskCache(self.directory, **kwargs)
+
+    def test_fetch_01(self):
+        """
+        [対象] fetch() : No.01
+        [条件] キャッシュが存在しないURLを指定して実行する。
+        [結果] レスポンスボディが返却され、ミスとして記録される。
+        """
+        target = self._get_target_object()
+        actual = target.fetch(_Pool(), 'http://example.com/a')
+
+        self.assertEqual((b'{"num": 1}', 'utf-8'), actual)
+        self.assertEqual({'hits': 0, 'misses': 1, 'revalidations': 0}, target.stats())
+
+    def test_fetch_02(self):
+        """
+        [対象] fetch() : No.02
+        [条件] キャッシュが存在するURLを指定して実行する。
+        [結果] ETagで再検証され、キャッシュしたレスポンスボディが返却される。
+        """
+        pool = _Pool()
+        target = self._get_target_object()
+        target.fetch(pool, 'http://example.com/a')
+        pool.body = b'changed'
+        actual = target.fetch(pool, 'http://example.com/a')
+
+        self.assertEqual((b'{"num": 1}', 'utf-8'), actual)
+        self.assertEqual({'If-None-Match': '"v1"'}, pool.requests[1][1])
+        self.assertEqual({'hits': 0, 'misses': 1, 'revalidations': 1}, target.stats())
+
+    def test_fetch_03(self):
+        """
+        [対象] fetch() : No.03
+        [条件] サーバ側のデータが更新された状態で実行する。
+        [結果] 新しいレスポンスボディが返却され、キャッシュが更新される。
+        """
+        pool = _Pool()
+        target = self._get_target_object()
+        target.fetch(pool, 'http://example.com/a')
+        pool.body, pool.etag = b'{"num": 2}', '"v2"'
+        actual1 = target.fetch(pool, 'http://example.com/a')
+        actual2 = target.fetch(pool, 'http://example.com/a')
+
+        self.assertEqual((b'{"num": 2}', 'utf-8'), actual1)
+        self.assertEqual((b'{"num": 2}', 'utf-8'), actual2)
+        self.assertEqual({'hits': 0, 'misses': 2, 'revalidations': 1}, target.stats())
+
+    def test_fetch_04(self):
+        """
+        [対象] fetch() : No.04
+        [条件] max_ageを指定し、有効期間内に実行する。
+        [結果] リクエストを送信せずにキャッシュしたレスポンスボディが返却される。
+        """
+        pool = _Pool()
+        target = self._get_target_object(max_age=60)
+        target.fetch(pool, 'http://example.com/a')
+        actual = target.fetch(pool, 'http://example.com/a')
+
+        self.assertEqual((b'{"num": 1}', 'utf-8'), actual)
+        self.assertEqual(1, len(pool.requests))
+        self.assertEqual({'hits': 1, 'misses': 1, 'revalidations': 0}, target.stats())
+
+    def test_fetch_05(self):
+        """
+        [対象] fetch() : No.05
+        [条件] 合計サイズが上限を超えるように実行する。
+        [結果] 最も長く参照されていないキャッシュから削除される。
+        """
+        pool = _Pool(body=b'x' * 100)
+        target = self._get_target_object(max_size=500)
+        for name in ('a', 'b', 'c'):
+            target.fetch(pool, 'http://example.com/' + name)
+            time.sleep(0.01)
+        target.fetch(pool, 'http://example.com/a')
+        time.sleep(0.01)
+        target.fetch(pool, 'http://example.com/d')
+
+        self.assertTrue(os.path.exists(target._path('http://example.com/a')))
+        self.assertFalse(os.path.exists(target._path('http://example.com/b')))
+        self.assertTrue(os.path.exists(target._path('http://example.com/d')))
+        self.assertLessEqual(target._size, 500)
+
+    def test_fetch_06(self):
+        """
+        [対象] fetch() : No.06
+        [条件] 同じディレクトリを指定して再構築したうえで実行する。
+        [結果] 以前に保存したキャッシュで再検証される。
+        """
+        pool = _Pool()
+        self._get_target_object().fetch(pool, 'http://example.com/a')
+        target = self._get_target_object()
+        target.fetch(pool, 'http://example.com/a')
+
+        self.assertEqual({'hits': 0, 'misses': 0, 'revalidations': 1}, target.stats())
+
+    def test_fetch_07(self):
+        """
+        [対象] fetch() : No.07
+        [条件] キャッシュが存在するURLを指定し、再検証の結果が304となるように実行する。
+        [結果] キャッシュファイルは置き換えられず、ヘッダ行の保存日時のみが更新される。
+        """
+        pool = _Pool(body=b'x' * 100000)
+        target = self._get_target_object(max_age=60)
+        with patch('pyny.cache.time.time', return_value=1000000000.0):
+            target.fetch(pool, 'http://example.com/a')
+        path = target._path('http://example.com/a')
+        before = os.stat(path)
+        with patch('pyny.cache.time.time', return_value=1000000100.5):
+            target.fetch(pool, 'http://example.com/a')
+        after = os.stat(path)
+
+        self.assertEqual(before.st_ino, after.st_ino)
+        self.assertEqual(before.st_size, after.st_size)
+        self.assertEqual('1000000100.500000', target._load(path)['stored'])
+        self.assertEqual(b'x' * 100000, target._load(path)['body'])
+        self.assertEqual({'hits': 0, 'misses': 1, 'revalidations': 1}, target.stats())
+
+    def test_reset_stats_01(self):
+        """
+        [対象] reset_stats() : No.01
+        [条件] キャッシュを利用したあとに実行する。
+        [結果] 利用状況が初期化される。
+        """
+        target = self._get_target_object()
+        target.fetch(_Pool(), 'http://example.com/a')
+        target.reset_stats()
+
+        self.assertEqual({'hits': 0, 'misses': 0, 'revalidations': 0}, target.stats())
+
+    def test_clear_01(self):
+        """
+        [対象] clear() : No.01
+        [条件] キャッシュを保存したあとに実行する。
+        [結果] すべてのキャッシュが削除される。
+        """
+        target = self._get_target_object()
+        target.fetch(_Pool(), 'http://example.com/a')
+        target.clear()
+
+        self.assertEqual([], os.listdir(self.directory))
+        self.assertEqual(0, target._size)
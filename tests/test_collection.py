@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright 2015-2019 Jun-ya HASEBA
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from array import array
+from mock import patch
+from unittest import TestCase, skipIf
+
+from pyny.collection import ModelCollection
+from pyny.fields import FloatField, IntegerField, PointField, StringField
+from pyny.geometry import Point
+from pyny.models import Model
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class FacilityModel(Model):
+    """
+    コレクションをテストするためのモデル。
+    """
+    id = IntegerField('feature_id')
+    latitude = FloatField('attrs.attr6')
+    name = StringField('attrs.attr2')
+    location = PointField('geometry')
+
+
+class FileModel(Model):
+    """
+    リストのインデックスを含むキーのコレクションをテストするためのモデル。
+    """
+    name = StringField('attrs.attr2')
+    url = StringField('files.0.url')
+
+
+class CustomInitModel(FacilityModel):
+    """
+    独自のコンストラクタを定義したモデル。
+    """
+    def __init__(self, data):
+        """
+        CustomInitModelを構築する。
+
+        :param data: マッピング対象のJSON
+        :type data: dict
+        """
+        # 基底クラスのコンストラクタでマッピングしたあとにフィールド以外の項目から属性を設定する
+        super().__init__(data)
+        self.geometry = data.get('geometry')
+
+
+# テストに使用するデータ
+RECORDS = [
+    {'feature_id': 1, 'attrs': {'attr2': '流山市役所', 'attr6': '35.8562708'}, 'geometry': 'POINT(139.9028991 35.8562708)'},
+    {'feature_id': 2, 'attrs': {'attr2': 'おおたかの森出張所', 'attr6': '35.8706965'}, 'geometry': 'POINT(139.9261438 35.8706965)'},
+    {'feature_id': 3, 'attrs': {'attr2': '東部出張所', 'attr6': '35.843176'}, 'geometry': 'POINT(139.942968 35.843176)'},
+]
+
+
+class ModelCollectionTest(TestCase):
+    """
+    collection.ModelCollectionに対するテストコード。
+    """
+
+    def _get_target_object(self, records=RECORDS):
+        """
+        テスト対象のオブジェクトを取得する。
+
+        :param records: データのリスト
+        :type records: list
+        :return: テスト対象のオブジェクト
+        :rtype: pyny.collection.ModelCollection
+        """
+        # テスト対象のオブジェクトを生成する
+        return ModelCollection.from_records(FacilityModel, records)
+
+    def test_from_records_01(self):
+        """
+        [対象] from_records() : No.01
+        [条件] NumPyがインストールされていない状態で実行する。
+        [結果] 数値のフィールドはarray.arrayに、それ以外のフィールドはリストに格納される。
+        """
+        with patch('pyny.collection.numpy', None):
+            actual = self._get_target_object()
+
+        self.assertEqual(array('q', [1, 2, 3]), actual.column('id'))
+        self.assertEqual(array('d', [35.8562708, 35.8706965, 35.843176]), actual.column('latitude'))
+        self.assertEqual(['流山市役所', 'おおたかの森出張所', '東部出張所'], actual.column('name'))
+
+    @skipIf(numpy is None, 'NumPy is not installed')
+    def test_from_records_06(self):
+        """
+        [対象] from_records() : No.06
+        [条件] NumPyがインストールされた状態で実行する。
+        [結果] 数値のフィールドはnumpy.ndarrayに格納され、行のモデルにはPythonの数値が設定される。
+        """
+        actual = self._get_target_object()
+
+        self.assertIsInstance(actual.column('id'), numpy.ndarray)
+        self.assertEqual('int64', actual.column('id').dtype.name)
+        self.assertEqual([35.8562708, 35.8706965, 35.843176], actual.column('latitude').tolist())
+        self.assertIs(int, type(actual[0].id))
+        self.assertIs(float, type(actual[0].latitude))
+
+    def test_from_records_02(self):
+        """
+        [対象] from_records() : No.02
+        [条件] 値が存在しない行を含むデータを指定して実行する。
+        [結果] 当該フィールドはNoneを含むリストに格納される。
+        """
+        actual = self._get_target_object([{'feature_id': 1}, {'attrs': {'attr6': '35.0'}}])
+
+        self.assertEqual([1, None], actual.column('id'))
+        self.assertEqual([None, 35.0], actual.column('latitude'))
+
+    def test_from_records_03(self):
+        """
+        [対象] from_records() : No.03
+        [条件] PointFieldを持つモデルのデータを指定して実行する。
+        [結果] 点の列はx座標、y座標の配列に格納され、行のモデルには点が設定される。
+        """
+        actual = self._get_target_object()
+
+        self.assertEqual(array('d', [139.9028991, 139.9261438, 139.942968]), actual.column('location').xs)
+        self.assertEqual(array('d', [35.8562708, 35.8706965, 35.843176]), actual.column('location').ys)
+        self.assertEqual(Point(139.9261438, 35.8706965), actual[1].location)
+        self.assertEqual([Point(139.942968, 35.843176)], actual[2:].column('location').tolist())
+
+    def test_from_records_04(self):
+        """
+        [対象] from_records() : No.04
+        [条件] 空のデータや、リストのインデックスを含むキーの値が存在しないデータを指定して実行する。
+        [結果] 1件ずつモデルを構築した場合と同じ値が列に格納される。
+        """
+        records = [
+            {'attrs': {'attr2': '流山市役所'}, 'files': [{'url': 'http://example.com/1.jpg'}]},
+            {},
+            {'attrs': None, 'files': []},
+        ]
+        actual = ModelCollection.from_records(FileModel, records)
+
+        self.assertEqual([FileModel(data).name for data in records], actual.column('name'))
+        self.assertEqual(['http://example.com/1.jpg', None, None], actual.column('url'))
+
+    def test_from_records_05(self):
+        """
+        [対象] from_records() : No.05
+        [条件] 独自のコンストラクタを定義したモデルのデータを指定して実行する。
+        [結果] 行のモデルはコンストラクタで構築され、スライスしたコレクションでも同様に構築される。
+        """
+        actual = ModelCollection.from_records(CustomInitModel, RECORDS)
+
+        self.assertEqual([1, 2, 3], list(actual.column('id')))
+        self.assertEqual(('流山市役所', 'POINT(139.9028991 35.8562708)'), (actual[0].name, actual[0].geometry))
+        self.assertEqual(['POINT(139.942968 35.843176)'], [model.geometry for model in actual[2:]])
+        self.assertIsNot(actual[1], actual[1])
+
+    def test_column_01(self):
+        """
+        [対象] column() : No.01
+        [条件] 存在しないフィールド名を指定して実行する。
+        [結果] KeyErrorが送出される。
+        """
+        target = self._get_target_object()
+        with self.assertRaises(KeyError):
+            target.column('address')
+
+    def test_len_01(self):
+        """
+        [対象] __len__() : No.01
+        [条件] 実行する。
+        [結果] 行数が返却される。
+        """
+        target = self._get_target_object()
+
+        self.assertEqual(3, len(target))
+
+    def test_getitem_01(self):
+        """
+        [対象] __getitem__() : No.01
+        [条件] 行番号（負数を含む）を指定して実行する。
+        [結果] 当該行のモデルが返却され、同じ行でも参照するたびに別のモデルが構築される。
+        """
+        target = self._get_target_object()
+        actual1 = target[1]
+        actual2 = target[-1]
+
+        self.assertTrue(isinstance(actual1, FacilityModel))
+        self.assertEqual((2, 35.8706965, 'おおたかの森出張所'), (actual1.id, actual1.latitude, actual1.name))
+        self.assertEqual(3, actual2.id)
+        self.assertIs(int, type(actual2.id))
+        self.assertIsNot(actual1, target[1])
+        self.assertEqual(actual1.name, target[1].name)
+
+    def test_getitem_02(self):
+        """
+        [対象] __getitem__() : No.02
+        [条件] 範囲外の行番号を指定して実行する。
+        [結果] IndexErrorが送出される。
+        """
+        target = self._get_target_object()
+        with self.assertRaises(IndexError):
+            target[3]
+
+    def test_getitem_03(self):
+        """
+        [対象] __getitem__() : No.03
+        [条件] スライスを指定して実行する。
+        [結果] 当該範囲の行を持つコレクションが返却される。
+        """
+        target = self._get_target_object()
+        actual = target[1:]
+
+        self.assertTrue(isinstance(actual, ModelCollection))
+        self.assertEqual(2, len(actual))
+        self.assertEqual([2, 3], [model.id for model in actual])
+
+    def test_iter_01(self):
+        """
+        [対象] __iter__() : No.01
+        [条件] 実行する。
+        [結果] 各行のモデルが順に返却される。
+        """
+        target = self._get_target_object()
+        actual = [(model.id, model.name) for model in target]
+
+        self.assertEqual([(1, '流山市役所'), (2, 'おおたかの森出張所'), (3, '東部出張所')], actual)
+
+    def test_iter_02(self):
+        """
+        [対象] __iter__() : No.02
+        [条件] 反復する前後でコレクションの推定サイズを求める。
+        [結果] 構築した行のモデルはコレクションに保持されず、推定サイズが変わらない。
+        """
+        from pyny.cache import estimate_size
+        target = self._get_target_object()
+        expected = estimate_size(target)
+        actual = [model for model in target]
+
+        self.assertEqual(3, len(actual))
+        self.assertEqual(expected, estimate_size(target))
+
+    @patch('pyny.models.api._get_json')
+    def test_get_collection_01(self, get_json):
+        """
+        [対象] Model.get_collection() : No.01
+        [条件] 同じレイヤIDを指定して複数回実行する。
+        [結果] 初回に構築したコレクションが再利用される。
+        """
+        get_json.return_value = {'num': 3, 'results': RECORDS}
+
+        from pyny import api
+        api.invalidate()
+        actual1 = FacilityModel.get_collection('dummy')
+        actual2 = FacilityModel.get_collection('dummy')
+
+        self.assertEqual(3, len(actual1))
+        self.assertIs(actual1, actual2)
+        self.assertEqual(1, get_json.call_count)
@@ -18,7 +18,13 @@
 
 import datetime
 import decimal
-from unittest import TestCase
+from mock import patch
+from unittest import TestCase, skipIf
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 class StringFieldTest(TestCase):
@@ -83,6 +89,17 @@ class StringFieldTest(TestCase):
 
         self.assertEqual('13', actual)
 
+    def test_convert_many_01(self):
+        """
+        [対象] convert_many() : No.01
+        [条件] 値が存在しない要素を含むリストを指定して実行する。
+        [結果] 各要素が文字列化され、値が存在しない要素はNoneのまま返却される。
+        """
+        target = self._get_target_object()
+        actual = target.convert_many(['a', 1, None])
+
+        self.assertEqual(['a', '1', None], actual)
+
 
 class IntegerFieldTest(TestCase):
     """
@@ -156,6 +173,56 @@ class IntegerFieldTest(TestCase):
         with self.assertRaises(ValueError):
             target.convert('error')
 
+    def test_convert_many_01(self):
+        """
+        [対象] convert_many() : No.01
+        [条件] 文字列、整数、値が存在しない要素を含むリストを指定して実行する。
+        [結果] 各要素がconvert()と同じ規則で整数化され、値が存在しない要素はNoneのまま返却される。
+        """
+        target = self._get_target_object()
+        actual = target.convert_many(['10', 20, None, True])
+
+        self.assertEqual([10, 20, None, True], actual)
+        self.assertIs(True, actual[3])
+
+    @skipIf(numpy is None, 'NumPy is not installed')
+    def test_convert_column_01(self):
+        """
+        [対象] _convert_column() : No.01
+        [条件] NumPyがインストールされた状態で、値がすべて揃った文字列のリストを指定して実行する。
+        [結果] int64のnumpy.ndarrayが返却される。
+        """
+        target = self._get_target_object()
+        actual = target._convert_column(['10', '-20', '30'])
+
+        self.assertIsInstance(actual, numpy.ndarray)
+        self.assertEqual('int64', actual.dtype.name)
+        self.assertEqual([10, -20, 30], actual.tolist())
+
+    def test_convert_column_02(self):
+        """
+        [対象] _convert_column() : No.02
+        [条件] NumPyがインストールされていない状態、または値が存在しない要素を含むリストを指定して実行する。
+        [結果] convert_many()と同じリストが返却される。
+        """
+        target = self._get_target_object()
+        with patch('pyny.fields.numpy', None):
+            actual1 = target._convert_column(['10', '20'])
+        actual2 = target._convert_column(['10', None])
+
+        self.assertEqual([10, 20], actual1)
+        self.assertEqual([10, None], actual2)
+
+    def test_convert_column_03(self):
+        """
+        [対象] _convert_column() : No.03
+        [条件] 整数化できない文字列を含むリストを指定して実行する。
+        [結果] convert()と同じくValueErrorが送出される。
+        """
+        target = self._get_target_object()
+        with self.assertRaises(ValueError):
+            target._convert_column(['10', '1.5'])
+
 
 class DecimalFieldTest(TestCase):
     """
@@ -229,6 +296,17 @@ class DecimalFieldTest(TestCase):
         with self.assertRaises(decimal.InvalidOperation):
             target.convert('error')
 
+    def test_convert_many_01(self):
+        """
+        [対象] convert_many() : No.01
+        [条件] 文字列、数値、値が存在しない要素を含むリストを指定して実行する。
+        [結果] 各要素が固定小数点数化され、値が存在しない要素はNoneのまま返却される。
+        """
+        target = self._get_target_object()
+        actual = target.convert_many(['1.5', 2, None])
+
+        self.assertEqual([decimal.Decimal('1.5'), decimal.Decimal('2'), None], actual)
+
 
 class FloatFieldTest(TestCase):
     """
@@ -302,6 +380,42 @@ class FloatFieldTest(TestCase):
         with self.assertRaises(ValueError):
             target.convert('error')
 
+    def test_convert_many_01(self):
+        """
+        [対象] convert_many() : No.01
+        [条件] 文字列、数値、値が存在しない要素を含むリストを指定して実行する。
+        [結果] 各要素が浮動小数点数化され、値が存在しない要素はNoneのまま返却される。
+        """
+        target = self._get_target_object()
+        actual = target.convert_many(['1.5', 2, None, 3.5])
+
+        self.assertEqual([1.5, 2.0, None, 3.5], actual)
+        self.assertIsInstance(actual[1], float)
+
+    @skipIf(numpy is None, 'NumPy is not installed')
+    def test_convert_column_01(self):
+        """
+        [対象] _convert_column() : No.01
+        [条件] NumPyがインストールされた状態で、値がすべて揃った文字列のリストを指定して実行する。
+        [結果] float64のnumpy.ndarrayが返却される。
+        """
+        target = self._get_target_object()
+        actual = target._convert_column(['35.8562708', '139.9028991', '1e3'])
+
+        self.assertIsInstance(actual, numpy.ndarray)
+        self.assertEqual('float64', actual.dtype.name)
+        self.assertEqual([35.8562708, 139.9028991, 1000.0], actual.tolist())
+
+    def test_convert_column_02(self):
+        """
+        [対象] _convert_column() : No.02
+        [条件] 浮動小数点数化できない文字列を含むリストを指定して実行する。
+        [結果] convert()と同じくValueErrorが送出される。
+        """
+        target = self._get_target_object()
+        with self.assertRaises(ValueError):
+            target._convert_column(['1.5', 'error'])
+
 
 class DateFieldTest(TestCase):
     """
@@ -386,6 +500,76 @@ class DateFieldTest(TestCase):
         with self.assertRaises(ValueError):
             target.convert('error')
 
+    def test_convert_05(self):
+        """
+        [対象] convert() : No.05
+        [条件] 桁数がデフォルトフォーマットと一致しない文字列を指定して実行する。
+        [結果] 指定した値がstrptime()と同じ規則で日付化して返却される。
+        """
+        target = self._get_target_object()
+        actual = target.convert('1989/6/3')
+
+        self.assertEqual(datetime.date(1989, 6, 3), actual)
+
+    def test_convert_06(self):
+        """
+        [対象] convert() : No.06
+        [条件] 存在しない日付を表す文字列を指定して実行する。
+        [結果] ValueErrorが送出される。
+        """
+        target = self._get_target_object()
+        with self.assertRaises(ValueError):
+            target.convert('2013/02/30')
+
+    def test_convert_07(self):
+        """
+        [対象] convert() : No.07
+        [条件] 記憶する数を指定してオブジェクトを生成し、同じ文字列を指定して複数回実行する。
+        [結果] 1回目に変換した値が返却される。
+        """
+        target = self._get_target_object(memo_size=16)
+        actual1 = target.convert('1989/06/23')
+        actual2 = target.convert('1989/06/23')
+
+        self.assertEqual(datetime.date(1989, 6, 23), actual1)
+        self.assertIs(actual1, actual2)
+
+    def test_convert_many_01(self):
+        """
+        [対象] convert_many() : No.01
+        [条件] 文字列、日付、値が存在しない要素を含むリストを指定して実行する。
+        [結果] 各要素が日付化され、値が存在しない要素はNoneのまま返却される。
+        """
+        target = self._get_target_object()
+        actual = target.convert_many(['1989/06/23', datetime.date(2013, 11, 10), None, '1989/6/3'])
+
+        self.assertEqual([datetime.date(1989, 6, 23), datetime.date(2013, 11, 10), None, datetime.date(1989, 6, 3)], actual)
+
+    @skipIf(numpy is None, 'NumPy is not installed')
+    def test_convert_many_02(self):
+        """
+        [対象] convert_many() : No.02
+        [条件] NumPyがインストールされた状態で、既定のフォーマットの文字列のみのリストを指定して実行する。
+        [結果] NumPyで変換され、convert()と同じ日付が返却される。
+        """
+        target = self._get_target_object()
+        values = ['1989/06/23', '2016/02/29', '9999/12/31', '0001/01/01']
+        actual = target.convert_many(values)
+
+        self.assertEqual([target.convert(v) for v in values], actual)
+        self.assertTrue(all(type(v) is datetime.date for v in actual))
+
+    def test_convert_many_03(self):
+        """
+        [対象] convert_many() : No.03
+        [条件] 0年や存在しない日付を含む、既定のフォーマットの文字列のみのリストを指定して実行する。
+        [結果] convert()と同じくValueErrorが送出される。
+        """
+        target = self._get_target_object()
+        for values in (['0000/01/01', '2015/01/01'], ['2015/01/01', '2015/02/29']):
+            with self.assertRaises(ValueError):
+                target.convert_many(values)
+
 
 class DateTimeFieldTest(TestCase):
     """
@@ -469,3 +653,348 @@ class DateTimeFieldTest(TestCase):
         target = self._get_target_object()
         with self.assertRaises(ValueError):
             target.convert('error')
+
+    def test_convert_05(self):
+        """
+        [対象] convert() : No.05
+        [条件] 桁数がデフォルトフォーマットと一致しない文字列を指定して実行する。
+        [結果] 指定した値がstrptime()と同じ規則で日時化して返却される。
+        """
+        target = self._get_target_object()
+        actual = target.convert('1989/6/3 1:2:3')
+
+        self.assertEqual(datetime.datetime(1989, 6, 3, 1, 2, 3), actual)
+
+    def test_convert_06(self):
+        """
+        [対象] convert() : No.06
+        [条件] 存在しない日時を表す文字列を指定して実行する。
+        [結果] ValueErrorが送出される。
+        """
+        target = self._get_target_object()
+        with self.assertRaises(ValueError):
+            target.convert('2013/07/19 24:00:00')
+
+    def test_convert_07(self):
+        """
+        [対象] convert() : No.07
+        [条件] 記憶する数を指定してオブジェクトを生成し、同じ文字列を指定して複数回実行する。
+        [結果] 1回目に変換した値が返却される。
+        """
+        target = self._get_target_object(memo_size=16)
+        actual1 = target.convert('1989/06/23 11:22:33')
+        actual2 = target.convert('1989/06/23 11:22:33')
+
+        self.assertEqual(datetime.datetime(1989, 6, 23, 11, 22, 33), actual1)
+        self.assertIs(actual1, actual2)
+
+    def test_convert_many_01(self):
+        """
+        [対象] convert_many() : No.01
+        [条件] 文字列、日時、値が存在しない要素を含むリストを指定して実行する。
+        [結果] 各要素が日時化され、値が存在しない要素はNoneのまま返却される。
+        """
+        target = self._get_target_object()
+        actual = target.convert_many(['1989/06/23 11:22:33', datetime.datetime(2013, 11, 10, 20, 30, 40), None])
+
+        self.assertEqual([datetime.datetime(1989, 6, 23, 11, 22, 33), datetime.datetime(2013, 11, 10, 20, 30, 40), None], actual)
+
+    @skipIf(numpy is None, 'NumPy is not installed')
+    def test_convert_many_02(self):
+        """
+        [対象] convert_many() : No.02
+        [条件] NumPyがインストールされた状態で、既定のフォーマットの文字列のみのリストを指定して実行する。
+        [結果] NumPyで変換され、convert()と同じ日時が返却される。
+        """
+        target = self._get_target_object()
+        values = ['1989/06/23 11:22:33', '2016/02/29 23:59:59', '0001/01/01 00:00:00']
+        actual = target.convert_many(values)
+
+        self.assertEqual([target.convert(v) for v in values], actual)
+        self.assertTrue(all(type(v) is datetime.datetime for v in actual))
+
+    def test_convert_many_03(self):
+        """
+        [対象] convert_many() : No.03
+        [条件] 0年や範囲外の時刻を含む、既定のフォーマットの文字列のみのリストを指定して実行する。
+        [結果] convert()と同じくValueErrorが送出される。
+        """
+        target = self._get_target_object()
+        for values in (['0000/01/01 00:00:00', '2015/01/01 00:00:00'], ['2015/01/01 24:00:00']):
+            with self.assertRaises(ValueError):
+                target.convert_many(values)
+
+
+class GeometryFieldTest(TestCase):
+    """
+    fields.GeometryFieldに対するテストコード。
+    """
+
+    def _get_target_object(self, *args, **kwargs):
+        """
+        テスト対象のオブジェクトを取得する。
+
+        :param args: 可変長引数
+        :type args: tuple
+        :param kwargs: キーワード引数
+        :type kwargs: dict
+        :return: テスト対象のフィールドオブジェクト
+        :rtype: pyny.fields.GeometryField
+        """
+        # テスト対象のオブジェクトを生成する
+        from pyny.fields import GeometryField
+        return GeometryField(*args, **kwargs)
+
+    def test_init_01(self):
+        """
+        [対象] __init__() : No.01
+        [条件] キーを指定して実行する。
+        [結果] 指定した値がプロパティに設定される。
+        """
+        target = self._get_target_object('geometry')
+
+        self.assertEqual('geometry', target.name)
+
+    def test_convert_01(self):
+        """
+        [対象] convert() : No.01
+        [条件] ジオメトリを指定して実行する。
+        [結果] 指定した値がそのまま返却される。
+        """
+        from pyny.geometry import parse_wkt
+        target = self._get_target_object()
+        geometry = parse_wkt('LINESTRING(139.90 35.85, 139.91 35.86)')
+        actual = target.convert(geometry)
+
+        self.assertIs(geometry, actual)
+
+    def test_convert_02(self):
+        """
+        [対象] convert() : No.02
+        [条件] WKT形式の文字列を指定して実行する。
+        [結果] 解析したジオメトリが返却される。
+        """
+        target = self._get_target_object()
+        actual = target.convert('POLYGON((139.90 35.85, 139.91 35.85, 139.91 35.86, 139.90 35.85))')
+
+        self.assertEqual('POLYGON', actual.type)
+        self.assertEqual((139.90, 35.85, 139.91, 35.86), actual.bounds())
+
+    def test_convert_03(self):
+        """
+        [対象] convert() : No.03
+        [条件] WKT形式ではない文字列を指定して実行する。
+        [結果] ValueErrorが送出される。
+        """
+        target = self._get_target_object()
+        with self.assertRaises(ValueError):
+            target.convert('abc')
+
+    def test_convert_many_01(self):
+        """
+        [対象] convert_many() : No.01
+        [条件] WKT形式の文字列と値が存在しない要素を含むリストを指定して実行する。
+        [結果] 各要素がジオメトリ化され、値が存在しない要素はNoneのまま返却される。
+        """
+        target = self._get_target_object()
+        actual = target.convert_many(['POINT(139.9 35.8)', None, 'LINESTRING(0 0, 1 1)'])
+
+        self.assertEqual('POINT', actual[0].type)
+        self.assertIsNone(actual[1])
+        self.assertEqual('LINESTRING', actual[2].type)
+
+
+class PointFieldTest(TestCase):
+    """
+    fields.PointFieldに対するテストコード。
+    """
+
+    def _get_target_object(self, *args, **kwargs):
+        """
+        テスト対象のオブジェクトを取得する。
+
+        :param args: 可変長引数
+        :type args: tuple
+        :param kwargs: キーワード引数
+        :type kwargs: dict
+        :return: テスト対象のフィールドオブジェクト
+        :rtype: pyny.fields.PointField
+        """
+        # テスト対象のオブジェクトを生成する
+        from pyny.fields import PointField
+        return PointField(*args, **kwargs)
+
+    def test_init_01(self):
+        """
+        [対象] __init__() : No.01
+        [条件] キーを指定して実行する。
+        [結果] 指定した値がプロパティに設定される。
+        """
+        target = self._get_target_object('geometry')
+
+        self.assertEqual('geometry', target.name)
+
+    def test_convert_01(self):
+        """
+        [対象] convert() : No.01
+        [条件] 点を指定して実行する。
+        [結果] 指定した値がそのまま返却される。
+        """
+        from pyny.geometry import Point
+        target = self._get_target_object()
+        point = Point(139.9261438, 35.8706965)
+        actual = target.convert(point)
+
+        self.assertIs(point, actual)
+
+    def test_convert_02(self):
+        """
+        [対象] convert() : No.02
+        [条件] WKT形式のPOINTの文字列を指定して実行する。
+        [結果] 経度、緯度の順の点が返却される。
+        """
+        target = self._get_target_object()
+        actual = target.convert('POINT(139.9261438 35.8706965)')
+
+        self.assertEqual((139.9261438, 35.8706965), actual)
+        self.assertEqual(35.8706965, actual.y)
+
+    def test_convert_03(self):
+        """
+        [対象] convert() : No.03
+        [条件] POINT以外のWKT形式の文字列を指定して実行する。
+        [結果] ValueErrorが送出される。
+        """
+        target = self._get_target_object()
+        with self.assertRaises(ValueError):
+            target.convert('LINESTRING(139.90 35.85, 139.91 35.86)')
+
+    def test_convert_many_01(self):
+        """
+        [対象] convert_many() : No.01
+        [条件] WKT形式の文字列と点を含むリストを指定して実行する。
+        [結果] 各要素が点化して返却される。
+        """
+        from pyny.geometry import Point
+        target = self._get_target_object()
+        actual = target.convert_many(['POINT(139.9 35.8)', Point(1.0, 2.0), None])
+
+        self.assertEqual([Point(139.9, 35.8), Point(1.0, 2.0), None], actual)
+
+
+class CachedFieldTest(TestCase):
+    """
+    fields.CachedFieldに対するテストコード。
+    """
+
+    def _get_target_object(self, *args, **kwargs):
+        """
+        テスト対象のオブジェクトを取得する。
+
+        :param args: 可変長引数
+        :type args: tuple
+        :param kwargs: キーワード引数
+        :type kwargs: dict
+        :return: テスト対象のフィールドオブジェクト
+        :rtype: pyny.fields.CachedField
+        """
+        # テスト対象のオブジェクトを生成する
+        from pyny.fields import CachedField
+        return CachedField(*args, **kwargs)
+
+    def test_init_01(self):
+        """
+        [対象] __init__() : No.01
+        [条件] キーを指定したフィールドを指定して実行する。
+        [結果] 委譲先のフィールドのキーがプロパティに設定される。
+        """
+        from pyny.fields import StringField
+        field = StringField('attrs.attr0')
+        target = self._get_target_object(field)
+
+        self.assertEqual('attrs.attr0', target.name)
+        self.assertIs(field, target.field)
+
+    def test_convert_01(self):
+        """
+        [対象] convert() : No.01
+        [条件] 等しい別々の文字列を指定して実行する。
+        [結果] 同じオブジェクトが返却され、その文字列はインターンされている。
+        """
+        import sys
+        from pyny.fields import StringField
+        target = self._get_target_object(StringField())
+        actual1 = target.convert(''.join(['市役所・', '出張所']))
+        actual2 = target.convert(''.join(['市役所・', '出張所']))
+
+        self.assertEqual('市役所・出張所', actual1)
+        self.assertIs(actual1, actual2)
+        self.assertIs(sys.intern('市役所・出張所'), actual1)
+
+    def test_convert_02(self):
+        """
+        [対象] convert() : No.02
+        [条件] 等しいが型の異なる値を指定して実行する。
+        [結果] 型ごとに変換された値が返却される。
+        """
+        from pyny.fields import StringField
+        target = self._get_target_object(StringField())
+
+        self.assertEqual(['1', '1.0', 'True', '1'], [target.convert(v) for v in (1, 1.0, True, 1)])
+
+    def test_convert_03(self):
+        """
+        [対象] convert() : No.03
+        [条件] 記憶する値の最大数を超える種類の値と、ハッシュ化できない値を指定して実行する。
+        [結果] 最大数を超えた値とハッシュ化できない値は記憶されずに変換される。
+        """
+        from pyny.fields import DateField, StringField
+        target = self._get_target_object(DateField(), maxsize=1)
+        actual1 = target.convert('2015/01/01')
+        actual2 = target.convert('2015/01/02')
+
+        self.assertIs(actual1, target.convert('2015/01/01'))
+        self.assertIsNot(actual2, target.convert('2015/01/02'))
+        self.assertEqual(datetime.date(2015, 1, 2), actual2)
+        self.assertEqual("['a']", self._get_target_object(StringField()).convert(['a']))
+
+    def test_convert_04(self):
+        """
+        [対象] convert() : No.04
+        [条件] 変換できない値を指定して実行する。
+        [結果] 委譲先のフィールドと同じ例外が送出される。
+        """
+        from pyny.fields import IntegerField
+        target = self._get_target_object(IntegerField())
+
+        with self.assertRaises(ValueError):
+            target.convert('abc')
+        with self.assertRaises(ValueError):
+            target.convert('abc')
+
+    def test_convert_05(self):
+        """
+        [対象] convert() : No.05
+        [条件] internにFalseを指定して、文字列に変換した値を指定して実行する。
+        [結果] 変換結果はインターンされずに記憶される。
+        """
+        from pyny.fields import StringField
+        target = self._get_target_object(StringField(), intern=False)
+        value = ''.join(['流山', '市'])
+        actual = target.convert(value)
+
+        self.assertIs(value, actual)
+        self.assertIs(actual, target.convert(''.join(['流山', '市'])))
+
+    def test_convert_many_01(self):
+        """
+        [対象] convert_many() : No.01
+        [条件] 値が存在しない要素を含むリストを指定して実行する。
+        [結果] 値が存在しない要素はNoneのまま、等しい値は同じオブジェクトに変換される。
+        """
+        from pyny.fields import DecimalField
+        target = self._get_target_object(DecimalField())
+        actual = target.convert_many(['1.5', None, '1.5'])
+
+        self.assertEqual([decimal.Decimal('1.5'), None, decimal.Decimal('1.5')], actual)
+        self.assertIs(actual[0], actual[2])
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright 2015-2019 Jun-ya HASEBA
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from array import array
+from unittest import TestCase
+
+from pyny.geometry import Point, parse_many, parse_point, parse_wkt
+
+
+class GeometryTest(TestCase):
+    """
+    geometry.pyに対するテストコード。
+    """
+
+    def test_parse_wkt_01(self):
+        """
+        [対象] parse_wkt() : No.01
+        [条件] POINT、LINESTRINGの文字列を指定して実行する。
+        [結果] 座標を配列に格納したジオメトリが返却される。
+        """
+        actual1 = parse_wkt('POINT(139.9261438 35.8706965)')
+        actual2 = parse_wkt('LINESTRING (1 2, 3 4,5 6)')
+
+        self.assertEqual(('POINT', array('d', [139.9261438, 35.8706965])), (actual1.type, actual1.coordinates))
+        self.assertEqual(('LINESTRING', array('d', [1, 2, 3, 4, 5, 6])), (actual2.type, actual2.coordinates))
+
+    def test_parse_wkt_02(self):
+        """
+        [対象] parse_wkt() : No.02
+        [条件] POLYGON、MULTI*の文字列を指定して実行する。
+        [結果] 入れ子の構造に応じたリストに座標の配列を格納したジオメトリが返却される。
+        """
+        actual1 = parse_wkt('POLYGON((0 0, 4 0, 4 4, 0 0), (1 1, 2 1, 1 1))')
+        actual2 = parse_wkt('MULTIPOINT((1 2), (3 4))')
+        actual3 = parse_wkt('MULTIPOINT(1 2, 3 4)')
+        actual4 = parse_wkt('MULTILINESTRING((1 2, 3 4), (5 6, 7 8))')
+        actual5 = parse_wkt('MULTIPOLYGON(((0 0, 1 0, 1 1, 0 0)), ((5 5, 6 5, 6 6, 5 5)))')
+
+        self.assertEqual([array('d', [0, 0, 4, 0, 4, 4, 0, 0]), array('d', [1, 1, 2, 1, 1, 1])], actual1.coordinates)
+        self.assertEqual(array('d', [1, 2, 3, 4]), actual2.coordinates)
+        self.assertEqual(actual2, actual3)
+        self.assertEqual([array('d', [1, 2, 3, 4]), array('d', [5, 6, 7, 8])], actual4.coordinates)
+        self.assertEqual(2, len(actual5.coordinates))
+        self.assertEqual((0, 0, 6, 6), actual5.bounds())
+
+    def test_parse_wkt_03(self):
+        """
+        [対象] parse_wkt() : No.03
+        [条件] 次元の修飾子、EMPTYを含む文字列を指定して実行する。
+        [結果] 次元数が設定されたジオメトリ、空のジオメトリが返却される。
+        """
+        actual1 = parse_wkt('POINT Z (1 2 3)')
+        actual2 = parse_wkt('POLYGON EMPTY')
+
+        self.assertEqual(3, actual1.dimensions)
+        self.assertEqual([Point(1, 2)], list(actual1.points()))
+        self.assertEqual([], actual2.coordinates)
+        self.assertIsNone(actual2.bounds())
+
+    def test_parse_wkt_04(self):
+        """
+        [対象] parse_wkt() : No.04
+        [条件] 不正な文字列を指定して実行する。
+        [結果] ValueErrorが送出される。
+        """
+        for text in ('', 'CIRCLE(1 2)', 'POINT(1)', 'POINT(1 2) x', 'POLYGON((1 2, 3 4)', 'LINESTRING(1 a, 2 3)'):
+            with self.assertRaises(ValueError):
+                parse_wkt(text)
+
+    def test_parse_wkt_05(self):
+        """
+        [対象] parse_wkt() : No.05
+        [条件] 座標の合計数は合っているが、点ごとの座標の数が次元数と一致しない文字列を指定して実行する。
+        [結果] ValueErrorが送出される。
+        """
+        for text in ('LINESTRING(1 2 3, 4)', 'LINESTRING Z (1 2, 3 4 5 6, 7 8 9)', 'POLYGON((0 0, 1 0 1, 0, 0 0))'):
+            with self.assertRaises(ValueError):
+                parse_wkt(text)
+
+    def test_parse_point_01(self):
+        """
+        [対象] parse_point() : No.01
+        [条件] POINTの文字列（空白を含む形式を含む）を指定して実行する。
+        [結果] 点が返却される。
+        """
+        self.assertEqual(Point(139.9261438, 35.8706965), parse_point('POINT(139.9261438 35.8706965)'))
+        self.assertEqual(Point(1, 2), parse_point(' point ( 1 2 ) '.strip()))
+
+    def test_parse_point_02(self):
+        """
+        [対象] parse_point() : No.02
+        [条件] POINT以外の文字列を指定して実行する。
+        [結果] ValueErrorが送出される。
+        """
+        with self.assertRaises(ValueError):
+            parse_point('MULTIPOINT(1 2, 3 4)')
+
+    def test_parse_many_01(self):
+        """
+        [対象] parse_many() : No.01
+        [条件] Noneと様々な形式のPOINTを含むリストを指定して実行する。
+        [結果] 各要素を解析したリストが返却され、Noneの位置にはNoneが設定される。
+        """
+        actual = parse_many(['POINT(1 2)', None, 'POINT (1 2)', 'POINT(3 4)'], point=True)
+
+        self.assertEqual([Point(1, 2), None, Point(1, 2), Point(3, 4)], actual)
+        self.assertIs(Point, type(actual[0]))
+
+    def test_parse_many_02(self):
+        """
+        [対象] parse_many() : No.02
+        [条件] POINT以外を含むリストを指定して実行する。
+        [結果] 各要素を解析したジオメトリのリストが返却される。
+        """
+        actual = parse_many(['POINT(1 2)', 'LINESTRING(1 2, 3 4)'])
+
+        self.assertEqual([parse_wkt('POINT(1 2)'), parse_wkt('LINESTRING(1 2, 3 4)')], actual)
+
+    def test_hash_01(self):
+        """
+        [対象] __hash__() : No.01
+        [条件] 等しいジオメトリと異なるジオメトリを辞書のキーに使用する。
+        [結果] 等しいジオメトリは同じキーとして扱われる。
+        """
+        polygon = 'POLYGON((0 0, 1 0, 1 1, 0 0))'
+        target = {parse_wkt(polygon): 1, parse_wkt('POINT(1 2)'): 2}
+
+        self.assertEqual(hash(parse_wkt(polygon)), hash(parse_wkt(polygon)))
+        self.assertEqual(1, target[parse_wkt(polygon)])
+        self.assertEqual(2, target[parse_wkt('POINT(1 2)')])
+        self.assertNotIn(parse_wkt('POINT Z (1 2 3)'), target)
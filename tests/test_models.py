@@ -19,9 +19,10 @@
 import datetime
 import decimal
 from mock import patch
+import pickle
 from unittest import TestCase
 
-from pyny.fields import DateField, DateTimeField, DecimalField, FloatField, IntegerField, StringField
+from pyny.fields import CachedField, DateField, DateTimeField, DecimalField, FloatField, IntegerField, StringField
 from pyny.models import Model
 
 
@@ -79,11 +80,318 @@ class DateTimeModel(Model):
     date_time3 = DateTimeField('attrs.attr3')
 
 
+class InheritedModel(StringModel):
+    """
+    フィールドの継承をテストするためのモデル。
+    """
+    geo = None
+    status = IntegerField()
+    name = StringField('attrs.attr3')
+
+
+class CustomInitModel(StringModel):
+    """
+    独自のコンストラクタを定義したモデル。
+    """
+    status = IntegerField()
+
+    def __init__(self, data):
+        """
+        CustomInitModelを構築する。
+
+        :param data: マッピング対象のJSON
+        :type data: dict
+        """
+        # 基底クラスのコンストラクタでマッピングしたあとに独自の属性を設定する
+        super().__init__(data)
+        self.custom = True
+
+
+class CustomInitSubModel(CustomInitModel):
+    """
+    独自のコンストラクタを定義したモデルを継承し、フィールドを追加したモデル。
+    """
+    name = StringField('attrs.attr2')
+
+
+class ListModel(Model):
+    """
+    リストのインデックスを含むキーをテストするためのモデル。
+    """
+    url = StringField('files.0.url')
+    second = StringField('files.1.url')
+
+
+class CompactModel(Model, compact=True):
+    """
+    コンパクトなモデルをテストするためのモデル。
+    """
+    id = IntegerField('feature_id')
+    name = StringField('attrs.attr2')
+
+
+class CompactSubModel(CompactModel):
+    """
+    コンパクトなモデルを継承したモデル。
+    """
+    created = StringField()
+
+
+class LazyModel(Model, lazy=True):
+    """
+    遅延変換するモデルをテストするためのモデル。
+    """
+    id = IntegerField('feature_id')
+    created = DateTimeField()
+
+
+class CachedModel(Model):
+    """
+    変換結果を記憶するフィールドをテストするためのモデル。
+    """
+    category = CachedField(StringField('attrs.attr0'))
+    opened = CachedField(DateField('attrs.attr5'))
+
+
+_shared_field = StringField()
+
+
+class SharedLazyModel(Model, lazy=True):
+    """
+    同じフィールドを複数の属性に設定した、遅延変換するモデル。
+    """
+    x = _shared_field
+    y = _shared_field
+
+
 class ModelTest(TestCase):
     """
     models.Modelに対するテストコード。
     """
 
+    def setUp(self):
+        """
+        テストごとにキャッシュを破棄する。
+        """
+        from pyny import api
+        api.invalidate()
+
+    def test_init_01(self):
+        """
+        [対象] __init__() : No.01
+        [条件] 基底クラスのフィールドを継承したモデルを構築する。
+        [結果] 基底クラスのフィールドにも値が設定され、再定義したフィールドは当クラスの定義が使用される。
+        """
+        actual = InheritedModel({'created': '2013/07/19', 'status': '1', 'attrs': {'attr2': 'name', 'attr3': 'address'}})
+
+        self.assertEqual('2013/07/19', actual.created)
+        self.assertEqual(1, actual.status)
+        self.assertEqual('address', actual.name)
+
+    def test_init_02(self):
+        """
+        [対象] __init__() : No.02
+        [条件] 基底クラスのフィールドをフィールド以外の属性で上書きしたモデルを構築する。
+        [結果] 上書きしたフィールドはマッピングされない。
+        """
+        actual = InheritedModel({'geometry': 'POINT(139.9 35.8)'})
+
+        self.assertIsNone(actual.geo)
+        self.assertEqual(['created', 'name', 'status'], list(InheritedModel._fields))
+
+    def test_init_03(self):
+        """
+        [対象] __init__() : No.03
+        [条件] キーのパスの途中の値が存在しないデータでモデルを構築する。
+        [結果] 当該フィールドにNoneが設定される。
+        """
+        actual = StringModel({'attrs': None})
+
+        self.assertIsNone(actual.name)
+        self.assertIsNone(actual.created)
+
+    def test_init_04(self):
+        """
+        [対象] __init__() : No.04
+        [条件] 各フィールドクラスを持つモデルを、変換が必要な値と変換後の型の値で構築する。
+        [結果] 生成されたコンストラクタとModel.__init__()で同じ値が設定される。
+        """
+        data = [
+            {'created': 20130719, 'geometry': 'POINT(139.9 35.8)', 'attrs': {'attr2': 'name'}},
+            {'status': '1', 'feature_id': 2, 'attrs': {'attr0': True}},
+            {'user_id': 307, 'moduserid': '0', 'attrs': {'attr6': '35.843176'}},
+            {'float1': 1, 'float': 2.5, 'attrs': {}},
+            {'date1': '2013/07/19', 'date': datetime.date(2013, 7, 19), 'attrs': None},
+            {'date_time1': '2013/07/19 17:01:02', 'attrs': {'attr3': datetime.datetime(2013, 7, 19)}},
+        ]
+        for model, d in zip((StringModel, IntegerModel, DecimalModel, FloatModel, DateModel, DateTimeModel), data):
+            expected = model.__new__(model)
+            Model.__init__(expected, d)
+            actual = model(d)
+
+            self.assertEqual(expected.__dict__, actual.__dict__)
+
+    def test_init_05(self):
+        """
+        [対象] __init__() : No.05
+        [条件] 独自のコンストラクタを定義したモデルを構築する。
+        [結果] 基底クラスのコンストラクタで当クラスのフィールドもマッピングされる。
+        """
+        actual = CustomInitModel({'created': '2013/07/19', 'status': '1'})
+
+        self.assertEqual('2013/07/19', actual.created)
+        self.assertEqual(1, actual.status)
+        self.assertTrue(actual.custom)
+
+    def test_init_06(self):
+        """
+        [対象] __init__() : No.06
+        [条件] リストのインデックスを含むキーを持つモデルを構築する。
+        [結果] リストの当該要素の値が設定され、範囲外のインデックスにはNoneが設定される。
+        """
+        data = {'files': [{'url': 'http://example.com/1.jpg'}]}
+        actual = ListModel(data)
+        expected = ListModel.__new__(ListModel)
+        Model.__init__(expected, data)
+
+        self.assertEqual('http://example.com/1.jpg', actual.url)
+        self.assertIsNone(actual.second)
+        self.assertEqual(expected.__dict__, actual.__dict__)
+
+    def test_init_07(self):
+        """
+        [対象] __init__() : No.07
+        [条件] リストのインデックスを含むキーの途中の値が存在しない、または辞書であるデータでモデルを構築する。
+        [結果] 存在しない場合はNoneが、辞書の場合はインデックスを文字列にしたキーの値が設定される。
+        """
+        for data, expected in (({}, None), ({'files': {}}, None), ({'files': {'0': {'url': 'a'}}}, 'a')):
+            actual = ListModel(data)
+
+            self.assertEqual(expected, actual.url)
+
+    def test_init_08(self):
+        """
+        [対象] __init__() : No.08
+        [条件] compact=Trueを指定したモデルを構築する。
+        [結果] 各フィールドに値が設定され、インスタンスは__dict__を持たない。
+        """
+        actual = CompactModel({'feature_id': '3', 'attrs': {'attr2': '東部出張所'}})
+
+        self.assertEqual(3, actual.id)
+        self.assertEqual('東部出張所', actual.name)
+        self.assertFalse(hasattr(actual, '__dict__'))
+
+    def test_init_09(self):
+        """
+        [対象] __init__() : No.09
+        [条件] コンパクトなモデルを継承したモデルを構築する。
+        [結果] 基底クラスと当クラスのフィールドに値が設定され、インスタンスは__dict__を持たない。
+        """
+        actual = CompactSubModel({'feature_id': 3, 'created': '2013/07/19 17:01:02'})
+
+        self.assertEqual(3, actual.id)
+        self.assertIsNone(actual.name)
+        self.assertEqual('2013/07/19 17:01:02', actual.created)
+        self.assertFalse(hasattr(actual, '__dict__'))
+
+    def test_pickle_01(self):
+        """
+        [対象] pickle : No.01
+        [条件] コンパクトなモデルを各プロトコルでpickleし、復元する。
+        [結果] 各フィールドの値が復元される。
+        """
+        target = CompactSubModel({'feature_id': 3, 'attrs': {'attr2': '東部出張所'}, 'created': '2013/07/19'})
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            actual = pickle.loads(pickle.dumps(target, protocol))
+
+            self.assertEqual((3, '東部出張所', '2013/07/19'), (actual.id, actual.name, actual.created))
+
+    def test_init_10(self):
+        """
+        [対象] __init__() : No.10
+        [条件] lazy=Trueを指定したモデルを構築し、一部のフィールドを参照する。
+        [結果] 参照したフィールドのみ変換され、変換後の値がインスタンスに設定される。
+        """
+        with patch.object(DateTimeField, 'convert') as convert:
+            actual = LazyModel({'feature_id': '3', 'created': '2013/07/19 17:01:02'})
+
+            self.assertEqual(3, actual.id)
+            self.assertEqual(3, actual.__dict__['id'])
+            self.assertNotIn('created', actual.__dict__)
+            self.assertFalse(convert.called)
+
+    def test_init_11(self):
+        """
+        [対象] __init__() : No.11
+        [条件] lazy=Trueを指定したモデルを、値が存在しないデータで構築する。
+        [結果] 当該フィールドにNoneが設定される。
+        """
+        actual = LazyModel({'feature_id': 3})
+
+        self.assertIsNone(actual.created)
+        self.assertEqual(LazyModel({'created': '2013/07/19 17:01:02'}).created, datetime.datetime(2013, 7, 19, 17, 1, 2))
+
+    def test_init_12(self):
+        """
+        [対象] __init__() : No.12
+        [条件] compact=Trueとlazy=Trueを同時に指定してモデルを定義する。
+        [結果] TypeErrorが送出される。
+        """
+        with self.assertRaises(TypeError):
+            class InvalidModel(Model, compact=True, lazy=True):
+                name = StringField()
+
+    def test_init_13(self):
+        """
+        [対象] __init__() : No.13
+        [条件] CachedFieldを持つモデルを、等しい値を持つ別々のデータで構築する。
+        [結果] 各インスタンスの当該フィールドに同じオブジェクトが設定される。
+        """
+        actual1 = CachedModel({'attrs': {'attr0': ''.join(['消防', '署']), 'attr5': '2013/07/19'}})
+        actual2 = CachedModel({'attrs': {'attr0': ''.join(['消防', '署']), 'attr5': '2013/07/19'}})
+
+        self.assertEqual('消防署', actual1.category)
+        self.assertEqual(datetime.date(2013, 7, 19), actual1.opened)
+        self.assertIs(actual1.category, actual2.category)
+        self.assertIs(actual1.opened, actual2.opened)
+
+    def test_init_14(self):
+        """
+        [対象] __init__() : No.14
+        [条件] 独自のコンストラクタを定義したモデルを継承したモデルを構築する。
+        [結果] 基底クラスのコンストラクタが呼び出され、追加したフィールドにも値が設定される。
+        """
+        actual = CustomInitSubModel({'status': '1', 'attrs': {'attr2': '流山市'}})
+
+        self.assertTrue(actual.custom)
+        self.assertEqual(1, actual.status)
+        self.assertEqual('流山市', actual.name)
+        self.assertIs(CustomInitModel.__init__, CustomInitSubModel.__init__)
+
+    def test_init_15(self):
+        """
+        [対象] __init__() : No.15
+        [条件] 同じフィールドを複数の属性に設定した、遅延変換するモデルを構築する。
+        [結果] 各属性にそれぞれの項目の値が設定される。
+        """
+        actual = SharedLazyModel({'x': '1', 'y': '2'})
+
+        self.assertEqual('1', actual.x)
+        self.assertEqual('2', actual.y)
+
+    def test_pickle_02(self):
+        """
+        [対象] pickle : No.02
+        [条件] 遅延変換するモデルをpickleし、復元する。
+        [結果] 復元したインスタンスから変換後の値を参照できる。
+        """
+        target = LazyModel({'feature_id': '3', 'created': '2013/07/19 17:01:02'})
+        target.id
+        actual = pickle.loads(pickle.dumps(target))
+
+        self.assertEqual(3, actual.id)
+        self.assertEqual(datetime.datetime(2013, 7, 19, 17, 1, 2), actual.created)
+
     def test_get_by_id_01(self):
         """
         [対象] get_by_id() : No.01
@@ -267,6 +575,61 @@ class ModelTest(TestCase):
         self.assertEquals(datetime.datetime(2015, 5, 5, 5, 5, 5), actual.date_time2)
         self.assertEquals(datetime.datetime(2015, 6, 6, 6, 6, 6), actual.date_time3)
 
+    @patch('pyny.models.api._get_json')
+    def test_get_by_ids_01(self, get_json):
+        """
+        [対象] get_by_ids() : No.01
+        [条件] 存在する項目IDと存在しない項目IDを混在させて実行する。
+        [結果] 指定した順序でモデルが返却され、存在しない項目IDの位置にはNoneが設定される。
+        """
+        get_json.return_value = {
+            'num': 2,
+            'results': [{
+                'float': '123.456',
+                'feature_id': 1,
+            }, {
+                'float': '112.233',
+                'feature_id': 2,
+            }],
+        }
+
+        actual = FloatModel.get_by_ids('dummy', [2, 2015, 1])
+
+        self.assertEqual(3, len(actual))
+        self.assertEqual(112.233, actual[0].float2)
+        self.assertIsNone(actual[1])
+        self.assertEqual(123.456, actual[2].float2)
+
+    @patch('pyny.models.api._get_json')
+    def test_get_by_ids_02(self, get_json):
+        """
+        [対象] get_by_ids() : No.02
+        [条件] as_dictにTrueを指定して実行する。
+        [結果] 項目IDをキーとしたモデルの辞書が返却される。
+        """
+        get_json.return_value = {
+            'num': 1,
+            'results': [{
+                'float': '123.456',
+                'feature_id': 1,
+            }],
+        }
+
+        actual = FloatModel.get_by_ids('dummy', [1, 2015], as_dict=True)
+
+        self.assertEqual(123.456, actual[1].float2)
+        self.assertIsNone(actual[2015])
+
+    def test_get_by_ids_03(self):
+        """
+        [対象] get_by_ids() : No.03
+        [条件] 無効なレイヤIDを指定して実行する。
+        [結果] WebApiErrorが送出される。
+        """
+        from pyny import api
+        with self.assertRaises(api.WebApiError):
+            StringModel.get_by_ids('error', [3])
+
     def test_get_data_01(self):
         """
         [対象] get_data() : No.01
@@ -526,3 +889,119 @@ class ModelTest(TestCase):
         self.assertEquals(datetime.datetime(1988, 10, 19, 1, 12, 23), actual[0].date_time1)
         self.assertEquals(datetime.datetime(1989, 6, 23, 12, 23, 34), actual[0].date_time2)
         self.assertEquals(datetime.datetime(2008, 11, 9, 23, 34, 45), actual[0].date_time3)
+
+    @patch('pyny.models.api._iter_json_results')
+    @patch('pyny.models.api._get_json')
+    def test_iter_all_data_01(self, get_json, iter_json_results):
+        """
+        [対象] iter_all_data() : No.01
+        [条件] 有効なレイヤIDを指定して実行する。
+        [結果] マッピングされたモデルが1件ずつ返却される。
+        """
+        get_json.return_value = {'num': 2, 'results': []}
+        iter_json_results.return_value = iter([{
+            'float': '123.456',
+            'float1': '456.789',
+            'attrs': {
+                'attr3': '789.123',
+            },
+        }, {
+            'float': '112.233',
+        }])
+
+        actual = list(FloatModel.iter_all_data('dummy'))
+
+        self.assertEqual(2, len(actual))
+        self.assertEqual(456.789, actual[0].float1)
+        self.assertEqual(123.456, actual[0].float2)
+        self.assertEqual(789.123, actual[0].float3)
+        self.assertEqual(112.233, actual[1].float2)
+
+    def test_iter_all_data_02(self):
+        """
+        [対象] iter_all_data() : No.02
+        [条件] 無効なレイヤIDを指定して実行する。
+        [結果] WebApiErrorが送出される。
+        """
+        from pyny import api
+        with self.assertRaises(api.WebApiError):
+            list(StringModel.iter_all_data('error'))
+
+    @patch('pyny.models.api._get_json')
+    def test_get_all_data_09(self, get_json):
+        """
+        [対象] get_all_data() : No.09
+        [条件] 同じレイヤIDを指定して複数回実行し、1回目に返却されたモデルを変更する。
+        [結果] 初回に取得したデータが再利用され、2回目以降は変更の影響を受けないモデルが返却される。
+        """
+        get_json.return_value = {'num': 1, 'results': [{'float1': '456.789'}]}
+
+        actual1 = FloatModel.get_all_data('dummy')
+        actual1[0].float1 = 0.0
+        actual2 = FloatModel.get_all_data('dummy')
+
+        self.assertIsNot(actual1[0], actual2[0])
+        self.assertEqual(456.789, actual2[0].float1)
+        self.assertEqual(1, get_json.call_count)
+
+    @patch('pyny.models.api._get_json')
+    def test_get_all_data_10(self, get_json):
+        """
+        [対象] get_all_data() : No.10
+        [条件] キャッシュを破棄したあとに実行する。
+        [結果] モデルがマッピングし直される。
+        """
+        get_json.return_value = {'num': 1, 'results': [{'float1': '456.789'}]}
+
+        from pyny import api
+        actual1 = FloatModel.get_all_data('dummy')
+        api.invalidate('dummy')
+        actual2 = FloatModel.get_all_data('dummy')
+
+        self.assertIsNot(actual1[0], actual2[0])
+
+    @patch('pyny.models.api._get_json')
+    def test_get_all_data_11(self, get_json):
+        """
+        [対象] get_all_data() : No.11
+        [条件] コンストラクタを定義していないモデルの当該メソッドを実行する。
+        [結果] モデルのスキーマを指定してデータが取得され、レイヤインデックスはキャッシュされない。
+        """
+        get_json.return_value = {'num': 1, 'results': [{'float1': '456.789'}]}
+
+        from pyny import api
+        actual = FloatModel.get_all_data('dummy')
+
+        self.assertEqual(456.789, actual[0].float1)
+        self.assertIs(FloatModel._schema, get_json.call_args[0][1])
+        self.assertIsNone(api.layer_cache.get(('dummy', api.LayerIndex)))
+
+    @patch('pyny.models.api._get_json')
+    def test_get_all_data_12(self, get_json):
+        """
+        [対象] get_all_data() : No.12
+        [条件] 独自のコンストラクタを定義したモデルの当該メソッドを実行する。
+        [結果] スキーマを指定せずにデータが取得される。
+        """
+        get_json.return_value = {'num': 1, 'results': [{'status': '1'}]}
+
+        actual = CustomInitModel.get_all_data('dummy')
+
+        self.assertTrue(actual[0].custom)
+        self.assertIsNone(CustomInitModel._schema)
+        self.assertEqual(1, len(get_json.call_args[0]))
+
+    @patch('pyny.models.api._get_json')
+    def test_get_all_data_13(self, get_json):
+        """
+        [対象] get_all_data() : No.13
+        [条件] 独自のコンストラクタを定義したモデルを継承したモデルの当該メソッドを実行する。
+        [結果] スキーマを指定せずにデータが取得される。
+        """
+        get_json.return_value = {'num': 1, 'results': [{'status': '1', 'attrs': {'attr2': '流山市'}}]}
+
+        actual = CustomInitSubModel.get_all_data('dummy')
+
+        self.assertTrue(actual[0].custom)
+        self.assertIsNone(CustomInitSubModel._schema)
+        self.assertEqual(1, len(get_json.call_args[0]))
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright 2015-2019 Jun-ya HASEBA
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import datetime
+from mock import patch
+from unittest import TestCase
+
+from pyny.collection import ModelCollection
+from pyny.fields import DateTimeField, FloatField, GeometryField, IntegerField, StringField
+from pyny.geometry import parse_wkt
+from pyny.models import Model
+from pyny.query import Query
+
+
+class FacilityModel(Model):
+    """
+    クエリをテストするためのモデル。
+    """
+    id = IntegerField('feature_id')
+    category = StringField('attrs.attr0')
+    latitude = FloatField('attrs.attr6')
+    created = DateTimeField()
+
+
+class AreaModel(Model):
+    """
+    ジオメトリを含むクエリをテストするためのモデル。
+    """
+    id = IntegerField('feature_id')
+    area = GeometryField('geometry')
+
+
+# テストに使用するデータ
+RECORDS = [
+    {'feature_id': 1, 'attrs': {'attr0': '病院', 'attr6': '35.86'}, 'created': '2013/07/19 17:01:02'},
+    {'feature_id': 2, 'attrs': {'attr0': '公園', 'attr6': '35.87'}, 'created': '2013/07/18 09:00:00'},
+    {'feature_id': 3, 'attrs': {'attr0': '病院', 'attr6': '35.84'}, 'created': '2013/07/20 12:30:00'},
+    {'feature_id': 4, 'attrs': {'attr0': '図書館', 'attr6': '35.88'}},
+    {'feature_id': 5, 'attrs': {'attr0': '病院', 'attr6': '35.90'}, 'created': '2013/07/17 08:15:00'},
+]
+
+
+class QueryTest(TestCase):
+    """
+    query.Queryに対するテストコード。
+    """
+
+    def _get_target_object(self):
+        """
+        テスト対象のオブジェクトを取得する。
+
+        :return: テスト対象のオブジェクト
+        :rtype: pyny.query.Query
+        """
+        # テスト対象のオブジェクトを生成する
+        return Query(ModelCollection.from_records(FacilityModel, RECORDS))
+
+    def test_filter_01(self):
+        """
+        [対象] filter() : No.01
+        [条件] 等価条件を指定して実行する。
+        [結果] 条件に合致する行が元の順序で返却される。
+        """
+        target = self._get_target_object()
+        actual = target.filter(category='病院')
+
+        self.assertEqual([1, 3, 5], [model.id for model in actual])
+
+    def test_filter_02(self):
+        """
+        [対象] filter() : No.02
+        [条件] 等価条件と範囲条件を組み合わせて実行する。
+        [結果] すべての条件に合致する行が返却される。
+        """
+        target = self._get_target_object()
+        actual = target.filter(category='病院', latitude__gte=35.86)
+
+        self.assertEqual([1, 5], [model.id for model in actual])
+
+    def test_filter_03(self):
+        """
+        [対象] filter() : No.03
+        [条件] 各比較演算子を指定して実行する。
+        [結果] 条件に合致する行が返却される。
+        """
+        target = self._get_target_object()
+
+        self.assertEqual([2, 4], [m.id for m in target.filter(category__in=['公園', '図書館'])])
+        self.assertEqual([4, 5], [m.id for m in target.filter(latitude__gt=35.87)])
+        self.assertEqual([1, 3], [m.id for m in target.filter(latitude__lt=35.87)])
+        self.assertEqual([1, 2, 3], [m.id for m in target.filter(latitude__lte=35.87)])
+        self.assertEqual([3], [m.id for m in target.filter(created__gt=datetime.datetime(2013, 7, 19, 17, 1, 2))])
+
+    def test_filter_04(self):
+        """
+        [対象] filter() : No.04
+        [条件] filter()を連結して実行する。
+        [結果] 元のクエリは変更されず、すべての条件に合致する行が返却される。
+        """
+        target = self._get_target_object()
+        actual = target.filter(category='病院').filter(id__gt=1)
+
+        self.assertEqual([3, 5], [model.id for model in actual])
+        self.assertEqual(5, target.count())
+
+    def test_filter_05(self):
+        """
+        [対象] filter() : No.05
+        [条件] 存在しないフィールド名、比較演算子を指定して実行する。
+        [結果] ValueErrorが送出される。
+        """
+        target = self._get_target_object()
+        with self.assertRaises(ValueError):
+            target.filter(address='流山市')
+        with self.assertRaises(ValueError):
+            target.filter(id__contains=1)
+
+    def test_filter_06(self):
+        """
+        [対象] filter() : No.06
+        [条件] 同じコレクションに対して複数回実行する。
+        [結果] 初回に構築したインデックスが再利用される。
+        """
+        target = self._get_target_object()
+        target.filter(category='病院', latitude__gte=35.86).count()
+        indexes = dict(target.collection._indexes)
+        target.filter(category='公園').count()
+        target.filter(latitude__lt=35.0).count()
+
+        self.assertEqual({('category', 'hash'), ('latitude', 'sorted')}, set(indexes))
+        for key, index in indexes.items():
+            self.assertIs(index, target.collection._indexes[key])
+
+    def test_filter_07(self):
+        """
+        [対象] filter() : No.07
+        [条件] 同じフィールドに対する複数の範囲条件を指定して実行する。
+        [結果] すべての範囲条件に合致する行が返却される。
+        """
+        target = self._get_target_object()
+        actual = target.filter(latitude__gt=35.84, latitude__lt=35.88)
+
+        self.assertEqual([1, 2], [model.id for model in actual])
+        self.assertEqual(0, target.filter(latitude__gte=35.88, latitude__lt=35.86).count())
+
+    def test_filter_08(self):
+        """
+        [対象] filter() : No.08
+        [条件] GeometryFieldに対する等価条件を指定して実行する。
+        [結果] ジオメトリが等しい行が返却される。
+        """
+        records = [
+            {'feature_id': 1, 'geometry': 'POLYGON((0 0, 1 0, 1 1, 0 0))'},
+            {'feature_id': 2, 'geometry': 'POINT(1 2)'},
+            {'feature_id': 3, 'geometry': 'POLYGON((0 0,1 0,1 1,0 0))'},
+        ]
+        target = Query(ModelCollection.from_records(AreaModel, records))
+        actual = target.filter(area=parse_wkt('POLYGON((0 0, 1 0, 1 1, 0 0))'))
+
+        self.assertEqual([1, 3], [model.id for model in actual])
+
+    def test_order_by_01(self):
+        """
+        [対象] order_by() : No.01
+        [条件] 昇順、降順を指定して実行する。
+        [結果] 並べ替えた行が返却され、値が存在しない行は末尾に並べられる。
+        """
+        target = self._get_target_object()
+
+        self.assertEqual([5, 2, 1, 3, 4], [m.id for m in target.order_by('created')])
+        self.assertEqual([3, 1, 2, 5, 4], [m.id for m in target.order_by('-created')])
+
+    def test_order_by_02(self):
+        """
+        [対象] order_by() : No.02
+        [条件] 複数のフィールドと絞り込みの条件を指定して実行する。
+        [結果] 条件に合致する行が指定したフィールドの順に並べ替えられる。
+        """
+        target = self._get_target_object()
+        actual = target.filter(latitude__gte=35.85).order_by('category', '-latitude')
+
+        self.assertEqual([2, 4, 5, 1], [model.id for model in actual])
+
+    def test_values_01(self):
+        """
+        [対象] values() : No.01
+        [条件] フィールド名を指定して実行する。
+        [結果] 指定したフィールドの値の辞書のリストが返却される。
+        """
+        target = self._get_target_object()
+        actual = target.filter(category='病院').values('id', 'latitude')
+
+        self.assertEqual([{'id': 1, 'latitude': 35.86}, {'id': 3, 'latitude': 35.84}, {'id': 5, 'latitude': 35.9}], actual)
+
+    def test_first_01(self):
+        """
+        [対象] first() : No.01
+        [条件] 合致する行が存在する条件、存在しない条件で実行する。
+        [結果] 最初の行のモデル、またはNoneが返却される。
+        """
+        target = self._get_target_object()
+
+        self.assertEqual(3, target.filter(category='病院').order_by('latitude').first().id)
+        self.assertIsNone(target.filter(category='消防署').first())
+
+    def test_count_01(self):
+        """
+        [対象] count() : No.01
+        [条件] 条件を指定して実行する。
+        [結果] 条件に合致する行数が返却される。
+        """
+        target = self._get_target_object()
+
+        self.assertEqual(3, target.filter(category='病院').count())
+        self.assertEqual(0, target.filter(category='消防署').count())
+        self.assertEqual(3, len(target.filter(latitude__lte=35.87)))
+
+    @patch('pyny.models.api._get_json')
+    def test_query_01(self, get_json):
+        """
+        [対象] Model.query() : No.01
+        [条件] 同じレイヤIDを指定して複数回実行する。
+        [結果] キャッシュされたコレクションに対するクエリが返却される。
+        """
+        get_json.return_value = {'num': 5, 'results': RECORDS}
+
+        from pyny import api
+        api.invalidate()
+        actual1 = FacilityModel.query('dummy')
+        actual2 = FacilityModel.query('dummy')
+
+        self.assertEqual(3, actual1.filter(category='病院').count())
+        self.assertIs(actual1.collection, actual2.collection)
+        self.assertEqual(1, get_json.call_count)
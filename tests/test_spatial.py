@@ -0,0 +1,410 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright 2015-2019 Jun-ya HASEBA
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from mock import patch
+from unittest import TestCase
+
+from pyny.collection import ModelCollection
+from pyny.fields import FloatField, GeometryField, IntegerField, PointField
+from pyny.models import Model
+from pyny.spatial import SpatialIndex, distance_join, haversine, nearest_join, points_of
+
+
+class FacilityModel(Model):
+    """
+    空間インデックスをテストするためのモデル。
+    """
+    id = IntegerField('feature_id')
+    latitude = FloatField('attrs.attr6')
+    longitude = FloatField('attrs.attr7')
+    location = PointField('geometry')
+    area = GeometryField('area')
+
+
+# テストに使用するデータ
+RECORDS = [
+    {'feature_id': 1, 'attrs': {'attr6': '35.8617', 'attr7': '139.9025'}, 'geometry': 'POINT(139.9025 35.8617)'},
+    {'feature_id': 2, 'attrs': {'attr6': '35.8700', 'attr7': '139.9100'}, 'geometry': 'POINT(139.9100 35.8700)'},
+    {'feature_id': 3, 'attrs': {'attr6': '35.9000', 'attr7': '139.9500'}, 'geometry': 'POINT(139.9500 35.9000)',
+     'area': 'POLYGON((139.94 35.89, 139.96 35.89, 139.96 35.91, 139.94 35.91, 139.94 35.89))'},
+    {'feature_id': 4, 'attrs': {}},
+    {'feature_id': 5, 'attrs': {'attr6': '35.8000', 'attr7': '139.8000'}, 'geometry': 'POINT(139.8000 35.8000)'},
+]
+
+
+class HaversineTest(TestCase):
+    """
+    spatial.haversine()に対するテストコード。
+    """
+
+    def test_haversine_01(self):
+        """
+        [対象] haversine() : No.01
+        [条件] 経度が同じ2点を指定して実行する。
+        [結果] 緯度の差に対応する子午線上の距離が返却される。
+        """
+        actual = haversine(35.0, 139.0, 36.0, 139.0)
+
+        self.assertAlmostEqual(111195.08, actual, places=1)
+
+    def test_haversine_02(self):
+        """
+        [対象] haversine() : No.02
+        [条件] 同じ点を指定して実行する。
+        [結果] 0が返却される。
+        """
+        actual = haversine(35.86, 139.90, 35.86, 139.90)
+
+        self.assertEqual(0.0, actual)
+
+
+class SpatialIndexTest(TestCase):
+    """
+    spatial.SpatialIndexに対するテストコード。
+    """
+
+    def _get_target_object(self, cell_size=None):
+        """
+        テスト対象のオブジェクトを取得する。
+
+        :param cell_size: セルの大きさ
+        :type cell_size: float
+        :return: テスト対象のオブジェクト
+        :rtype: pyny.spatial.SpatialIndex
+        """
+        # テスト対象のオブジェクトを生成する
+        collection = ModelCollection.from_records(FacilityModel, RECORDS)
+        return SpatialIndex(points_of(collection, 'location'), collection, cell_size)
+
+    def _brute_force(self, points, lat, lon):
+        """
+        すべての点の距離を求め、近い順に並べた点の位置のリストを取得する。
+
+        :param points: 点のリスト
+        :type points: list
+        :param lat: 緯度
+        :type lat: float
+        :param lon: 経度
+        :type lon: float
+        :return: 点の位置のリスト
+        :rtype: list
+        """
+        # すべての点の距離を求めて並べ替える
+        distances = [(haversine(lat, lon, y, x), i) for i, (x, y) in enumerate(points)]
+        return [i for _, i in sorted(distances)]
+
+    def test_init_01(self):
+        """
+        [対象] __init__() : No.01
+        [条件] 値が存在しない要素を含む点のリストを指定して実行する。
+        [結果] 値が存在する点のみがインデックスに含まれる。
+        """
+        target = self._get_target_object()
+
+        self.assertEqual(4, len(target))
+
+    def test_nearest_01(self):
+        """
+        [対象] nearest() : No.01
+        [条件] 件数を指定して実行する。
+        [結果] 近い順に指定された件数のモデルと距離が返却される。
+        """
+        target = self._get_target_object()
+        actual = target.nearest(35.862, 139.903, 2)
+
+        self.assertEqual([1, 2], [model.id for model, _ in actual])
+        self.assertAlmostEqual(haversine(35.862, 139.903, 35.8617, 139.9025), actual[0][1])
+
+    def test_nearest_02(self):
+        """
+        [対象] nearest() : No.02
+        [条件] 点の範囲の外側の座標と、点の数より多い件数を指定して実行する。
+        [結果] すべての点が近い順に返却される。
+        """
+        target = self._get_target_object(cell_size=0.001)
+        actual = target.nearest(10.0, 100.0, 10)
+
+        self.assertEqual([5, 1, 2, 3], [model.id for model, _ in actual])
+
+    def test_nearest_03(self):
+        """
+        [対象] nearest() : No.03
+        [条件] 多数の点に対して様々な座標を指定して実行する。
+        [結果] すべての点の距離を求めた場合と同じ結果が返却される。
+        """
+        points = [(139.8 + (i * 7919 % 1000) / 5000, 35.8 + (i * 104729 % 1000) / 5000) for i in range(1000)]
+        target = SpatialIndex(points)
+        for lat, lon in ((35.85, 139.85), (35.8, 139.8), (36.5, 139.0), (35.95, 140.1)):
+            actual = target.nearest(lat, lon, 5)
+
+            self.assertEqual(self._brute_force(points, lat, lon)[:5], [i for i, _ in actual])
+
+    def test_nearest_04(self):
+        """
+        [対象] nearest() : No.04
+        [条件] 空のインデックスに対して実行する。
+        [結果] 空のリストが返却される。
+        """
+        target = SpatialIndex([])
+
+        self.assertEqual([], target.nearest(35.86, 139.90))
+
+    def test_within_bbox_01(self):
+        """
+        [対象] within_bbox() : No.01
+        [条件] 矩形を指定して実行する。
+        [結果] 矩形に含まれるモデルが元の順序で返却される。
+        """
+        target = self._get_target_object()
+        actual = target.within_bbox(35.86, 139.90, 35.90, 139.95)
+
+        self.assertEqual([1, 2, 3], [model.id for model in actual])
+
+    def test_within_bbox_02(self):
+        """
+        [対象] within_bbox() : No.02
+        [条件] 点が存在しない矩形を指定して実行する。
+        [結果] 空のリストが返却される。
+        """
+        target = self._get_target_object(cell_size=0.001)
+        actual = target.within_bbox(0.0, 0.0, 1.0, 1.0)
+
+        self.assertEqual([], actual)
+
+    def test_within_radius_01(self):
+        """
+        [対象] within_radius() : No.01
+        [条件] 座標と距離を指定して実行する。
+        [結果] 距離以内のモデルと距離が近い順に返却される。
+        """
+        target = self._get_target_object()
+        actual = target.within_radius(35.8700, 139.9100, 1200)
+
+        self.assertEqual([2, 1], [model.id for model, _ in actual])
+        self.assertEqual(0.0, actual[0][1])
+        self.assertLessEqual(actual[1][1], 1200)
+
+    def test_within_radius_02(self):
+        """
+        [対象] within_radius() : No.02
+        [条件] 多数の点に対して様々な座標と距離を指定して実行する。
+        [結果] すべての点の距離を求めた場合と同じ結果が返却される。
+        """
+        points = [(139.8 + (i * 7919 % 1000) / 5000, 35.8 + (i * 104729 % 1000) / 5000) for i in range(1000)]
+        target = SpatialIndex(points)
+        for lat, lon, meters in ((35.85, 139.85, 500), (35.8, 139.8, 3000), (35.9, 139.9, 50000)):
+            actual = target.within_radius(lat, lon, meters)
+            expected = [i for i in self._brute_force(points, lat, lon)
+                        if haversine(lat, lon, points[i][1], points[i][0]) <= meters]
+
+            self.assertEqual(expected, [i for i, _ in actual])
+
+
+class PointsOfTest(TestCase):
+    """
+    spatial.points_of()に対するテストコード。
+    """
+
+    def test_points_of_01(self):
+        """
+        [対象] points_of() : No.01
+        [条件] 緯度と経度のフィールド名を指定して実行する。
+        [結果] 経度、緯度の順のタプルのリストが返却される。
+        """
+        collection = ModelCollection.from_records(FacilityModel, RECORDS)
+        actual = points_of(collection, lat='latitude', lon='longitude')
+
+        self.assertEqual((139.9025, 35.8617), actual[0])
+        self.assertIsNone(actual[3])
+
+    def test_points_of_02(self):
+        """
+        [対象] points_of() : No.02
+        [条件] GeometryFieldのフィールド名とモデルのリストを指定して実行する。
+        [結果] ジオメトリを囲む矩形の中心が返却される。
+        """
+        models = [FacilityModel(data) for data in RECORDS]
+        actual = points_of(models, 'area')
+
+        self.assertIsNone(actual[0])
+        self.assertAlmostEqual(139.95, actual[2][0])
+        self.assertAlmostEqual(35.90, actual[2][1])
+
+    def test_points_of_03(self):
+        """
+        [対象] points_of() : No.03
+        [条件] フィールド名を指定せずに実行する。
+        [結果] ValueErrorが送出される。
+        """
+        with self.assertRaises(ValueError):
+            points_of([], lat='latitude')
+
+
+class JoinTest(TestCase):
+    """
+    spatial.nearest_join()、spatial.distance_join()に対するテストコード。
+    """
+
+    def _get_target_objects(self):
+        """
+        テスト対象の左側と右側のオブジェクトを取得する。
+
+        :return: 左側のモデルのリストと右側のコレクションのタプル
+        :rtype: tuple
+        """
+        # 左側は少数のモデル、右側は多数の行を持つコレクションとする
+        left = [FacilityModel(data) for data in RECORDS]
+        right = ModelCollection.from_records(FacilityModel, [
+            {'feature_id': i, 'attrs': {'attr6': str(35.8 + (i * 104729 % 100) / 1000),
+                                        'attr7': str(139.8 + (i * 7919 % 100) / 500)}}
+            for i in range(200)
+        ])
+        return left, right
+
+    def _brute_force(self, left, right, meters):
+        """
+        すべての組の距離を求め、距離以内の組の項目IDのリストを取得する。
+
+        :param left: 左側のモデルのリスト
+        :type left: list
+        :param right: 右側のモデルのシーケンス
+        :type right: object
+        :param meters: 距離
+        :type meters: float
+        :return: 左側と右側の項目IDのタプルのリスト
+        :rtype: list
+        """
+        # すべての組の距離を求める
+        pairs = []
+        for a in left:
+            if a.location is None:
+                continue
+            for b in right:
+                distance = haversine(a.location.y, a.location.x, b.latitude, b.longitude)
+                if distance <= meters:
+                    pairs.append((a.id, b.id))
+        return sorted(pairs)
+
+    def test_nearest_join_01(self):
+        """
+        [対象] nearest_join() : No.01
+        [条件] 左側と右側で異なる種類の座標のフィールドを指定して実行する。
+        [結果] 座標が存在する左側の要素ごとに、最も近い右側の要素と距離が返却される。
+        """
+        left, right = self._get_target_objects()
+        actual = list(nearest_join(left, right, 'location', ('latitude', 'longitude')))
+
+        self.assertEqual([1, 2, 3, 5], [a.id for a, _, _ in actual])
+        for a, b, distance in actual:
+            expected = min(right, key=lambda m: haversine(a.location.y, a.location.x, m.latitude, m.longitude))
+            self.assertEqual(expected.id, b.id)
+            self.assertAlmostEqual(haversine(a.location.y, a.location.x, b.latitude, b.longitude), distance)
+
+    def test_nearest_join_02(self):
+        """
+        [対象] nearest_join() : No.02
+        [条件] 件数とスレッドの数を指定して実行する。
+        [結果] 並列に検索しない場合と同じ結果が返却される。
+        """
+        left, right = self._get_target_objects()
+        expected = list(nearest_join(left, right, 'location', ('latitude', 'longitude'), k=3))
+        actual = list(nearest_join(left, right, 'location', ('latitude', 'longitude'), k=3, workers=4))
+
+        self.assertEqual(12, len(actual))
+        self.assertEqual([(a.id, b.id, d) for a, b, d in expected], [(a.id, b.id, d) for a, b, d in actual])
+
+    def test_nearest_join_03(self):
+        """
+        [対象] nearest_join() : No.03
+        [条件] 右側に空間インデックスを指定して実行する。
+        [結果] 空間インデックスの要素が結合される。
+        """
+        left, right = self._get_target_objects()
+        index = SpatialIndex(points_of(right, lat='latitude', lon='longitude'), right)
+        expected = list(nearest_join(left, right, 'location', ('latitude', 'longitude')))
+        actual = list(nearest_join(left, index, 'location'))
+
+        self.assertEqual([(a.id, b.id) for a, b, _ in expected], [(a.id, b.id) for a, b, _ in actual])
+
+    def test_nearest_join_04(self):
+        """
+        [対象] nearest_join() : No.04
+        [条件] 左側に空間インデックスを指定して実行する。
+        [結果] TypeErrorが送出される。
+        """
+        left, right = self._get_target_objects()
+        with self.assertRaises(TypeError):
+            list(nearest_join(SpatialIndex([]), right, ('latitude', 'longitude')))
+
+    def test_distance_join_01(self):
+        """
+        [対象] distance_join() : No.01
+        [条件] 右側の要素数が多い状態で実行する。
+        [結果] すべての組の距離を求めた場合と同じ組が返却される。
+        """
+        left, right = self._get_target_objects()
+        actual = distance_join(left, right, 3000, 'location', ('latitude', 'longitude'))
+
+        self.assertEqual(self._brute_force(left, right, 3000), sorted((a.id, b.id) for a, b, _ in actual))
+
+    def test_distance_join_02(self):
+        """
+        [対象] distance_join() : No.02
+        [条件] 左側の要素数が多い状態で、スレッドの数を指定して実行する。
+        [結果] 左側と右側の順序を保ったまま、すべての組の距離を求めた場合と同じ組が返却される。
+        """
+        left, right = self._get_target_objects()
+        actual = list(distance_join(right, left, 3000, ('latitude', 'longitude'), 'location', workers=4))
+
+        expected = sorted((b, a) for a, b in self._brute_force(left, right, 3000))
+        self.assertEqual(expected, sorted((a.id, b.id) for a, b, _ in actual))
+        self.assertTrue(all(distance <= 3000 for _, _, distance in actual))
+
+    def test_distance_join_03(self):
+        """
+        [対象] distance_join() : No.03
+        [条件] 両側に空間インデックスを指定して実行する。
+        [結果] TypeErrorが送出される。
+        """
+        with self.assertRaises(TypeError):
+            list(distance_join(SpatialIndex([]), SpatialIndex([]), 100, 'location'))
+
+
+class SpatialModelTest(TestCase):
+    """
+    models.Model.get_spatial_index()に対するテストコード。
+    """
+
+    @patch('pyny.models.api._get_json')
+    def test_get_spatial_index_01(self, get_json):
+        """
+        [対象] Model.get_spatial_index() : No.01
+        [条件] 同じレイヤID、フィールド名を指定して複数回実行する。
+        [結果] キャッシュされたインデックスが返却される。
+        """
+        get_json.return_value = {'num': 5, 'results': RECORDS}
+
+        from pyny import api
+        api.invalidate()
+        actual1 = FacilityModel.get_spatial_index('dummy', 'location')
+        actual2 = FacilityModel.get_spatial_index('dummy', 'location')
+        actual3 = FacilityModel.get_spatial_index('dummy', lat='latitude', lon='longitude')
+
+        self.assertIs(actual1, actual2)
+        self.assertIsNot(actual1, actual3)
+        self.assertEqual(1, actual1.nearest(35.8617, 139.9025)[0][0].id)
+        self.assertEqual(1, get_json.call_count)